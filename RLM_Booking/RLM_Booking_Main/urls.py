@@ -18,9 +18,14 @@ from django.contrib import admin
 from django.shortcuts import render
 from django.urls import path, include
 
+from shared_services.metrics import metrics_view
+from shared_services.quota import quota_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('apps.base_urls')),
     path('artist_recommendation/', include('apps.artist_recommendation.urls')),  # Set root URL to artist_recommendation
-    path('event_management/', include('apps.event_management.urls'))
+    path('event_management/', include('apps.event_management.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('quota', quota_view, name='quota'),
 ]
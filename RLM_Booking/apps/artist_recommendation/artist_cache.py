@@ -0,0 +1,137 @@
+"""
+Caches behind the artist views, shared by every process so the cache warmer can refresh them ahead
+of requests: Spotify search results in DynamoDB, Ticketmaster events in the ArtistCacheEntry table.
+"""
+import logging
+import os
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from integrations.artist_event_search import get_spotify_token, search_artist, trim_spotify_artist, get_ticketmaster_events
+from shared_services.artist_search import get_artist_search_index, normalize_name
+from shared_services.aws_data_manager import AWSDataManager
+from shared_services.metrics import record_cache
+from .models import ArtistCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Spotify search results older than this are fetched again
+ARTIST_SEARCH_TTL = timedelta(days=7)
+
+# Ticketmaster events older than this are fetched again
+ARTIST_EVENTS_TTL = timedelta(hours=6)
+
+# Initialize AWSDatabaseManager
+db_manager = AWSDataManager(
+    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+    region_name=os.getenv('REGION_NAME'),
+    table_name=os.getenv('TABLE_NAME')
+)
+
+def artist_key(artist_name):
+    """
+    Cache key for an artist, so "Lady Gaga" and "lady gaga" share an entry.
+    """
+    return normalize_name(artist_name) or artist_name.strip().lower()
+
+def search_spotify_artists(artist_name):
+    """
+    Returns trimmed Spotify artists for a name, from the DynamoDB cache when it is fresh.
+
+    Raises:
+        requests.RequestException: The Spotify calls failed or ran out of time.
+    """
+    cached_results = db_manager.get_cached_results(artist_key(artist_name), max_age=ARTIST_SEARCH_TTL.total_seconds())
+    if cached_results:
+        logger.debug("Using cached results for %s", artist_name)
+        return cached_results['data']
+    return refresh_spotify_artists(artist_name)
+
+def refresh_spotify_artists(artist_name):
+    """
+    Searches Spotify for a name, caches the trimmed artists and adds them to the typeahead index.
+
+    Raises:
+        requests.RequestException: The Spotify calls failed or ran out of time.
+    """
+    token = get_spotify_token()
+    artist_data = search_artist(artist_name, token)
+
+    artists = artist_data.get('artists', {}).get('items', [artist_data])
+    artists = [trim_spotify_artist(artist) for artist in artists]
+    key = artist_key(artist_name)
+    db_manager.cache_results(key, artists)
+    _update_entry(artist_name, search_cached_at=timezone.now())
+
+    # Artists found upstream become typeahead suggestions
+    get_artist_search_index().add_artists(
+        {
+            'name': artist['name'],
+            'popularity': artist['popularity'],
+            'followers': artist['followers']['total'],
+            'genres': artist['genres'],
+            'external_url': artist['external_urls']['spotify'],
+        }
+        for artist in artists if artist.get('name')
+    )
+    return artists
+
+def fetch_artist_events(artist_name):
+    """
+    Returns the raw Ticketmaster events for an artist, from the shared cache when they are fresh;
+    an empty list if there are none or the search failed. Failed searches are not cached.
+    """
+    entry = (
+        ArtistCacheEntry.objects
+        .filter(artist_key=artist_key(artist_name), events_fetched_at__gte=timezone.now() - ARTIST_EVENTS_TTL)
+        .values_list('events', flat=True)
+        .first()
+    )
+    record_cache('artist_events', entry is not None)
+    if entry is not None:
+        return entry
+
+    events_data = get_ticketmaster_events(artist_name)
+    if not events_data or 'error' in events_data:
+        return []
+    events = events_data.get('_embedded', {}).get('events', [])
+    store_artist_events(artist_name, events)
+    return events
+
+def store_artist_events(artist_name, events, **fields):
+    """
+    Caches an artist's raw events, with any other ArtistCacheEntry fields given.
+    """
+    _update_entry(artist_name, events=events, events_fetched_at=timezone.now(), **fields)
+
+def record_artist_request(artist_name):
+    """
+    Counts a request for an artist; the cache warmer keeps the most requested artists warm.
+    Failures are logged and ignored so they never fail the request.
+    """
+    key = artist_key(artist_name)
+    if not key:
+        return
+    now = timezone.now()
+    try:
+        updated = ArtistCacheEntry.objects.filter(artist_key=key).update(request_count=F('request_count') + 1, requested_at=now)
+        if not updated:
+            ArtistCacheEntry.objects.get_or_create(
+                artist_key=key,
+                defaults={'artist_name': artist_name.strip()[:255], 'request_count': 1, 'requested_at': now},
+            )
+    except DatabaseError as e:
+        logger.warning("Could not record request for %s: %s", artist_name, e)
+
+def _update_entry(artist_name, **fields):
+    key = artist_key(artist_name)
+    try:
+        ArtistCacheEntry.objects.update_or_create(
+            artist_key=key, defaults=fields, create_defaults={'artist_name': artist_name.strip()[:255], **fields}
+        )
+    except DatabaseError as e:
+        logger.warning("Could not update the cache entry for %s: %s", artist_name, e)
@@ -0,0 +1,168 @@
+"""
+Keeps the artist caches warm for the most requested and most popular artists, so searches at peak
+hours are cache hits. Runs as the warm_artist_caches job every WARM_INTERVAL (see data_processing.jobs).
+
+Each run refreshes the entries closest to expiry, within a Ticketmaster call budget: the warmer's
+daily quota budget (shared_services.quota) spread evenly over the day's runs.
+"""
+import logging
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+import requests
+from django.db.models import Q
+from django.utils import timezone
+
+from integrations.ticketmaster_api_manager import TicketmasterAPIManager, cached_attraction_id, forget_attraction_ids, prime_attraction_ids
+from shared_services.artist_search import get_artist_search_index
+from shared_services.quota import WARMER, daily_budget, remaining
+from .artist_cache import ARTIST_EVENTS_TTL, ARTIST_SEARCH_TTL, artist_key, refresh_spotify_artists, store_artist_events
+from .models import ArtistCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Artists kept warm
+DEFAULT_TOP_ARTISTS = 200
+
+WARM_INTERVAL = timedelta(minutes=15)
+
+# Entries are refreshed once this share of their TTL has passed, so they never expire while warm
+REFRESH_AT = 0.75
+
+# Requests within this window count towards an artist's demand
+DEMAND_WINDOW = timedelta(days=14)
+
+# Attraction ids are looked up again after this long
+ATTRACTION_ID_TTL = timedelta(days=30)
+
+# Spotify searches per run; Spotify has no daily quota, this only bounds a run's length
+SPOTIFY_REFRESHES_PER_RUN = 25
+
+# Events cached per artist, soonest first
+EVENTS_PER_ARTIST = 20
+
+_NEVER = datetime.min.replace(tzinfo=dt_timezone.utc)
+
+def run_budget(interval: timedelta = WARM_INTERVAL) -> int:
+    """
+    Ticketmaster calls one run may make: the warmer's daily quota budget divided over the day's runs.
+    """
+    daily = daily_budget(TicketmasterAPIManager.UPSTREAM_NAME, WARMER)
+    return max(1, int(daily * interval.total_seconds() / timedelta(days=1).total_seconds()))
+
+def select_artists(limit: int = DEFAULT_TOP_ARTISTS) -> List[str]:
+    """
+    The artists to keep warm: the most requested ones in the last DEMAND_WINDOW, then the most
+    popular crawled artists.
+    """
+    names: Dict[str, str] = {}
+    requested = (
+        ArtistCacheEntry.objects
+        .filter(requested_at__gte=timezone.now() - DEMAND_WINDOW)
+        .order_by('-request_count')
+        .values_list('artist_key', 'artist_name')[:limit]
+    )
+    for key, name in requested:
+        names.setdefault(key, name)
+    if len(names) < limit:
+        for artist in get_artist_search_index().most_popular(limit):
+            names.setdefault(artist_key(artist['name']), artist['name'])
+            if len(names) >= limit:
+                break
+    return list(names.values())
+
+def _is_due(fetched_at: Optional[datetime], ttl: timedelta, now: datetime) -> bool:
+    return fetched_at is None or now - fetched_at >= ttl * REFRESH_AT
+
+def _estimated_calls(entries: List[ArtistCacheEntry], now: datetime) -> int:
+    """
+    Upper estimate of the Ticketmaster calls fetch_events_bulk makes for these entries. Artists with
+    a known attraction share a search per ATTRACTION_BATCH_SIZE. A search pages until every artist in
+    it has EVENTS_PER_ARTIST events, so an artist with fewer upcoming events keeps it paging, up to
+    MAX_PAGES_PER_SEARCH pages. The other artists need a lookup and a one-page search each. Searching
+    again a batch that the deep paging limit cut off is not counted.
+    """
+    batched = sum(1 for entry in entries if entry.attraction_id and not _is_due(entry.attraction_resolved_at, ATTRACTION_ID_TTL, now))
+    batches = math.ceil(batched / TicketmasterAPIManager.ATTRACTION_BATCH_SIZE)
+    return batches * TicketmasterAPIManager.MAX_PAGES_PER_SEARCH + 2 * (len(entries) - batched)
+
+def warm_artist_caches(limit: int = DEFAULT_TOP_ARTISTS, budget: Optional[int] = None) -> Dict[str, int]:
+    """
+    Refreshes cached Spotify searches and Ticketmaster events of the top artists that are due.
+
+    Args:
+        limit (int): Number of top artists to keep warm.
+        budget (Optional[int]): Ticketmaster calls this run may make; by default run_budget(), or less
+            if the warmer's quota for the day is nearly used up.
+
+    Returns:
+        Dict[str, int]: Counts of refreshed searches and events, failures, and artists still due.
+    """
+    now = timezone.now()
+    if budget is None:
+        budget = min(run_budget(), remaining(TicketmasterAPIManager.UPSTREAM_NAME, WARMER))
+    names = select_artists(limit)
+    entries = ArtistCacheEntry.objects.in_bulk([artist_key(name) for name in names])
+    entries = [entries.get(artist_key(name)) or ArtistCacheEntry(artist_key=artist_key(name), artist_name=name) for name in names]
+    stats = {'searches': 0, 'events': 0, 'failed': 0, 'deferred': 0}
+
+    # Spotify search results, oldest first
+    due = sorted((entry for entry in entries if _is_due(entry.search_cached_at, ARTIST_SEARCH_TTL, now)),
+                 key=lambda entry: entry.search_cached_at or _NEVER)
+    for entry in due[:SPOTIFY_REFRESHES_PER_RUN]:
+        try:
+            refresh_spotify_artists(entry.artist_name)
+            stats['searches'] += 1
+        except requests.RequestException as e:
+            logger.warning("Could not refresh the Spotify search for %s: %s", entry.artist_name, e)
+            stats['failed'] += 1
+
+    # Ticketmaster events, oldest first, as many as the budget allows
+    due = sorted((entry for entry in entries if _is_due(entry.events_fetched_at, ARTIST_EVENTS_TTL, now)),
+                 key=lambda entry: entry.events_fetched_at or _NEVER)
+    selected = []
+    for entry in due:
+        if _estimated_calls(selected + [entry], now) > budget:
+            break
+        selected.append(entry)
+    stats['deferred'] = len(due) - len(selected)
+    if not selected:
+        logger.info("Cache warm-up: %s", stats)
+        return stats
+
+    # Reuse attraction ids resolved by earlier runs instead of looking them up again; expired ones are looked up
+    expired = {entry.artist_key for entry in selected if _is_due(entry.attraction_resolved_at, ATTRACTION_ID_TTL, now)}
+    forget_attraction_ids([entry.artist_name for entry in selected if entry.artist_key in expired])
+    prime_attraction_ids({entry.artist_name: entry.attraction_id for entry in selected if entry.artist_key not in expired})
+    by_key = {entry.artist_key: entry for entry in selected}
+    results = TicketmasterAPIManager().fetch_events_bulk(
+        [entry.artist_name for entry in selected], max_results_per_artist=EVENTS_PER_ARTIST, sort='date,asc'
+    )
+    for result in results:
+        if result.error is not None:
+            logger.warning("Could not refresh events for %s: %s", result.artist, result.error)
+            stats['failed'] += 1
+            continue
+        entry = by_key[artist_key(result.artist)]
+        fields = {}
+        attraction_id = cached_attraction_id(result.artist)
+        if attraction_id is not None and _is_due(entry.attraction_resolved_at, ATTRACTION_ID_TTL, now):
+            fields = {'attraction_id': attraction_id, 'attraction_resolved_at': now}
+        store_artist_events(result.artist, result.events, **fields)
+        stats['events'] += 1
+
+    logger.info("Cache warm-up: %s", stats)
+    return stats
+
+def prune_artist_cache() -> int:
+    """
+    Deletes entries that are neither requested within DEMAND_WINDOW nor kept fresh by the warmer.
+    """
+    now = timezone.now()
+    _, deleted = ArtistCacheEntry.objects.filter(
+        Q(requested_at__isnull=True) | Q(requested_at__lt=now - DEMAND_WINDOW),
+        Q(events_fetched_at__isnull=True) | Q(events_fetched_at__lt=now - ARTIST_EVENTS_TTL),
+        Q(search_cached_at__isnull=True) | Q(search_cached_at__lt=now - ARTIST_SEARCH_TTL),
+    ).delete()
+    return deleted.get(ArtistCacheEntry._meta.label, 0)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.artist_recommendation.models import ArtistNeighbor
+from data_processing.artist_similarity import DEFAULT_BLOCK_SIZE, DEFAULT_MAX_GENRES, DEFAULT_NEIGHBORS, compute_artist_neighbors
+
+# Rows per bulk insert
+BATCH_SIZE = 2000
+
+class Command(BaseCommand):
+    help = "Precompute similar artists from crawled artist data and replace the neighbor table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', nargs='+', required=True, help="Crawled artist CSV files.")
+        parser.add_argument('--playlists', help="Crawled (playlist_id, artist_name) CSV for co-occurrence.")
+        parser.add_argument('--neighbors', type=int, default=DEFAULT_NEIGHBORS)
+        parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE)
+        parser.add_argument('--max-genres', type=int, default=DEFAULT_MAX_GENRES)
+
+    def handle(self, *args, **options):
+        neighbors = compute_artist_neighbors(
+            options['input'],
+            playlist_path=options['playlists'],
+            k=options['neighbors'],
+            block_size=options['block_size'],
+            max_genres=options['max_genres'],
+        )
+
+        # Swap the table in one transaction so lookups never see a partial build
+        with transaction.atomic():
+            ArtistNeighbor.objects.all().delete()
+            ArtistNeighbor.objects.bulk_create(
+                (ArtistNeighbor(**row) for row in neighbors.to_dict('records')),
+                batch_size=BATCH_SIZE,
+            )
+        self.stdout.write(f"Stored {len(neighbors)} neighbors for {neighbors['artist_key'].nunique()} artists")
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('artist_key', models.CharField(max_length=255)),
+                ('artist_name', models.CharField(max_length=255)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('neighbor_name', models.CharField(max_length=255)),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('artist_key', 'rank'), name='artist_neighbor_rank_unique')],
+            },
+        ),
+    ]
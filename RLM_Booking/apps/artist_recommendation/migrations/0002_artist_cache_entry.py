@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artist_recommendation', '0001_artist_neighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistCacheEntry',
+            fields=[
+                ('artist_key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('artist_name', models.CharField(max_length=255)),
+                ('events', models.JSONField(null=True)),
+                ('events_fetched_at', models.DateTimeField(null=True)),
+                ('attraction_id', models.CharField(blank=True, max_length=64)),
+                ('attraction_resolved_at', models.DateTimeField(null=True)),
+                ('search_cached_at', models.DateTimeField(null=True)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('requested_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['requested_at'], name='artist_cache_requested_idx'), models.Index(fields=['events_fetched_at'], name='artist_cache_events_idx')],
+            },
+        ),
+    ]
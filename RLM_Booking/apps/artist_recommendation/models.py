@@ -1,3 +1,51 @@
 from django.db import models
 
 # Create your models here.
+class ArtistNeighbor(models.Model):
+    """
+    Precomputed similar artists (see data_processing.artist_similarity), so recommendations are a lookup.
+    """
+    # Normalized artist name (shared_services.artist_search.normalize_name)
+    artist_key = models.CharField(max_length=255)
+    artist_name = models.CharField(max_length=255)
+    rank = models.PositiveSmallIntegerField()
+    neighbor_name = models.CharField(max_length=255)
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # Also serves the (artist_key, rank) lookup
+            models.UniqueConstraint(fields=['artist_key', 'rank'], name='artist_neighbor_rank_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.artist_name} -> {self.neighbor_name} ({self.score:.3f})"
+
+class ArtistCacheEntry(models.Model):
+    """
+    Per-artist cache state shared by every process: the artist's Ticketmaster events, its attraction
+    id, when its Spotify search was last cached, and how often it is requested. The cache warmer
+    (apps.artist_recommendation.cache_warmer) ranks and refreshes artists from this table.
+    """
+    # Normalized artist name (shared_services.artist_search.normalize_name)
+    artist_key = models.CharField(max_length=255, primary_key=True)
+    artist_name = models.CharField(max_length=255)
+    # Raw Ticketmaster events for the artist; null until first fetched
+    events = models.JSONField(null=True)
+    events_fetched_at = models.DateTimeField(null=True)
+    # Ticketmaster attraction id; empty when Ticketmaster has no matching attraction
+    attraction_id = models.CharField(max_length=64, blank=True)
+    attraction_resolved_at = models.DateTimeField(null=True)
+    # Last time Spotify search results for the artist were written to the DynamoDB cache
+    search_cached_at = models.DateTimeField(null=True)
+    request_count = models.PositiveIntegerField(default=0)
+    requested_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['requested_at'], name='artist_cache_requested_idx'),
+            models.Index(fields=['events_fetched_at'], name='artist_cache_events_idx'),
+        ]
+
+    def __str__(self):
+        return self.artist_name
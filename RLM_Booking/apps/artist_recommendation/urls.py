@@ -4,5 +4,8 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('search-artist/', views.search_artist_route, name='search_artist_route'),
+    path('similar-artists/', views.similar_artists_route, name='similar_artists_route'),
+    path('artist-typeahead/', views.artist_typeahead_route, name='artist_typeahead_route'),
     path('get-events/', views.get_events_route, name='get_events_route'),
+    path('artist-overview/', views.artist_overview_route, name='artist_overview_route'),
 ]
@@ -1,18 +1,33 @@
 from django.shortcuts import render
 from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_GET
 
-from integrations.artist_event_search import get_spotify_token, search_artist, get_ticketmaster_events, analyze_local_global_events
-from shared_services.aws_data_manager import AWSDataManager
-import os
+from integrations.artist_event_search import analyze_local_global_events
+from integrations.ticketmaster_api_manager import TicketmasterAPIManager
+from shared_services.artist_search import get_artist_search_index, normalize_name
+from shared_services.concurrency import submit
+from shared_services.deadline import VIEW_DEADLINE, DeadlineExceeded, deadline, remaining
+from shared_services.geolocation import get_venue_index
+from shared_services.prediction_service import get_sales_predictor
+from shared_services.profiling import profile_view
+from data_processing.features import DEFAULT_VENUE_CAPACITY
+from .artist_cache import fetch_artist_events, record_artist_request, search_spotify_artists
+from .models import ArtistNeighbor
+import logging
+import requests
 
-# Initialize AWSDatabaseManager
-db_manager = AWSDataManager(
-    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-    region_name=os.getenv('REGION_NAME'),
-    table_name=os.getenv('TABLE_NAME')
-)
+logger = logging.getLogger(__name__)
+
+# Typeahead suggestions per request
+DEFAULT_TYPEAHEAD_LIMIT = 8
+MAX_TYPEAHEAD_LIMIT = 25
+
+# Similar artists per request
+DEFAULT_SIMILAR_LIMIT = 10
+
+# Fields a client may request from get_events_route via ?fields=
+EVENT_FIELDS = TicketmasterAPIManager.SUMMARY_FIELDS + ('predicted_sales', 'suggested_price')
 
 # Homepage route
 def home(request):
@@ -20,54 +35,204 @@ def home(request):
 
 # Search artist route
 @require_GET
+@profile_view
+@deadline(VIEW_DEADLINE)
 def search_artist_route(request):
-    artist_name = request.GET.get('name')
-    cached_results = db_manager.get_cached_results(artist_name)
+    artist_name = request.GET.get('name', '').strip()
+    if not artist_name:
+        return JsonResponse({'error': 'name is required.'}, status=400)
+    record_artist_request(artist_name)
+    try:
+        artists = search_spotify_artists(artist_name)
+    except DeadlineExceeded:
+        return JsonResponse({'error': 'Spotify did not answer in time.'}, status=504)
+    except requests.RequestException as e:
+        logger.error("Spotify artist search failed: %s", e)
+        return JsonResponse({'error': 'Spotify artist search failed.'}, status=502)
+    return JsonResponse(artists, safe=False)
 
-    if cached_results:
-        print(f"Using cached results for {artist_name}")
-        return JsonResponse(cached_results['data'], safe=False)
+# Typeahead route, served from the local artist index without upstream calls
+@require_GET
+@cache_control(max_age=300)
+def artist_typeahead_route(request):
+    query = request.GET.get('q', '').strip()
+    limit = request.GET.get('limit', '').strip()
+    if limit and not limit.isdigit():
+        return JsonResponse({'error': 'limit must be a numeric value.'}, status=400)
+    limit = min(int(limit) if limit else DEFAULT_TYPEAHEAD_LIMIT, MAX_TYPEAHEAD_LIMIT)
 
-    token = get_spotify_token()
-    artist_data = search_artist(artist_name, token)
+    results = get_artist_search_index().search(query, limit) if query else []
+    return JsonResponse(
+        [{'name': artist['name'], 'popularity': artist['popularity'], 'genres': artist['genres'][:3]} for artist in results],
+        safe=False
+    )
 
-    artists = artist_data.get('artists', {}).get('items', [artist_data])
-    db_manager.cache_results(artist_name, artists)
+# Similar artists route, a lookup in the precomputed neighbor table
+@require_GET
+def similar_artists_route(request):
+    artist_name = request.GET.get('name', '').strip()
+    limit = request.GET.get('limit', '').strip()
+    if not artist_name:
+        return JsonResponse({'error': 'name is required.'}, status=400)
+    if limit and not limit.isdigit():
+        return JsonResponse({'error': 'limit must be a numeric value.'}, status=400)
 
-    return JsonResponse(artists, safe=False)
+    neighbors = (
+        ArtistNeighbor.objects
+        .filter(artist_key=normalize_name(artist_name))
+        .order_by('rank')
+        .values('neighbor_name', 'score')[:int(limit) if limit else DEFAULT_SIMILAR_LIMIT]
+    )
+    return JsonResponse([{'name': row['neighbor_name'], 'score': row['score']} for row in neighbors], safe=False)
+
+def _parse_fields(fields_param):
+    """
+    Parses the comma-separated fields= parameter. The event id is always included since
+    the local/global partitions reference events by id.
+    """
+    if not fields_param:
+        return list(EVENT_FIELDS)
+    fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ['id'] + [field for field in fields if field != 'id']
+
+def _events_payload(raw_events, popularity, followers, genres, country, city, fields, predictor=None, predict=True):
+    """
+    Summarizes raw events with sales predictions and the local/global split, as returned by
+    get_events_route. Without predict, the prediction fields are None and no model is loaded.
+    """
+    if not raw_events:
+        return {
+            'events': [],
+            'local_event_count': 0,
+            'global_event_count': 0,
+            'local_event_ids': [],
+            'global_event_ids': []
+        }
+
+    local_events, global_events = analyze_local_global_events(raw_events, country, city)
+
+    summaries = [TicketmasterAPIManager.summarize_event(event) for event in raw_events]
+    get_venue_index().add_from_events(summaries)
+
+    if predict:
+        # Score every event in one batch
+        feature_rows = [
+            {
+                'popularity': popularity,
+                'followers': followers,
+                'genre': genres,
+                'venue_capacity': (event.get('_embedded', {}).get('venues') or [{}])[0].get('capacity', DEFAULT_VENUE_CAPACITY),
+                'date': summary['date'],
+            }
+            for event, summary in zip(raw_events, summaries)
+        ]
+        predictions = (predictor or get_sales_predictor()).predict(feature_rows)
+    else:
+        predictions = [(None, None)] * len(summaries)
+
+    events = []
+    for summary, (predicted_sales, suggested_price) in zip(summaries, predictions):
+        summary['predicted_sales'] = predicted_sales
+        summary['suggested_price'] = suggested_price
+        events.append({field: summary.get(field) for field in fields})
+
+    # Partitions reference events by id instead of repeating the event objects
+    return {
+        'events': events,
+        'local_event_count': len(local_events),
+        'global_event_count': len(global_events),
+        'local_event_ids': [event.get('id') for event in local_events],
+        'global_event_ids': [event.get('id') for event in global_events]
+    }
 
 # Get events route
 @require_GET
+@profile_view
+@deadline(VIEW_DEADLINE)
 def get_events_route(request):
-    artist_name = request.GET.get('name')
+    artist_name = request.GET.get('name', '').strip()
     artist_popularity = request.GET.get('popularity', 50)
+    artist_followers = request.GET.get('followers', 0)
+    artist_genres = request.GET.get('genres', '')
     target_country = request.GET.get('country', 'US')
     target_city = request.GET.get('city', '')
+    if not artist_name:
+        return JsonResponse({'error': 'name is required.'}, status=400)
+
+    try:
+        fields = _parse_fields(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    record_artist_request(artist_name)
+    try:
+        raw_events = fetch_artist_events(artist_name)
+    except DeadlineExceeded:
+        return JsonResponse({'error': 'Ticketmaster did not answer in time.'}, status=504)
+    except requests.RequestException as e:
+        logger.error("Ticketmaster event search failed for %s: %s", artist_name, e)
+        return JsonResponse({'error': 'Ticketmaster event search failed.'}, status=502)
+    return JsonResponse(_events_payload(
+        raw_events, artist_popularity, artist_followers, artist_genres, target_country, target_city, fields
+    ))
+
+# Artist overview route: the Spotify search, the Ticketmaster event search and the model load run
+# concurrently, replacing the search-artist then get-events round trips
+@require_GET
+@profile_view
+@deadline(VIEW_DEADLINE)
+def artist_overview_route(request):
+    artist_name = request.GET.get('name', '').strip()
+    target_country = request.GET.get('country', 'US')
+    target_city = request.GET.get('city', '')
+    if not artist_name:
+        return JsonResponse({'error': 'name is required.'}, status=400)
+    try:
+        fields = _parse_fields(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    record_artist_request(artist_name)
+    artists_future = submit(search_spotify_artists, artist_name)
+    events_future = submit(fetch_artist_events, artist_name)
+    predictor_future = submit(get_sales_predictor)
+
+    # Each part degrades on its own: a failed Spotify search still returns events, and vice versa
+    errors = {}
+    try:
+        artists = artists_future.result(timeout=remaining())
+    except Exception as e:
+        logger.error("Spotify artist search failed for %s: %s", artist_name, e)
+        errors['artists'] = 'Spotify artist search failed.'
+        artists = []
+    try:
+        raw_events = events_future.result(timeout=remaining())
+    except Exception as e:
+        logger.error("Ticketmaster event search failed for %s: %s", artist_name, e)
+        errors['events'] = 'Ticketmaster event search failed.'
+        raw_events = []
+    # A model that does not load within the deadline leaves the events without predictions
+    try:
+        predictor = predictor_future.result(timeout=remaining())
+    except Exception as e:
+        logger.error("Sales model load failed for %s: %r", artist_name, e)
+        errors['predictions'] = 'Sales predictions are unavailable.'
+        predictor = None
 
-    events_data = get_ticketmaster_events(artist_name)
-
-    if events_data and '_embedded' in events_data and 'events' in events_data['_embedded']:
-        events = events_data['_embedded']['events']
-        local_events, global_events = analyze_local_global_events(events, target_country, target_city)
-
-        for event in events:
-            if '_embedded' in event and 'venues' in event['_embedded']:
-                venue_capacity = event['_embedded']['venues'][0].get('capacity', 5000)
-                event['predicted_sales'] = 10000  # Replace with model values
-                event['suggested_price'] = 50
-
-        return JsonResponse({
-            'events': events,
-            'local_event_count': len(local_events),
-            'global_event_count': len(global_events),
-            'local_events': local_events,
-            'global_events': global_events
-        })
-
-    return JsonResponse({
-        'events': [],
-        'local_event_count': 0,
-        'global_event_count': 0,
-        'local_events': [],
-        'global_events': []
-    })
+    # The first artist's Spotify stats feed the sales predictions
+    artist = artists[0] if artists else {}
+    payload = _events_payload(
+        raw_events,
+        artist.get('popularity', 50),
+        (artist.get('followers') or {}).get('total', 0),
+        ', '.join(artist.get('genres') or []),
+        target_country,
+        target_city,
+        fields,
+        predictor=predictor,
+        predict=predictor is not None,
+    )
+    return JsonResponse({'artists': artists, **payload, 'errors': errors})
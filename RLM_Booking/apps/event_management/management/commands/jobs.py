@@ -0,0 +1,78 @@
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Importing the job definitions registers their tasks and schedules
+import data_processing.jobs  # noqa: F401
+from shared_services.task_queue import STATUSES, enqueue, get_broker, registered_schedules, registered_tasks
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else '-'
+
+def _parse_arg(value):
+    """
+    Parses a --arg key=value pair; values are read as JSON where possible (days=60 is an int).
+    """
+    key, separator, raw = value.partition('=')
+    if not separator or not key:
+        raise CommandError(f"Invalid --arg {value!r}; expected key=value")
+    try:
+        return key, json.loads(raw)
+    except json.JSONDecodeError:
+        return key, raw
+
+class Command(BaseCommand):
+    help = "List, inspect and enqueue background jobs."
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='subcommand', required=True)
+
+        list_parser = subcommands.add_parser('list', help="Show recent jobs.")
+        list_parser.add_argument('--task', help="Only jobs of this task.")
+        list_parser.add_argument('--status', choices=STATUSES)
+        list_parser.add_argument('--limit', type=int, default=20)
+
+        show_parser = subcommands.add_parser('show', help="Show one job with its result or error.")
+        show_parser.add_argument('job_id')
+
+        enqueue_parser = subcommands.add_parser('enqueue', help="Queue a job.")
+        enqueue_parser.add_argument('task')
+        enqueue_parser.add_argument('--arg', action='append', default=[], help="Task argument as key=value; repeatable.")
+        enqueue_parser.add_argument('--delay', type=float, default=0, help="Seconds before the job may run.")
+
+        subcommands.add_parser('tasks', help="Show registered tasks and schedules.")
+
+    def handle(self, *args, **options):
+        getattr(self, f"handle_{options['subcommand']}")(options)
+
+    def handle_list(self, options):
+        for job in get_broker().jobs(options['task'], options['status'], options['limit']):
+            self.stdout.write(
+                f"{job.id}  {job.name:<26} {job.status:<10} attempts {job.attempts}/{job.max_attempts}  "
+                f"created {_format_time(job.created_at)}  finished {_format_time(job.finished_at)}"
+            )
+
+    def handle_show(self, options):
+        job = get_broker().get(options['job_id'])
+        if job is None:
+            raise CommandError(f"No job {options['job_id']}")
+        for field in ('id', 'name', 'kwargs', 'status', 'attempts', 'max_attempts', 'error'):
+            self.stdout.write(f"{field}: {getattr(job, field)}")
+        for field in ('created_at', 'run_at', 'started_at', 'finished_at'):
+            self.stdout.write(f"{field}: {_format_time(getattr(job, field))}")
+        self.stdout.write(f"result: {json.dumps(job.result, default=str)}")
+
+    def handle_enqueue(self, options):
+        if options['task'] not in registered_tasks():
+            raise CommandError(f"Unknown task {options['task']!r}; see `jobs tasks`")
+        job = enqueue(options['task'], delay=options['delay'], **dict(_parse_arg(value) for value in options['arg']))
+        self.stdout.write(f"{job.id} {job.status}")
+
+    def handle_tasks(self, options):
+        schedules = {entry.task: entry.every for entry in registered_schedules()}
+        for name, spec in sorted(registered_tasks().items()):
+            every = f"every {schedules[name] / 3600:g}h" if name in schedules else "on demand"
+            self.stdout.write(
+                f"{name:<26} {every:<12} concurrency {spec.concurrency}  upstream {spec.upstream or '-'}  cost {spec.cost}"
+            )
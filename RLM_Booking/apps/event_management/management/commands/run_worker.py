@@ -0,0 +1,22 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+# Importing the job definitions registers their tasks and schedules
+import data_processing.jobs  # noqa: F401
+from shared_services.task_queue import Worker
+
+class Command(BaseCommand):
+    help = "Run background jobs and enqueue scheduled ones until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help="Jobs run at once (default: TASK_WORKER_CONCURRENCY or 4).")
+        parser.add_argument('--once', action='store_true', help="Start the jobs that are due, wait for them and exit.")
+        parser.add_argument('--no-schedule', action='store_true', help="Only run queued jobs; do not enqueue scheduled ones.")
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options['concurrency'], schedules=[] if options['no_schedule'] else None)
+        # Finish running jobs on SIGTERM/Ctrl-C instead of leaving them marked as running
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        worker.run(once=options['once'])
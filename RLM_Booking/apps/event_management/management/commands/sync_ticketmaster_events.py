@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.event_management.sync import DEFAULT_WINDOW_DAYS, sync_events
+
+class Command(BaseCommand):
+    help = "Sync upcoming Ticketmaster events into the local event store."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day to sync (YYYY-MM-DD); defaults to today.")
+        parser.add_argument('--days', type=int, default=30, help="Number of days to sync.")
+        parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS, help="Days fetched per API search.")
+        parser.add_argument('--artist', help="Only sync events for this artist.")
+
+    def handle(self, *args, **options):
+        start_date = None
+        if options['start']:
+            start_date = parse_date(options['start'])
+            if start_date is None:
+                raise CommandError(f"Invalid --start date: {options['start']}")
+        if options['days'] < 1 or options['window_days'] < 1:
+            raise CommandError("--days and --window-days must be positive.")
+
+        run = sync_events(
+            start_date=start_date,
+            days=options['days'],
+            window_days=options['window_days'],
+            artist=options['artist'],
+        )
+        self.stdout.write(
+            f"{run}: {run.fetched} fetched, {run.created} created, {run.updated} updated, {run.deleted} deleted"
+            + (" (truncated)" if run.truncated else "")
+        )
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_management', '0002_event_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketmasterAttraction',
+            fields=[
+                ('id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(db_index=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TicketmasterSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(blank=True, max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('fetched', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('truncated', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'finished_at'], name='tm_sync_scope_finished_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketmasterVenue',
+            fields=[
+                ('id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('state_code', models.CharField(blank=True, max_length=16)),
+                ('country_code', models.CharField(blank=True, max_length=8)),
+                ('postal_code', models.CharField(blank=True, max_length=32)),
+                ('latitude', models.FloatField(null=True)),
+                ('longitude', models.FloatField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['postal_code'], name='tm_venue_postal_code_idx'), models.Index(fields=['city'], name='tm_venue_city_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketmasterEvent',
+            fields=[
+                ('id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('date', models.DateField(null=True)),
+                ('status', models.CharField(blank=True, max_length=32)),
+                ('summary', models.JSONField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('synced_at', models.DateTimeField()),
+                ('attractions', models.ManyToManyField(related_name='events', to='event_management.ticketmasterattraction')),
+                ('venue', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='event_management.ticketmastervenue')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'id'], name='tm_event_date_id_idx'), models.Index(fields=['venue', 'date'], name='tm_event_venue_date_idx'), models.Index(fields=['synced_at'], name='tm_event_synced_at_idx')],
+            },
+        ),
+    ]
@@ -6,5 +6,89 @@ class Event(models.Model):
     location = models.CharField(max_length=255)
     date = models.DateField()
 
+    class Meta:
+        indexes = [
+            # Calendar queries filter on a date window and page by (date, id)
+            models.Index(fields=['date', 'id'], name='event_date_id_idx'),
+            models.Index(fields=['location'], name='event_location_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+# Local store of Ticketmaster listings, kept current by apps.event_management.sync
+class TicketmasterVenue(models.Model):
+    id = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    city = models.CharField(max_length=255, blank=True)
+    state_code = models.CharField(max_length=16, blank=True)
+    country_code = models.CharField(max_length=8, blank=True)
+    postal_code = models.CharField(max_length=32, blank=True)
+    latitude = models.FloatField(null=True)
+    longitude = models.FloatField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['postal_code'], name='tm_venue_postal_code_idx'),
+            models.Index(fields=['city'], name='tm_venue_city_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class TicketmasterAttraction(models.Model):
+    id = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+class TicketmasterEvent(models.Model):
+    id = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    date = models.DateField(null=True)
+    status = models.CharField(max_length=32, blank=True)
+    venue = models.ForeignKey(TicketmasterVenue, null=True, on_delete=models.SET_NULL, related_name='events')
+    attractions = models.ManyToManyField(TicketmasterAttraction, related_name='events')
+    # Compact event as served by the search endpoint (TicketmasterAPIManager.summarize_event)
+    summary = models.JSONField()
+    # Hash of the stored fields; the sync job only writes events whose hash changed
+    content_hash = models.CharField(max_length=64)
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='tm_event_date_id_idx'),
+            models.Index(fields=['venue', 'date'], name='tm_event_venue_date_idx'),
+            models.Index(fields=['synced_at'], name='tm_event_synced_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+class TicketmasterSync(models.Model):
+    """
+    One sync run over a date window. Searches are served locally when a recent completed run covers them.
+    """
+    # Lowercased artist name the run was limited to; empty for all events
+    scope = models.CharField(max_length=255, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True)
+    fetched = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    # Some window hit Ticketmaster's deep paging limit, so the run may be missing events
+    truncated = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['scope', 'finished_at'], name='tm_sync_scope_finished_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.name} ({self.date})"
\ No newline at end of file
+        return f"Sync {self.scope or '*'} {self.start_date}..{self.end_date}"
@@ -0,0 +1,312 @@
+"""
+Incremental sync of Ticketmaster listings into the local event store.
+
+Events are pulled window by window; only events whose content changed are written, and events that
+have passed (or disappeared from a fully fetched window) are removed. Run with:
+    python manage.py sync_ticketmaster_events --days 60
+"""
+import hashlib
+import json
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from integrations.ticketmaster_api_manager import TicketmasterAPIManager
+from shared_services.geolocation import VENUE_FIELDS, get_venue_index
+from .models import TicketmasterAttraction, TicketmasterEvent, TicketmasterSync, TicketmasterVenue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_DAYS = 7
+
+# A completed sync serves searches locally for this long
+LOCAL_STORE_MAX_AGE = timedelta(hours=12)
+
+# Rows per bulk write
+BATCH_SIZE = 500
+
+# Latest completed sync whose stored venues this process's venue index holds
+_indexed_sync_id: Optional[int] = None
+_indexed_sync_lock = threading.Lock()
+
+def normalize_event(event: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Splits a raw Ticketmaster event into the stored event fields, its venue and its attractions.
+    """
+    embedded = event.get('_embedded', {})
+    venue = (embedded.get('venues') or [None])[0]
+    if venue and venue.get('id'):
+        location = venue.get('location', {})
+        venue = {
+            'id': venue['id'],
+            'name': (venue.get('name') or '')[:255],
+            'city': (venue.get('city', {}).get('name') or '')[:255],
+            'state_code': venue.get('state', {}).get('stateCode') or '',
+            'country_code': venue.get('country', {}).get('countryCode') or '',
+            'postal_code': venue.get('postalCode') or '',
+            'latitude': float(location['latitude']) if location.get('latitude') else None,
+            'longitude': float(location['longitude']) if location.get('longitude') else None,
+        }
+    else:
+        venue = None
+
+    attractions = [
+        {'id': attraction['id'], 'name': (attraction.get('name') or '')[:255]}
+        for attraction in embedded.get('attractions', [])
+        if attraction.get('id')
+    ]
+
+    summary = TicketmasterAPIManager.summarize_event(event)
+    fields = {
+        'id': event['id'],
+        'name': (event.get('name') or '')[:255],
+        'date': summary['date'],
+        'status': event.get('dates', {}).get('status', {}).get('code', ''),
+        'venue_id': venue['id'] if venue else None,
+        'summary': summary,
+    }
+    hashed = {**fields, 'venue': venue, 'attraction_ids': sorted(attraction['id'] for attraction in attractions)}
+    fields['content_hash'] = hashlib.sha256(json.dumps(hashed, sort_keys=True, default=str).encode()).hexdigest()
+    return fields, venue, attractions
+
+def date_windows(start_date: date, end_date: date, window_days: int) -> Iterator[Tuple[date, date]]:
+    """
+    Yields consecutive inclusive (start, end) windows covering start_date..end_date.
+    """
+    current = start_date
+    while current <= end_date:
+        window_end = min(current + timedelta(days=window_days - 1), end_date)
+        yield current, window_end
+        current = window_end + timedelta(days=1)
+
+def fetch_window(api: TicketmasterAPIManager, start_date: date, end_date: date, artist: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Fetches every event in a window. Windows that hit the deep paging limit are split in half and
+    refetched, down to single days.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], bool]: The raw events, and whether some single day was still truncated.
+    """
+    # The API's end date is exclusive (see TicketmasterAPIManager._build_event_params)
+    events = list(api.iter_events(
+        artist=artist,
+        start_date=start_date.isoformat(),
+        end_date=(end_date + timedelta(days=1)).isoformat(),
+        max_results=api.DEEP_PAGING_LIMIT,
+    ))
+    if len(events) < api.DEEP_PAGING_LIMIT:
+        return events, False
+    if start_date == end_date:
+        logger.warning("Window %s has more than %d events; results are truncated", start_date, api.DEEP_PAGING_LIMIT)
+        return events, True
+
+    middle = start_date + (end_date - start_date) // 2
+    first, first_truncated = fetch_window(api, start_date, middle, artist)
+    second, second_truncated = fetch_window(api, middle + timedelta(days=1), end_date, artist)
+    return first + second, first_truncated or second_truncated
+
+def estimated_calls(days: int, window_days: int = DEFAULT_WINDOW_DAYS) -> int:
+    """
+    Upper estimate of the Ticketmaster calls of an unscoped sync_events run: every window pages up to
+    the deep paging limit, and fetch_window splits it in halves down to single days, each searched to
+    the limit again.
+    """
+    total = 0
+    for window_start, window_end in date_windows(date.min, date.min + timedelta(days=days - 1), window_days):
+        # A window of n days splits into a binary tree of 2n - 1 searches
+        total += 2 * ((window_end - window_start).days + 1) - 1
+    return total * TicketmasterAPIManager.MAX_PAGES_PER_SEARCH
+
+@transaction.atomic
+def store_events(raw_events: List[Dict[str, Any]], synced_at) -> Tuple[int, int]:
+    """
+    Upserts events whose content hash changed, with their venues and attractions; marks the rest as seen.
+
+    Returns:
+        Tuple[int, int]: Counts of created and updated events.
+    """
+    normalized = {}
+    for event in raw_events:
+        if event.get('id'):
+            normalized[event['id']] = normalize_event(event)
+
+    existing = dict(TicketmasterEvent.objects.filter(id__in=list(normalized)).values_list('id', 'content_hash'))
+    changed = {event_id: parts for event_id, parts in normalized.items() if existing.get(event_id) != parts[0]['content_hash']}
+    unchanged = [event_id for event_id in normalized if event_id not in changed]
+    TicketmasterEvent.objects.filter(id__in=unchanged).update(synced_at=synced_at)
+    if not changed:
+        return 0, 0
+
+    venues = {venue['id']: venue for _, venue, _ in changed.values() if venue}
+    attractions = {attraction['id']: attraction for _, _, items in changed.values() for attraction in items}
+    TicketmasterVenue.objects.bulk_create(
+        [TicketmasterVenue(**venue) for venue in venues.values()],
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=['name', 'city', 'state_code', 'country_code', 'postal_code', 'latitude', 'longitude'],
+    )
+    TicketmasterAttraction.objects.bulk_create(
+        [TicketmasterAttraction(**attraction) for attraction in attractions.values()],
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=['name'],
+    )
+    TicketmasterEvent.objects.bulk_create(
+        [TicketmasterEvent(**fields, synced_at=synced_at) for fields, _, _ in changed.values()],
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=['name', 'date', 'status', 'venue', 'summary', 'content_hash', 'synced_at'],
+    )
+
+    # Replace the attraction links of changed events
+    through = TicketmasterEvent.attractions.through
+    through.objects.filter(ticketmasterevent_id__in=list(changed)).delete()
+    through.objects.bulk_create(
+        [
+            through(ticketmasterevent_id=event_id, ticketmasterattraction_id=attraction['id'])
+            for event_id, (_, _, items) in changed.items()
+            for attraction in {item['id']: item for item in items}.values()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    get_venue_index().add_venues(venues.values())
+    created = sum(1 for event_id in changed if event_id not in existing)
+    return created, len(changed) - created
+
+def purge_expired_events(today: Optional[date] = None) -> int:
+    """
+    Deletes events dated before today.
+    """
+    _, deleted = TicketmasterEvent.objects.filter(date__lt=today or timezone.localdate()).delete()
+    return deleted.get(TicketmasterEvent._meta.label, 0)
+
+def sync_events(start_date: Optional[date] = None,
+                days: int = 30,
+                window_days: int = DEFAULT_WINDOW_DAYS,
+                artist: Optional[str] = None,
+                api: Optional[TicketmasterAPIManager] = None) -> TicketmasterSync:
+    """
+    Syncs events in start_date..start_date + days - 1 into the local store.
+
+    Args:
+        start_date (Optional[date]): First day to sync; defaults to today.
+        days (int): Number of days to sync.
+        window_days (int): Days fetched per API search.
+        artist (Optional[str]): Limit the sync to one artist.
+        api (Optional[TicketmasterAPIManager]): API client; a new one by default.
+
+    Returns:
+        TicketmasterSync: The completed run with its counts.
+    """
+    api = api or TicketmasterAPIManager()
+    start_date = start_date or timezone.localdate()
+    end_date = start_date + timedelta(days=days - 1)
+    run = TicketmasterSync.objects.create(
+        scope=(artist or '').strip().lower(),
+        start_date=start_date,
+        end_date=end_date,
+        started_at=timezone.now(),
+    )
+
+    for window_start, window_end in date_windows(start_date, end_date, window_days):
+        raw_events, truncated = fetch_window(api, window_start, window_end, artist)
+        created, updated = store_events(raw_events, run.started_at)
+        run.fetched += len(raw_events)
+        run.created += created
+        run.updated += updated
+        run.truncated = run.truncated or truncated
+
+        # Events no longer listed in a fully fetched, unfiltered window were cancelled or removed
+        if not artist and not truncated:
+            _, deleted = TicketmasterEvent.objects.filter(
+                date__range=(window_start, window_end), synced_at__lt=run.started_at
+            ).delete()
+            run.deleted += deleted.get(TicketmasterEvent._meta.label, 0)
+        logger.info("Synced %s..%s: %d fetched, %d new, %d changed", window_start, window_end, len(raw_events), created, updated)
+
+    run.deleted += purge_expired_events()
+    run.finished_at = timezone.now()
+    run.save()
+    logger.info("Sync %s finished: %d fetched, %d created, %d updated, %d deleted",
+                run, run.fetched, run.created, run.updated, run.deleted)
+    return run
+
+def refresh_venue_index() -> int:
+    """
+    Adds the stored venues to this process's venue index once per completed sync, so venues synced
+    in the worker reach the web processes. Cheap when nothing was synced since the last call.
+
+    Returns:
+        int: Number of venues added or moved.
+    """
+    global _indexed_sync_id
+    latest = (
+        TicketmasterSync.objects
+        .filter(finished_at__isnull=False)
+        .order_by('-finished_at')
+        .values_list('id', flat=True)
+        .first()
+    )
+    if latest is None or latest == _indexed_sync_id:
+        return 0
+    with _indexed_sync_lock:
+        if latest == _indexed_sync_id:
+            return 0
+        venues = TicketmasterVenue.objects.filter(latitude__isnull=False, longitude__isnull=False).values(*VENUE_FIELDS)
+        changed = get_venue_index().add_venues(venues.iterator(chunk_size=BATCH_SIZE))
+        _indexed_sync_id = latest
+    if changed:
+        logger.info("Added %d stored venues to the venue index", changed)
+    return changed
+
+def local_store_covers(artist: str, start_date: Optional[str], end_date: Optional[str]) -> bool:
+    """
+    Whether a recent, complete sync covers a search, so it can be answered from the local store.
+    As with the API, end_date is exclusive. Searches without an end date are open-ended and never covered.
+    """
+    if not end_date:
+        return False
+    start = date.fromisoformat(start_date) if start_date else timezone.localdate()
+    last_day = date.fromisoformat(end_date) - timedelta(days=1)
+    scopes = [''] + ([artist.strip().lower()] if artist else [])
+    return TicketmasterSync.objects.filter(
+        scope__in=scopes,
+        truncated=False,
+        start_date__lte=start,
+        end_date__gte=last_day,
+        finished_at__gte=timezone.now() - LOCAL_STORE_MAX_AGE,
+    ).exists()
+
+def search_local_events(artist: str = '', postalcode: str = '', start_date: Optional[str] = None,
+                        end_date: Optional[str] = None, max_results: int = 100,
+                        venue_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Searches the local store with indexed queries, ordered by date. Takes the search parameters of
+    TicketmasterAPIManager.iter_events; end_date is exclusive as it is there. venue_ids, if given,
+    limits the search to those venues, e.g. the ones the venue index found within a radius.
+
+    Returns:
+        List[Dict[str, Any]]: Event summaries.
+    """
+    events = TicketmasterEvent.objects.all()
+    if start_date:
+        events = events.filter(date__gte=start_date)
+    if end_date:
+        events = events.filter(date__lt=end_date)
+    if postalcode:
+        events = events.filter(venue__postal_code=postalcode)
+    if venue_ids is not None:
+        events = events.filter(venue_id__in=venue_ids)
+    if artist:
+        matching = TicketmasterAttraction.objects.filter(name__iexact=artist).values('id')
+        events = events.filter(Q(attractions__in=matching) | Q(name__icontains=artist)).distinct()
+    return list(events.order_by('date', 'id').values_list('summary', flat=True)[:max_results])
@@ -4,7 +4,11 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('calendar/', views.calendar_view, name='calendar_view'),
+    path('search/', views.event_management_page, name='event_management_page'),
+    path('search-events/', views.search_events, name='search_events'),
     path('api/save-event/', views.save_event, name='save_event'),
     path('api/get-events/', views.get_events, name='get_events'),
     path('api/delete-event/<int:event_id>/', views.delete_event, name='delete_event'),
+    path('api/bulk-save-events/', views.bulk_save_events, name='bulk_save_events'),
+    path('api/bulk-delete-events/', views.bulk_delete_events, name='bulk_delete_events'),
 ]
@@ -1,85 +1,39 @@
+import base64
+import hashlib
 import json
 import logging
-from django.http import JsonResponse
+import time
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils.dateparse import parse_date
 from .models import Event
+from .sync import local_store_covers, refresh_venue_index, search_local_events
 from django.views.decorators.csrf import csrf_exempt
 from integrations.ticketmaster_api_manager import TicketmasterAPIManager
+from shared_services.deadline import DeadlineExceeded, deadline, deadline_at
+from shared_services.geolocation import get_venue_index
+from shared_services.metrics import record_cache
 
 logger = logging.getLogger(__name__)
 ticketmaster = TicketmasterAPIManager()
 
-# # Render the main event management page
-# def event_management_page(request):
-#     return render(request, 'event_management/event_management_page.html')
-
-# def search_events(request):
-#     if request.method != "GET":
-#         return JsonResponse({"error": "Invalid request method. Use GET."}, status=405)
-
-#     # Get query parameters
-#     artist = request.GET.get("artist", "").strip()
-#     postal_code = request.GET.get("zipCode", "").strip()
-#     radius = request.GET.get("radius", "").strip()
-#     start_date = request.GET.get("startDate", "").strip()
-#     end_date = request.GET.get("endDate", "").strip()
-
-#     # Log the received parameters
-#     logger.debug(f"Received search parameters: artist={artist}, postal_code={postal_code}, radius={radius}, start_date={start_date}, end_date={end_date}")
-
-#     # Validate radius
-#     if radius and not radius.isdigit():
-#         return JsonResponse({"error": "Radius must be a numeric value."}, status=400)
-
-#     # Validate start_date and end_date
-#     try:
-#         if start_date:
-#             # Ensure valid date format (Ticketmaster expects YYYY-MM-DD)
-#             start_date = start_date.strip()
-#             # You can add further date validation here if necessary
-
-#         if end_date:
-#             end_date = end_date.strip()
-
-#     except ValueError as e:
-#         return JsonResponse({"error": f"Invalid date format: {str(e)}"}, status=400)
-
-#     # Ensure at least one search parameter is provided
-#     if not (artist or postal_code or start_date or end_date):
-#         return JsonResponse({"error": "At least one search parameter is required."}, status=400)
-
-#     try:
-#         # Fetch events using the Ticketmaster API
-#         events = ticketmaster.fetch_events(
-#             artist=artist,
-#             postalcode=postal_code,
-#             radius=int(radius) if radius else None,
-#             start_date=start_date,
-#             end_date=end_date,
-#         )
-
-#         # Log the raw API response (for debugging purposes)
-#         logger.debug(f"API response: {events}")
-
-#         # Format the response for the frontend
-#         event_data = [
-#             {
-#                 "artist": event.get("artist", "Unknown"),
-#                 "name": event.get("name", "Unknown"),
-#                 "venue": event.get("venue", "Unknown"),
-#                 "date": event.get("date", "Unknown"),
-#                 "location": event.get("location", "Unknown"),
-#             }
-#             for event in events
-#         ]
-
-#         # Return the formatted response
-#         return JsonResponse(event_data, safe=False)
-
-#     except Exception as e:
-#         logger.error(f"Error in search_events: {str(e)}", exc_info=True)
-#         return JsonResponse({"error": f"An error occurred: {str(e)}"}, status=500)
+# Calendar listing page sizes
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+# Upper bound on items accepted by the bulk endpoints in one request
+MAX_BULK_ITEMS = 1000
+
+# Event search results
+DEFAULT_SEARCH_LIMIT = 100
+EVENT_SEARCH_CACHE_TTL = 15 * 60  # seconds
+SEARCH_RESULT_FIELDS = ['id', 'artist', 'name', 'venue', 'venue_id', 'date', 'location', 'latitude', 'longitude']
+# Time budget for an upstream event search; events found by then are returned, uncached
+SEARCH_DEADLINE = 10.0  # seconds
 
 # Homepage route
 def home(request):
@@ -88,29 +42,349 @@ def home(request):
 def calendar_view(request):
     return render(request, 'event_management/calendar.html')
 
+# Render the main event management page
+def event_management_page(request):
+    return render(request, 'event_management/event_management_page.html')
+
+def _parse_search_params(query):
+    """
+    Validates the event search query parameters.
+
+    Returns:
+        dict: Normalized search parameters, also used to build the cache key.
+
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+    artist = query.get("artist", "").strip()
+    postal_code = query.get("zipCode", "").strip()
+    radius = query.get("radius", "").strip()
+    start_date = query.get("startDate", "").strip()
+    end_date = query.get("endDate", "").strip()
+    limit = query.get("limit", "").strip()
+
+    if radius and not radius.isdigit():
+        raise ValueError("Radius must be a numeric value.")
+    if limit and not limit.isdigit():
+        raise ValueError("Limit must be a numeric value.")
+
+    # Ticketmaster expects YYYY-MM-DD
+    for label, value in (("startDate", start_date), ("endDate", end_date)):
+        if value and parse_date(value) is None:
+            raise ValueError(f"Invalid date format for {label}: {value}")
+    if start_date and end_date and end_date < start_date:
+        raise ValueError("endDate must not be before startDate.")
+
+    if not (artist or postal_code or start_date or end_date):
+        raise ValueError("At least one search parameter is required.")
+
+    return {
+        "artist": artist,
+        "postalcode": postal_code,
+        "radius": int(radius) if radius else None,
+        "start_date": start_date,
+        "end_date": end_date,
+        "max_results": min(int(limit) if limit else DEFAULT_SEARCH_LIMIT, TicketmasterAPIManager.DEEP_PAGING_LIMIT),
+    }
+
+def _parse_geo_filter(query):
+    """
+    Validates the optional latitude/longitude/radius filter, which is applied locally against the venue index.
+    Ticketmaster is only sent the area for searches by date alone.
+
+    Returns:
+        tuple: (latitude, longitude, radius in miles), or None when no coordinates were given.
+
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+    latitude = query.get("latitude", "").strip()
+    longitude = query.get("longitude", "").strip()
+    if not (latitude or longitude):
+        return None
+
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except ValueError:
+        raise ValueError("latitude and longitude must both be numeric values.")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("latitude or longitude out of range.")
+
+    radius = query.get("radius", "").strip()
+    if not radius.isdigit():
+        raise ValueError("A numeric radius is required with latitude and longitude.")
+    return latitude, longitude, int(radius)
+
+def _fetch_search_results(params, cache_key):
+    """
+    Fetches compact search results, caches them, and adds their venues to the venue index.
+    If the search deadline passes first, the events fetched so far are returned without caching.
+    """
+    results = []
+    try:
+        with deadline(SEARCH_DEADLINE):
+            for event in ticketmaster.iter_events(**params):
+                results.append(TicketmasterAPIManager.summarize_event(event, SEARCH_RESULT_FIELDS))
+    except DeadlineExceeded:
+        logger.warning("Event search deadline exceeded; returning %d partial results", len(results))
+    else:
+        cache.set(cache_key, results, EVENT_SEARCH_CACHE_TTL)
+    get_venue_index().add_from_events(results)
+    return results
+
+def _stream_search_results(events, expires, cache_key):
+    """
+    Streams compact search results as a JSON array while pages are fetched, then caches the full list.
+
+    Args:
+        events: Iterator of raw events, from TicketmasterAPIManager.iter_events.
+        expires (float): time.monotonic() value at which fetching stops.
+        cache_key (str): Key the complete results are cached under.
+    """
+    results = []
+    yield '['
+    try:
+        # The deadline is entered around each fetch only: a context variable set here must not stay set while suspended at a yield
+        while True:
+            with deadline_at(expires):
+                event = next(events, None)
+            if event is None:
+                break
+            summary = TicketmasterAPIManager.summarize_event(event, SEARCH_RESULT_FIELDS)
+            yield (',' if results else '') + json.dumps(summary, cls=DjangoJSONEncoder)
+            results.append(summary)
+    except DeadlineExceeded:
+        logger.warning("Event search deadline exceeded; streamed %d partial results", len(results))
+        yield ']'
+        return
+    except Exception as e:
+        # Headers are already sent; end the array and keep the partial result out of the cache
+        logger.error("Error in search_events: %s", e, exc_info=True)
+        yield ']'
+        return
+    yield ']'
+    cache.set(cache_key, results, EVENT_SEARCH_CACHE_TTL)
+    get_venue_index().add_from_events(results)
+
+def search_events(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid request method. Use GET."}, status=405)
+
+    try:
+        params = _parse_search_params(request.GET)
+        geo_filter = _parse_geo_filter(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if geo_filter:
+        if not (params["artist"] or params["start_date"] or params["end_date"]):
+            return JsonResponse({"error": "latitude/longitude searches need an artist or a date range."}, status=400)
+        # The radius belongs to the geo filter, not to a postal code search
+        params["radius"] = None
+        # Pick up venues synced by the worker since the last geo search
+        refresh_venue_index()
+
+    logger.debug("Received search parameters: %s (geo filter %s)", params, geo_filter)
+
+    # Serve from the synced local store when it covers the search; postal code radius searches need the API
+    covered = not params["radius"] and local_store_covers(params["artist"], params["start_date"], params["end_date"])
+    record_cache('local_event_store', covered)
+    if covered:
+        # The venue index holds every stored venue, so the geo filter runs in the query, before the limit
+        venue_ids = [venue['id'] for venue, _ in get_venue_index().within_radius(*geo_filter)] if geo_filter else None
+        results = [
+            {field: summary.get(field) for field in SEARCH_RESULT_FIELDS}
+            for summary in search_local_events(
+                params["artist"], params["postalcode"], params["start_date"], params["end_date"], params["max_results"],
+                venue_ids=venue_ids,
+            )
+        ]
+        return JsonResponse(results, safe=False)
+
+    limit = params["max_results"]
+    if geo_filter:
+        if params["artist"]:
+            # Every radius around any point shares one search of all the artist's events, filtered
+            # locally; the limit applies after filtering so nearby shows are not cut off
+            params["max_results"] = TicketmasterAPIManager.DEEP_PAGING_LIMIT
+        else:
+            # A date range alone matches more events nationwide than deep paging reaches, so the
+            # search is narrowed to the area upstream
+            params["latitude"], params["longitude"], params["radius"] = geo_filter
+
+    cache_key = 'event_search:' + hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    cached_results = cache.get(cache_key)
+    record_cache('event_search', cached_results is not None)
+
+    if geo_filter:
+        if cached_results is None:
+            try:
+                cached_results = _fetch_search_results(params, cache_key)
+            except Exception as e:
+                logger.error("Error in search_events: %s", e, exc_info=True)
+                return JsonResponse({"error": "Event search failed."}, status=502)
+        return JsonResponse(get_venue_index().filter_events(cached_results, *geo_filter)[:limit], safe=False)
+
+    if cached_results is not None:
+        return JsonResponse(cached_results, safe=False)
+
+    # The artist's attraction id is resolved here, before the 200 status is sent, so a failed lookup is still an error response
+    expires = time.monotonic() + SEARCH_DEADLINE
+    try:
+        with deadline_at(expires):
+            events = ticketmaster.iter_events(**params)
+    except DeadlineExceeded:
+        return JsonResponse({"error": "Ticketmaster did not answer in time."}, status=504)
+    except Exception as e:
+        logger.error("Error in search_events: %s", e, exc_info=True)
+        return JsonResponse({"error": "Event search failed."}, status=502)
+    return StreamingHttpResponse(_stream_search_results(events, expires, cache_key), content_type='application/json')
+
+def _build_event(data):
+    """
+    Validates event data from a request and builds an unsaved Event.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Invalid event data')
+    event_name = data.get('name')
+    event_location = data.get('location')
+    event_date = data.get('date')
+    event_date = parse_date(event_date) if isinstance(event_date, str) else None
+
+    invalid = [field for field, value in (('name', event_name), ('location', event_location), ('date', event_date)) if not value]
+    if invalid:
+        raise ValueError(f"Invalid event data: missing or invalid {', '.join(invalid)}")
+    return Event(name=event_name, location=event_location, date=event_date)
+
+def _load_bulk_items(request, key):
+    """
+    Reads the list of items for a bulk endpoint; accepts either a bare JSON array or {key: [...]}.
+
+    Raises:
+        ValueError: If the body is not a list of at most MAX_BULK_ITEMS items.
+    """
+    data = json.loads(request.body)
+    items = data.get(key) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"Expected a non-empty list of {key}")
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"At most {MAX_BULK_ITEMS} {key} per request")
+    return items
+
 @csrf_exempt
 def save_event(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            event_name = data.get('name')
-            event_location = data.get('location')
-            event_date = parse_date(data.get('date'))
+            try:
+                event = _build_event(data)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
 
-            if not event_name or not event_location or not event_date:
-                return JsonResponse({'error': 'Invalid event data'}, status=400)
-
-            Event.objects.create(name=event_name, location=event_location, date=event_date)
+            event.save()
             return JsonResponse({'message': 'Event saved successfully!'})
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
     return JsonResponse({'error': 'Invalid request method'}, status=405)
 
+@csrf_exempt
+def bulk_save_events(request):
+    """
+    Saves many events in one transaction. Every item is validated first; if any is invalid
+    nothing is saved and the per-item errors are returned.
+    """
+    if request.method == 'POST':
+        try:
+            items = _load_bulk_items(request, 'events')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        events, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                events.append(_build_event(item))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+
+        if errors:
+            return JsonResponse({'error': 'Invalid event data', 'errors': errors}, status=400)
+
+        try:
+            with transaction.atomic():
+                created = Event.objects.bulk_create(events)
+        except Exception as e:
+            logger.error("Bulk event save failed: %s", e, exc_info=True)
+            return JsonResponse({'error': str(e)}, status=500)
+
+        return JsonResponse({
+            'message': f'{len(created)} events saved successfully!',
+            'ids': [event.id for event in created],
+        })
+    return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+def _parse_range_date(value):
+    """
+    Parses a date range boundary. FullCalendar sends ISO datetimes (e.g. 2025-01-26T00:00:00-05:00),
+    so only the date part is used.
+    """
+    if not value:
+        return None
+    date = parse_date(value[:10])
+    if date is None:
+        raise ValueError(f"Invalid date: {value}")
+    return date
+
+def _encode_cursor(event):
+    return base64.urlsafe_b64encode(f"{event['date'].isoformat()}|{event['id']}".encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        date_str, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        date = parse_date(date_str)
+        if date is None:
+            raise ValueError
+        return date, int(event_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
 def get_events(request):
+    """
+    Lists saved events ordered by (date, id).
+
+    Query params:
+        start / end: Optional date window (end is exclusive, like FullCalendar's visible range).
+        limit: Page size, capped at MAX_PAGE_SIZE.
+        cursor: Opaque cursor from a previous page's next_cursor (keyset pagination).
+    """
     if request.method == 'GET':
-        # Query the database for all events
-        events = Event.objects.all().values('id', 'name', 'location', 'date')
-        return JsonResponse(list(events), safe=False)
+        try:
+            start = _parse_range_date(request.GET.get('start'))
+            end = _parse_range_date(request.GET.get('end'))
+            limit = min(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError("limit must be positive")
+            cursor = request.GET.get('cursor')
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        events = Event.objects.order_by('date', 'id')
+        if start:
+            events = events.filter(date__gte=start)
+        if end:
+            events = events.filter(date__lt=end)
+        if after:
+            after_date, after_id = after
+            events = events.filter(Q(date__gt=after_date) | Q(date=after_date, id__gt=after_id))
+
+        # Fetch one extra row to know whether another page exists
+        page = list(events.values('id', 'name', 'location', 'date')[:limit + 1])
+        next_cursor = _encode_cursor(page[limit - 1]) if len(page) > limit else None
+
+        return JsonResponse({'events': page[:limit], 'next_cursor': next_cursor})
     return JsonResponse({'error': 'Invalid request method'}, status=405)
 
 @csrf_exempt
@@ -124,3 +398,35 @@ def delete_event(request, event_id):
         except Event.DoesNotExist:
             return JsonResponse({'error': 'Event not found'}, status=404)
     return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+@csrf_exempt
+def bulk_delete_events(request):
+    """
+    Deletes many events with a single filtered delete. Ids that do not exist are reported back.
+    """
+    if request.method in ('POST', 'DELETE'):
+        try:
+            items = _load_bulk_items(request, 'ids')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        errors = [
+            {'index': index, 'error': 'Invalid event id'}
+            for index, item in enumerate(items)
+            if not isinstance(item, int) or isinstance(item, bool)
+        ]
+        if errors:
+            return JsonResponse({'error': 'Invalid event ids', 'errors': errors}, status=400)
+
+        event_ids = set(items)
+        with transaction.atomic():
+            events = Event.objects.filter(id__in=event_ids)
+            found_ids = set(events.values_list('id', flat=True))
+            events.delete()
+
+        return JsonResponse({
+            'message': f'{len(found_ids)} events deleted successfully!',
+            'deleted': sorted(found_ids),
+            'not_found': sorted(event_ids - found_ids),
+        })
+    return JsonResponse({'error': 'Invalid request method'}, status=405)
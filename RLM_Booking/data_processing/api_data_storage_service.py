@@ -1,22 +1,29 @@
+import csv
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from integrations.spotify_api_manager import SpotifyAPIManager
-from utils.data_writer import DataWriter
-from utils.progress_manager import ProgressManager
+from integrations.ticketmaster_api_manager import TicketmasterAPIManager
+from shared_services.profiling import profile_job
+from data_processing.utils.data_writer import DataWriter
+from data_processing.utils.progress_manager import ProgressManager
 
 class APIDataStorageService:
-    def __init__(self, data_writer: DataWriter, progress_manager: ProgressManager):
+    def __init__(self, data_writer: DataWriter, progress_manager: ProgressManager, playlist_writer: Optional[DataWriter] = None):
         """
         Constructor for APIDataStorageService.
 
         Args:
             data_writer (DataWriter): An instance of DataWriter, a module to store fetched data.
             progress_manager (ProgressManager): An instance of ProgressManager, a module to start from the most recent fetched data.
+            playlist_writer (Optional[DataWriter]): Stores each crawled (playlist_id, artist_name) pair, so that artist
+                similarity can use playlist co-occurrence.
         """
         self.data_writer = data_writer
         self.progress_manager = progress_manager
-    
+        self.playlist_writer = playlist_writer
+
+    @profile_job('spotify_crawl')
     def fetch_and_save_spotify_data(self, spotify_api_manager: SpotifyAPIManager, data_point_limit: int = 10000) -> None:
         """
         Fetches data from the Spotify API and saves it to a CSV file.
@@ -43,9 +50,12 @@ class APIDataStorageService:
                     if self.progress_manager.should_skip(artist['artist_name'], 'track'):
                         continue
 
+                    if self.playlist_writer is not None:
+                        self.playlist_writer.write_entry_to_csv({'playlist_id': playlist['id'], 'artist_name': artist['artist_name']})
+
                     if self.data_writer.write_entry_to_csv(artist):
                         data_points_collected += 1
-                        logging.info(f"Artist {artist['artist_name']} written to CSV.")
+                        logging.info("Artist %s written to CSV.", artist['artist_name'])
                         
                         self.progress_manager.save_progress(
                             last_category_id=category['id'],
@@ -74,7 +84,3 @@ class APIDataStorageService:
                 country = event.get('_embedded', {}).get('venues', [{}])[0].get('country', {}).get('countryCode')
                 price = event.get('priceRanges', [{}])[0].get('min')
                 writer.writerow([event_name, date, venue, city, state, country, price])
-                    
-# background task scheduler to avoid rate limits and update ML data
-# Ask Copilot about using Celery to run this service
-    # Celery runs this in the background every period you set (ex. 1 hour)
\ No newline at end of file
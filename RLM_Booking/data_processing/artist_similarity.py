@@ -0,0 +1,179 @@
+"""
+Artist similarity: feature vectors from genres, popularity, followers and (when crawled) playlist
+co-occurrence, with top-k cosine neighbors computed in blocks.
+
+The neighbor table is precomputed offline and stored by the artist_recommendation app:
+    python manage.py build_artist_neighbors --input ../old_flask_app/Data/spotify_data.csv
+"""
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data_processing.features import build_artist_features, genre_vocabulary, read_feature_frame
+from shared_services.artist_search import normalize_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEIGHBORS = 10
+DEFAULT_BLOCK_SIZE = 1024
+DEFAULT_MAX_GENRES = 300
+
+# Relative weight of each feature group in the similarity (each group is unit-normalized first)
+FEATURE_WEIGHTS = {
+    'genre': 1.0,
+    'playlist': 0.8,
+    'popularity': 0.3,
+    'followers': 0.3,
+}
+
+def load_artists(paths: List[Union[str, Path]]) -> pd.DataFrame:
+    """
+    Reads crawled artist CSVs into one row per artist (by normalized name), keeping the most popular row.
+
+    Returns:
+        pd.DataFrame: Columns artist_name, artist_key, genre, popularity, followers.
+    """
+    frames = [read_feature_frame(path, usecols=['artist_name', 'name', 'genre', 'popularity', 'followers']) for path in paths]
+    artists = pd.concat(frames, ignore_index=True).rename(columns={'name': 'artist_name'})
+    artists = artists[artists['artist_name'].notna()].copy()
+    artists['genre'] = artists['genre'].astype(object).fillna('')
+    artists['artist_key'] = artists['artist_name'].astype(str).map(normalize_name)
+    artists = artists[artists['artist_key'] != '']
+    artists = artists.sort_values('popularity', ascending=False, na_position='last').drop_duplicates('artist_key')
+    return artists.reset_index(drop=True)
+
+def load_playlist_memberships(path: Union[str, Path], artist_keys: pd.Series) -> Optional[sparse.csr_matrix]:
+    """
+    Builds the artist x playlist incidence matrix from a crawl file of (playlist_id, artist_name) rows.
+
+    Returns:
+        Optional[sparse.csr_matrix]: One row per artist in artist_keys order, or None if the file is missing.
+    """
+    if not Path(path).is_file():
+        logger.info("No playlist memberships at %s; similarity will not use co-occurrence", path)
+        return None
+    memberships = pd.read_csv(path, usecols=['playlist_id', 'artist_name'], dtype='string').dropna()
+    positions = pd.Series(np.arange(len(artist_keys)), index=artist_keys.to_numpy())
+    rows = memberships['artist_name'].astype(str).map(normalize_name).map(positions)
+    known = rows.notna().to_numpy()
+    playlists = memberships['playlist_id'][known].astype('category')
+    matrix = sparse.csr_matrix(
+        (np.ones(known.sum(), dtype=np.float32), (rows[known].astype(int).to_numpy(), playlists.cat.codes.to_numpy())),
+        shape=(len(artist_keys), len(playlists.cat.categories)),
+    )
+    # Repeated (playlist, artist) rows collapse to one membership
+    matrix.data[:] = 1.0
+    return matrix
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def build_similarity_features(artists: pd.DataFrame,
+                              playlists: Optional[sparse.csr_matrix] = None,
+                              max_genres: int = DEFAULT_MAX_GENRES) -> Tuple[np.ndarray, Optional[sparse.csr_matrix]]:
+    """
+    Builds weighted, L2-normalized artist vectors so that a dot product is the cosine similarity.
+
+    Args:
+        artists (pd.DataFrame): One row per artist with genre, popularity and followers.
+        playlists (Optional[sparse.csr_matrix]): Artist x playlist incidence matrix.
+        max_genres (int): Genre vocabulary size.
+
+    Returns:
+        Tuple[np.ndarray, Optional[sparse.csr_matrix]]: The dense part (genres, popularity, followers)
+        and the sparse playlist part; together they form unit-length rows.
+    """
+    features = build_artist_features(artists, genre_vocabulary(artists['genre'], max_genres))
+    genres = _normalize_rows(features.filter(like='genre_').to_numpy(dtype=np.float32))
+    popularity = features[['popularity']].to_numpy(dtype=np.float32) / 100
+    followers = features[['log_followers']].to_numpy(dtype=np.float32)
+    followers = followers / max(float(followers.max()), 1.0)
+
+    dense = np.hstack([
+        FEATURE_WEIGHTS['genre'] * genres,
+        FEATURE_WEIGHTS['popularity'] * popularity,
+        FEATURE_WEIGHTS['followers'] * followers,
+    ]).astype(np.float32)
+
+    playlist_part = None
+    if playlists is not None and playlists.nnz:
+        row_norms = np.sqrt(np.asarray(playlists.multiply(playlists).sum(axis=1)).ravel())
+        scale = np.divide(FEATURE_WEIGHTS['playlist'], row_norms, out=np.zeros_like(row_norms), where=row_norms > 0)
+        playlist_part = sparse.diags(scale.astype(np.float32)) @ playlists
+
+    # Normalize the combined rows
+    norms = np.sum(dense ** 2, axis=1)
+    if playlist_part is not None:
+        norms = norms + np.asarray(playlist_part.multiply(playlist_part).sum(axis=1)).ravel()
+    scale = np.divide(1.0, np.sqrt(norms), out=np.zeros_like(norms), where=norms > 0).astype(np.float32)
+    dense *= scale[:, None]
+    if playlist_part is not None:
+        playlist_part = (sparse.diags(scale) @ playlist_part).tocsr()
+    return dense, playlist_part
+
+def top_k_neighbors(dense: np.ndarray,
+                    playlist_part: Optional[sparse.csr_matrix] = None,
+                    k: int = DEFAULT_NEIGHBORS,
+                    block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes each artist's k most similar artists. Similarities are computed one block of rows at a
+    time, so memory stays at block_size x n instead of n x n.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n x k) neighbor indices and cosine similarities, best first.
+    """
+    n = dense.shape[0]
+    k = min(k, n - 1)
+    indices = np.zeros((n, max(k, 0)), dtype=np.int64)
+    scores = np.zeros((n, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return indices, scores
+
+    transposed = playlist_part.T.tocsr() if playlist_part is not None else None
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        similarity = dense[start:stop] @ dense.T
+        if transposed is not None:
+            similarity += (playlist_part[start:stop] @ transposed).toarray()
+        # Exclude each artist from its own neighbors
+        similarity[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(similarity, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        indices[start:stop] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:stop] = np.take_along_axis(candidate_scores, order, axis=1)
+        logger.debug("Computed neighbors for artists %d-%d of %d", start, stop, n)
+    return indices, scores
+
+def compute_artist_neighbors(paths: List[Union[str, Path]],
+                             playlist_path: Optional[Union[str, Path]] = None,
+                             k: int = DEFAULT_NEIGHBORS,
+                             block_size: int = DEFAULT_BLOCK_SIZE,
+                             max_genres: int = DEFAULT_MAX_GENRES) -> pd.DataFrame:
+    """
+    Computes the neighbor table for crawled artists.
+
+    Returns:
+        pd.DataFrame: Columns artist_key, artist_name, rank (1-based), neighbor_name, score.
+    """
+    artists = load_artists(paths)
+    playlists = load_playlist_memberships(playlist_path, artists['artist_key']) if playlist_path else None
+    dense, playlist_part = build_similarity_features(artists, playlists, max_genres)
+    indices, scores = top_k_neighbors(dense, playlist_part, k, block_size)
+    logger.info("Computed %d neighbors for %d artists", indices.shape[1], len(artists))
+
+    k = indices.shape[1]
+    names = artists['artist_name'].astype(str).to_numpy()
+    return pd.DataFrame({
+        'artist_key': np.repeat(artists['artist_key'].to_numpy(), k),
+        'artist_name': np.repeat(names, k),
+        'rank': np.tile(np.arange(1, k + 1), len(artists)),
+        'neighbor_name': names[indices.ravel()],
+        'score': scores.ravel().round(4),
+    })
@@ -0,0 +1,286 @@
+"""
+Feature engineering shared by model training and serving.
+
+Run as a script for a quick summary of a crawl CSV (replaces the old spotify_EDA.py notebook-style script):
+    python -m data_processing.features ../old_flask_app/Data/spotify_data.csv
+"""
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when feature definitions change so cached feature files are rebuilt
+FEATURE_VERSION = 1
+
+# Default location of cached feature files
+FEATURE_CACHE_DIR = Path(__file__).resolve().parent.parent / 'ml_artifacts' / 'feature_cache'
+
+# Used when an event's venue does not report a capacity (Ticketmaster rarely does)
+DEFAULT_VENUE_CAPACITY = 5000
+
+# Column aliases across our data sources (Spotify crawl + Ticketmaster enrichment, synthetic generator)
+COLUMN_ALIASES = {
+    'name': 'artist_name',
+    'avg_ticket_price': 'ticket_price',
+    'capacity': 'venue_capacity',
+}
+
+# Explicit dtypes for the text columns of our CSVs (crawl, enrichment, synthetic generator).
+# Genre strings repeat heavily, so they are read as categoricals.
+TEXT_DTYPES = {
+    'artist_name': 'string',
+    'name': 'string',
+    'genre': 'category',
+    'external_url': 'string',
+    'venue_name': 'string',
+    'city': 'category',
+    'state': 'category',
+    'date': 'string',
+}
+# Numeric columns are coerced after reading since some sources write placeholders like 'Unknown'
+NUMERIC_DTYPES = {
+    'popularity': 'float32',
+    'followers': 'float64',
+    'venue_capacity': 'float32',
+    'capacity': 'float32',
+}
+
+# Numeric features, in model column order; genre indicator columns follow them
+BASE_FEATURE_COLUMNS = [
+    'popularity',
+    'log_followers',
+    'log_venue_capacity',
+    'month_sin',
+    'month_cos',
+    'is_weekend',
+]
+
+def read_feature_csv(path: Union[str, Path],
+                     usecols: Optional[List[str]] = None,
+                     chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV in chunks with explicit dtypes: text columns from TEXT_DTYPES, numeric columns
+    from NUMERIC_DTYPES (unparseable values become NaN). Other columns are read as-is.
+
+    Args:
+        path (Union[str, Path]): The CSV file.
+        usecols (Optional[List[str]]): Columns to keep; missing ones are ignored. All columns when omitted.
+        chunksize (int): Rows per chunk.
+
+    Yields:
+        pd.DataFrame: Typed chunks.
+    """
+    keep = (lambda column: column in usecols) if usecols is not None else None
+    reader = pd.read_csv(path, usecols=keep, dtype=TEXT_DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        for column, dtype in NUMERIC_DTYPES.items():
+            if column in chunk:
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(dtype)
+        yield chunk
+
+def read_feature_frame(path: Union[str, Path], usecols: Optional[List[str]] = None, chunksize: int = 100_000) -> pd.DataFrame:
+    """
+    Reads a whole CSV through read_feature_csv.
+    """
+    chunks = list(read_feature_csv(path, usecols, chunksize))
+    # Concatenating categoricals with different categories would fall back to object; union them instead
+    frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=usecols or [])
+    for column, dtype in TEXT_DTYPES.items():
+        if dtype == 'category' and column in frame and frame[column].dtype != 'category':
+            frame[column] = frame[column].astype('category')
+    return frame
+
+def normalize_genres(genres: pd.Series) -> pd.Series:
+    """
+    Normalizes comma-joined genre strings (e.g. "Art Pop,  dance pop") to lowercase, comma-separated tokens.
+
+    Args:
+        genres (pd.Series): Comma-joined genre strings; missing values become empty strings.
+
+    Returns:
+        pd.Series: Normalized genre strings.
+    """
+    return (
+        genres.astype(object).fillna('')
+        .astype(str)
+        .str.lower()
+        .str.replace(r'\s*,\s*', ',', regex=True)
+        .str.strip(', ')
+    )
+
+def genre_vocabulary(genres: pd.Series, max_genres: int = 50) -> List[str]:
+    """
+    Picks the most frequent genres as the vocabulary for multi-hot encoding.
+
+    Args:
+        genres (pd.Series): Comma-joined genre strings.
+        max_genres (int): Maximum vocabulary size.
+
+    Returns:
+        List[str]: Genres ordered by frequency.
+    """
+    tokens = normalize_genres(genres).str.split(',').explode()
+    tokens = tokens[tokens != '']
+    return tokens.value_counts().head(max_genres).index.tolist()
+
+def multi_hot_genres(genres: pd.Series, vocabulary: List[str]) -> np.ndarray:
+    """
+    Multi-hot encodes comma-joined genre strings against a vocabulary. Each distinct genre string is
+    encoded once and rows are gathered by category code, so repeated strings cost nothing extra.
+
+    Args:
+        genres (pd.Series): Comma-joined genre strings (object or categorical).
+        vocabulary (List[str]): Genres to encode, one column each.
+
+    Returns:
+        np.ndarray: A (rows x len(vocabulary)) uint8 matrix.
+    """
+    if len(genres) == 0:
+        return np.zeros((0, len(vocabulary)), dtype=np.uint8)
+
+    categorical = normalize_genres(genres).astype('category')
+    categories = pd.Series(categorical.cat.categories, dtype=object)
+    encoded = (
+        categories.str.get_dummies(sep=',')
+        .reindex(columns=vocabulary, fill_value=0)
+        .to_numpy(dtype=np.uint8)
+    )
+    return encoded[categorical.cat.codes.to_numpy()]
+
+def log_followers(followers: pd.Series) -> np.ndarray:
+    """
+    Log-scales follower counts (log1p), which span several orders of magnitude.
+    """
+    return np.log1p(pd.to_numeric(followers, errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float))
+
+def build_artist_features(frame: pd.DataFrame, vocabulary: List[str]) -> pd.DataFrame:
+    """
+    Builds artist-level features: popularity, log followers and multi-hot genres.
+
+    Args:
+        frame (pd.DataFrame): One row per artist with 'popularity', 'followers' and 'genre' columns.
+        vocabulary (List[str]): Genres to encode.
+
+    Returns:
+        pd.DataFrame: Feature columns 'popularity', 'log_followers' and 'genre_<name>', aligned with frame's index.
+    """
+    genres = multi_hot_genres(frame['genre'], vocabulary)
+    features = pd.DataFrame(genres, columns=[f'genre_{genre}' for genre in vocabulary], index=frame.index)
+    features.insert(0, 'log_followers', log_followers(frame['followers']))
+    features.insert(0, 'popularity', pd.to_numeric(frame['popularity'], errors='coerce').fillna(0).clip(0, 100).to_numpy(dtype=float))
+    return features
+
+def build_sales_features(frame: pd.DataFrame, vocabulary: List[str]) -> np.ndarray:
+    """
+    Builds the sales model feature matrix with vectorized column operations.
+
+    Args:
+        frame (pd.DataFrame): One row per event with 'popularity', 'followers', 'genre'
+            (comma-joined) and optionally 'venue_capacity' and 'date' (YYYY-MM-DD) columns.
+        vocabulary (List[str]): Genres to encode, as stored with the trained model.
+
+    Returns:
+        np.ndarray: A float matrix with BASE_FEATURE_COLUMNS followed by one indicator column per genre.
+    """
+    popularity = pd.to_numeric(frame['popularity'], errors='coerce').fillna(0).clip(0, 100)
+
+    capacity = frame['venue_capacity'] if 'venue_capacity' in frame else pd.Series(np.nan, index=frame.index)
+    capacity = pd.to_numeric(capacity, errors='coerce').fillna(DEFAULT_VENUE_CAPACITY).clip(lower=0)
+
+    dates = frame['date'] if 'date' in frame else pd.Series(pd.NaT, index=frame.index)
+    dates = pd.to_datetime(dates, errors='coerce')
+    month_angle = 2 * np.pi * (dates.dt.month.fillna(0).to_numpy() - 1) / 12
+    has_date = dates.notna().to_numpy()
+
+    numeric = np.column_stack([
+        popularity.to_numpy(dtype=float),
+        log_followers(frame['followers']),
+        np.log1p(capacity.to_numpy(dtype=float)),
+        np.where(has_date, np.sin(month_angle), 0.0),
+        np.where(has_date, np.cos(month_angle), 0.0),
+        (dates.dt.dayofweek >= 5).to_numpy(dtype=float),
+    ])
+
+    genres = frame['genre'] if 'genre' in frame else pd.Series('', index=frame.index)
+    return np.hstack([numeric, multi_hot_genres(genres, vocabulary)])
+
+def features_cache_key(paths: List[Union[str, Path]], params: Dict[str, Any]) -> str:
+    """
+    Hashes the input files' contents together with the feature parameters and FEATURE_VERSION.
+
+    Args:
+        paths (List[Union[str, Path]]): Input files.
+        params (Dict[str, Any]): JSON-serializable parameters that affect the features.
+
+    Returns:
+        str: A hex digest identifying the feature set.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'version': FEATURE_VERSION, 'params': params}, sort_keys=True).encode())
+    for path in sorted(str(path) for path in paths):
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def cached_features(paths: List[Union[str, Path]],
+                    params: Dict[str, Any],
+                    build: Callable[[], pd.DataFrame],
+                    cache_dir: Union[str, Path] = FEATURE_CACHE_DIR) -> pd.DataFrame:
+    """
+    Returns features from a Parquet cache keyed by the input files' hash, building and caching them on a miss.
+
+    Args:
+        paths (List[Union[str, Path]]): Input files the features are derived from.
+        params (Dict[str, Any]): Parameters that affect the features (part of the cache key).
+        build (Callable[[], pd.DataFrame]): Computes the features on a cache miss.
+        cache_dir (Union[str, Path]): Directory of cached feature files.
+
+    Returns:
+        pd.DataFrame: The features.
+    """
+    cache_path = Path(cache_dir) / f"features-{features_cache_key(paths, params)}.parquet"
+    if cache_path.exists():
+        logger.info("Loading cached features from %s", cache_path)
+        return pd.read_parquet(cache_path)
+
+    features = build()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary name first so concurrent readers never see a partial file
+    tmp_path = cache_path.with_suffix('.tmp')
+    try:
+        features.to_parquet(tmp_path, index=True)
+    except ImportError as e:
+        logger.warning("Feature cache disabled, no Parquet engine available: %s", e)
+        return features
+    tmp_path.replace(cache_path)
+    logger.info("Cached features to %s", cache_path)
+    return features
+
+def describe_artists(frame: pd.DataFrame, top_genres: int = 20) -> Dict[str, Any]:
+    """
+    Summarizes an artist CSV: row count, missing values, numeric distribution and top genres.
+    """
+    numeric = frame.select_dtypes('number')
+    return {
+        'rows': len(frame),
+        'missing': frame.isnull().sum().to_dict(),
+        'numeric': numeric.describe().to_dict() if not numeric.empty else {},
+        'top_genres': genre_vocabulary(frame['genre'], top_genres) if 'genre' in frame else [],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize an artist CSV.")
+    parser.add_argument('path')
+    args = parser.parse_args()
+    print(json.dumps(describe_artists(read_feature_frame(args.path)), indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Background jobs that keep the crawled data, the local event store and the artist caches current.
+Each task is registered with shared_services.task_queue and scheduled below; a worker runs them:
+    python manage.py run_worker
+
+Run one now with:
+    python manage.py jobs enqueue sync_ticketmaster_events --arg days=60
+"""
+import logging
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from django.core.management import call_command
+
+from apps.artist_recommendation.cache_warmer import (
+    DEFAULT_TOP_ARTISTS, WARM_INTERVAL, prune_artist_cache, run_budget, warm_artist_caches,
+)
+from apps.event_management.sync import estimated_calls, purge_expired_events, sync_events
+from data_processing.api_data_storage_service import APIDataStorageService
+from data_processing.utils.data_writer import DataWriter
+from data_processing.utils.progress_manager import ProgressManager
+from integrations.spotify_api_manager import SpotifyAPIManager
+from integrations.ticketmaster_to_csv import update_csv_with_ticket_data
+from shared_services.artist_search import DEFAULT_ARTIST_CSV
+from shared_services.quota import LEDGER_RETENTION, WARMER, get_ledger, today
+from shared_services.task_queue import enqueue, get_broker, schedule, task
+
+logger = logging.getLogger(__name__)
+
+SPOTIFY_HOST = 'api.spotify.com'
+TICKETMASTER_HOST = 'app.ticketmaster.com'
+
+ARTIST_CSV_HEADERS = ['artist_name', 'genre', 'popularity', 'followers', 'external_url']
+PLAYLIST_CSV_HEADERS = ['playlist_id', 'artist_name']
+PROGRESS_KEYS = ['last_category_id', 'last_playlist_id', 'last_track_id']
+
+# (playlist_id, artist_name) pairs of the crawl, next to the artist CSV; feeds artist similarity
+PLAYLIST_CSV_NAME = 'playlist_artists.csv'
+
+# Crawl output enriched with ticket sales and prices
+DEFAULT_ENRICHED_CSV = DEFAULT_ARTIST_CSV.with_name('combined_output.csv')
+
+# Artists looked up per enrichment run; the run enriches the ones checked longest ago
+ENRICHMENT_BATCH_SIZE = 500
+
+# Days synced per scheduled sync run
+SYNC_DAYS = 30
+
+# Upper estimates of Ticketmaster calls per run, checked against the remaining daily quota. An enrichment
+# run makes at most one single-result search per artist; see estimated_calls for the sync.
+ENRICHMENT_COST = ENRICHMENT_BATCH_SIZE
+SYNC_COST = estimated_calls(SYNC_DAYS)
+
+# Finished job records are kept this long
+JOB_RETENTION = timedelta(days=7)
+
+@task('spotify_crawl', upstream='spotify', host=SPOTIFY_HOST, time_limit=4 * 3600)
+def spotify_crawl(data_point_limit: int = 10000, output_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Continues the Spotify category/playlist crawl from its saved progress, then queues a rebuild of
+    the similar-artist table if the crawl found new artists or playlist memberships.
+    """
+    output = Path(output_file) if output_file else DEFAULT_ARTIST_CSV
+    data_writer = DataWriter(str(output), headers=ARTIST_CSV_HEADERS)
+    playlist_writer = DataWriter(str(output.with_name(PLAYLIST_CSV_NAME)), headers=PLAYLIST_CSV_HEADERS)
+    progress_manager = ProgressManager(str(output.with_name('progress.json')), progress_keys=PROGRESS_KEYS)
+    before = len(data_writer.existing_entries)
+    memberships_before = len(playlist_writer.existing_entries)
+    APIDataStorageService(data_writer, progress_manager, playlist_writer).fetch_and_save_spotify_data(SpotifyAPIManager(), data_point_limit)
+    added = len(data_writer.existing_entries) - before
+    memberships_added = len(playlist_writer.existing_entries) - memberships_before
+    if added or memberships_added:
+        enqueue('build_artist_neighbors', input_file=str(output))
+    return {'artists': len(data_writer.existing_entries), 'added': added, 'playlist_memberships_added': memberships_added}
+
+@task('build_artist_neighbors', time_limit=3600)
+def build_artist_neighbors(input_file: Optional[str] = None) -> Dict[str, str]:
+    """
+    Recomputes the similar-artist table from the crawled artists and their playlist memberships.
+    """
+    artists = Path(input_file) if input_file else DEFAULT_ARTIST_CSV
+    playlists = artists.with_name(PLAYLIST_CSV_NAME)
+    call_command('build_artist_neighbors', input=[str(artists)], playlists=str(playlists) if playlists.is_file() else None)
+    return {'input_file': str(artists), 'playlists': str(playlists)}
+
+@task('ticketmaster_enrichment', upstream='ticketmaster', host=TICKETMASTER_HOST, cost=ENRICHMENT_COST)
+def ticketmaster_enrichment(input_file: Optional[str] = None, output_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Adds the latest ticket sales and price of the ENRICHMENT_BATCH_SIZE crawled artists checked longest
+    ago to the enriched CSV.
+    """
+    output = output_file or str(DEFAULT_ENRICHED_CSV)
+    enriched = update_csv_with_ticket_data(input_file or str(DEFAULT_ARTIST_CSV), output, limit=ENRICHMENT_BATCH_SIZE)
+    return {'output_file': output, 'enriched': enriched}
+
+@task('sync_ticketmaster_events', upstream='ticketmaster', host=TICKETMASTER_HOST, cost=SYNC_COST)
+def sync_ticketmaster_events(days: int = SYNC_DAYS, artist: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Syncs upcoming events into the local event store; see apps.event_management.sync.
+    """
+    run = sync_events(days=days, artist=artist)
+    return {'fetched': run.fetched, 'created': run.created, 'updated': run.updated,
+            'deleted': run.deleted, 'truncated': run.truncated}
+
+@task('warm_artist_caches', upstream='ticketmaster', host=TICKETMASTER_HOST, cost=run_budget(),
+      time_limit=WARM_INTERVAL.total_seconds(), consumer=WARMER)
+def warm_artist_caches_job(limit: int = DEFAULT_TOP_ARTISTS) -> Dict[str, int]:
+    """
+    Refreshes cached searches and events of the top artists before they expire.
+    """
+    return warm_artist_caches(limit)
+
+@task('sweep_expired')
+def sweep_expired() -> Dict[str, int]:
+    """
+    Deletes past events from the local store, artist cache entries nobody uses, old finished job
+    records and old quota ledger days.
+    """
+    return {
+        'events': purge_expired_events(),
+        'artist_cache': prune_artist_cache(),
+        'jobs': get_broker().prune(time.time() - JOB_RETENTION.total_seconds()),
+        'quota_days': get_ledger().prune(date.fromisoformat(today()) - LEDGER_RETENTION),
+    }
+
+schedule('spotify_crawl', every=timedelta(days=1))
+schedule('ticketmaster_enrichment', every=timedelta(days=1))
+schedule('sync_ticketmaster_events', every=timedelta(hours=6))
+schedule('warm_artist_caches', every=WARM_INTERVAL)
+schedule('sweep_expired', every=timedelta(hours=1))
@@ -0,0 +1,259 @@
+"""
+Synthetic artists, venues, events and saved-calendar rows for load tests and model training.
+
+Everything is sampled with vectorized NumPy so millions of rows generate in seconds. Usage (from the RLM_Booking directory):
+    python -m data_processing.synthetic_data --artists 1000000 --events 5000000 --format parquet --output-dir data/synthetic
+"""
+import argparse
+import logging
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+GENRES = ['pop', 'rock', 'hip hop', 'jazz', 'classical', 'electronic', 'country', 'reggae', 'blues', 'r&b',
+          'indie', 'metal', 'latin', 'folk', 'soul', 'punk']
+FIRST_NAMES = ['Luna', 'Nova', 'Aria', 'Juno', 'Zane', 'Kai', 'Ryder', 'Ava', 'Leo', 'Mila',
+               'Echo', 'Sage', 'Orion', 'Iris', 'Jett', 'Wren', 'Remy', 'Skye', 'Cruz', 'Lyra']
+LAST_NAMES = ['Star', 'Wave', 'Sky', 'Moon', 'Blaze', 'Rex', 'Vale', 'Lux', 'Frost', 'Knight',
+              'Rivers', 'Stone', 'Vega', 'Hollow', 'Drift', 'Ember', 'Cole', 'Reign', 'Haze', 'Fox']
+VENUE_KINDS = ['Hall', 'Theater', 'Arena', 'Ballroom', 'Club', 'Amphitheater', 'Music Hall', 'Pavilion']
+# (city, state, latitude, longitude)
+CITIES = [
+    ('Boston', 'MA', 42.36, -71.06), ('New York', 'NY', 40.71, -74.01), ('Philadelphia', 'PA', 39.95, -75.17),
+    ('Washington', 'DC', 38.91, -77.04), ('Atlanta', 'GA', 33.75, -84.39), ('Chicago', 'IL', 41.88, -87.63),
+    ('Nashville', 'TN', 36.16, -86.78), ('Austin', 'TX', 30.27, -97.74), ('Denver', 'CO', 39.74, -104.99),
+    ('Seattle', 'WA', 47.61, -122.33), ('San Francisco', 'CA', 37.77, -122.42), ('Los Angeles', 'CA', 34.05, -118.24),
+]
+
+def _pick(rng: np.random.Generator, choices, size: int) -> np.ndarray:
+    return np.asarray(choices, dtype=object)[rng.integers(0, len(choices), size)]
+
+def generate_artists(num_artists: int, rng: np.random.Generator, zipf_exponent: float = 1.1) -> pd.DataFrame:
+    """
+    Generates artists whose followers follow a Zipf-like (power-law) distribution over popularity rank,
+    so a few artists are huge and most are small, as on Spotify.
+
+    Args:
+        num_artists (int): Number of artists.
+        rng (np.random.Generator): Random generator.
+        zipf_exponent (float): Power-law exponent for followers by rank.
+
+    Returns:
+        pd.DataFrame: artist_id, artist_name, genre (comma-joined), popularity (0-100), followers.
+    """
+    ranks = rng.permutation(num_artists) + 1
+    followers = 5e7 * ranks ** -zipf_exponent * rng.lognormal(0, 0.5, num_artists)
+    followers = np.maximum(followers, rng.integers(50, 500, num_artists)).astype(np.int64)
+
+    # Spotify popularity tracks log-followers, squashed into 0-100
+    log_followers = np.log10(followers)
+    popularity = np.clip((log_followers - 1.5) / 6 * 100 + rng.normal(0, 5, num_artists), 0, 100).astype(np.int64)
+
+    primary = _pick(rng, GENRES, num_artists)
+    secondary = _pick(rng, GENRES, num_artists)
+    has_secondary = (rng.random(num_artists) < 0.4) & (secondary != primary)
+    genre = np.where(has_secondary, primary + ', ' + secondary, primary)
+
+    names = _pick(rng, FIRST_NAMES, num_artists) + ' ' + _pick(rng, LAST_NAMES, num_artists)
+    # Suffix with the id so names stay unique at any volume
+    artist_ids = np.arange(1, num_artists + 1)
+    names = names + ' ' + artist_ids.astype(str)
+
+    return pd.DataFrame({
+        'artist_id': artist_ids,
+        'artist_name': names,
+        'genre': genre,
+        'popularity': popularity,
+        'followers': followers,
+    })
+
+def generate_venues(num_venues: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generates venues scattered around major cities with log-normally distributed capacities.
+
+    Args:
+        num_venues (int): Number of venues.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        pd.DataFrame: venue_id, venue_name, city, state, latitude, longitude, capacity.
+    """
+    city_index = rng.integers(0, len(CITIES), num_venues)
+    cities = pd.DataFrame(CITIES, columns=['city', 'state', 'latitude', 'longitude']).iloc[city_index].reset_index(drop=True)
+    venue_ids = np.arange(1, num_venues + 1)
+
+    return pd.DataFrame({
+        'venue_id': venue_ids,
+        'venue_name': _pick(rng, LAST_NAMES, num_venues) + ' ' + _pick(rng, VENUE_KINDS, num_venues) + ' ' + venue_ids.astype(str),
+        'city': cities['city'],
+        'state': cities['state'],
+        'latitude': np.round(cities['latitude'] + rng.normal(0, 0.08, num_venues), 5),
+        'longitude': np.round(cities['longitude'] + rng.normal(0, 0.08, num_venues), 5),
+        'capacity': np.clip(rng.lognormal(7.5, 1.0, num_venues), 150, 80000).astype(np.int64),
+    })
+
+def generate_events(artists: pd.DataFrame,
+                    venues: pd.DataFrame,
+                    num_events: int,
+                    rng: np.random.Generator,
+                    start: date = date(2025, 1, 1),
+                    days: int = 365,
+                    mean_tour_length: float = 8.0) -> pd.DataFrame:
+    """
+    Generates tour-clustered events: popular artists tour more, and a tour is a run of shows a
+    few days apart in one region. Sales and prices depend on popularity, capacity and weekday.
+
+    Args:
+        artists (pd.DataFrame): Output of generate_artists.
+        venues (pd.DataFrame): Output of generate_venues.
+        num_events (int): Approximate number of events.
+        rng (np.random.Generator): Random generator.
+        start (date): First possible tour start date.
+        days (int): Window in which tours start.
+        mean_tour_length (float): Average shows per tour.
+
+    Returns:
+        pd.DataFrame: One row per event with the artist and venue features denormalized, plus ticket_sales and ticket_price.
+    """
+    num_tours = max(1, int(num_events / mean_tour_length))
+    tour_lengths = rng.poisson(mean_tour_length - 1, num_tours) + 1
+
+    weights = artists['followers'].to_numpy(dtype=float) ** 0.5
+    tour_artists = rng.choice(len(artists), num_tours, p=weights / weights.sum())
+    tour_starts = rng.integers(0, days, num_tours)
+    tour_states = rng.choice(venues['state'].unique(), num_tours)
+
+    tour_id = np.repeat(np.arange(num_tours), tour_lengths)
+    gaps = rng.integers(1, 4, len(tour_id))
+    # Days since tour start: cumulative gaps within each tour, starting at 0
+    first_gap = np.zeros(len(tour_id), dtype=bool)
+    first_gap[np.cumsum(tour_lengths)[:-1]] = True
+    first_gap[0] = True
+    gaps[first_gap] = 0
+    offsets = pd.Series(gaps).groupby(tour_id).cumsum().to_numpy()
+
+    # Each tour plays venues in its own state (tour states are drawn from states that have venues)
+    venues_by_state = venues.groupby('state').indices
+    event_states = tour_states[tour_id]
+    venue_index = np.empty(len(tour_id), dtype=np.int64)
+    for state, state_venues in venues_by_state.items():
+        mask = event_states == state
+        venue_index[mask] = rng.choice(state_venues, mask.sum())
+
+    artist_rows = artists.iloc[tour_artists[tour_id]].reset_index(drop=True)
+    venue_rows = venues.iloc[venue_index].reset_index(drop=True)
+    event_dates = pd.Timestamp(start) + pd.to_timedelta(tour_starts[tour_id] + offsets, unit='D')
+
+    popularity = artist_rows['popularity'].to_numpy(dtype=float)
+    capacity = venue_rows['capacity'].to_numpy(dtype=float)
+    weekend = np.asarray(event_dates.dayofweek >= 5)
+    demand = 3 * artist_rows['followers'].to_numpy(dtype=float) ** 0.6 * rng.lognormal(0, 0.4, len(tour_id)) * np.where(weekend, 1.2, 1.0)
+    ticket_sales = np.minimum(demand, capacity).astype(np.int64)
+    ticket_price = np.round(15 + popularity * 1.2 + rng.normal(0, 8, len(tour_id)) + np.where(weekend, 5, 0), 2).clip(10)
+
+    return pd.DataFrame({
+        'event_id': np.arange(1, len(tour_id) + 1),
+        'tour_id': tour_id + 1,
+        'artist_id': artist_rows['artist_id'],
+        'artist_name': artist_rows['artist_name'],
+        'genre': artist_rows['genre'],
+        'popularity': artist_rows['popularity'],
+        'followers': artist_rows['followers'],
+        'venue_id': venue_rows['venue_id'],
+        'venue_name': venue_rows['venue_name'],
+        'city': venue_rows['city'],
+        'state': venue_rows['state'],
+        'venue_capacity': venue_rows['capacity'],
+        'date': event_dates.strftime('%Y-%m-%d'),
+        'ticket_sales': ticket_sales,
+        'ticket_price': ticket_price,
+    })
+
+def generate_saved_events(events: pd.DataFrame, num_saved: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Samples events into saved-calendar rows shaped like the event_management Event model.
+
+    Args:
+        events (pd.DataFrame): Output of generate_events.
+        num_saved (int): Number of saved rows.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        pd.DataFrame: name, location, date.
+    """
+    picked = events.iloc[rng.integers(0, len(events), num_saved)]
+    return pd.DataFrame({
+        'name': picked['artist_name'].to_numpy(),
+        'location': (picked['venue_name'] + ', ' + picked['city']).to_numpy(),
+        'date': picked['date'].to_numpy(),
+    })
+
+def generate_dataset(num_artists: int = 10000,
+                     num_venues: int = 2000,
+                     num_events: int = 50000,
+                     num_saved: int = 10000,
+                     seed: int = 42) -> Dict[str, pd.DataFrame]:
+    """
+    Generates all synthetic tables from one seed; the same seed always yields the same data.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Tables keyed by name (artists, venues, events, saved_events).
+    """
+    rng = np.random.default_rng(seed)
+    artists = generate_artists(num_artists, rng)
+    venues = generate_venues(num_venues, rng)
+    events = generate_events(artists, venues, num_events, rng)
+    saved_events = generate_saved_events(events, num_saved, rng)
+    return {'artists': artists, 'venues': venues, 'events': events, 'saved_events': saved_events}
+
+def write_dataset(tables: Dict[str, pd.DataFrame], output_dir: str, output_format: str = 'csv') -> None:
+    """
+    Writes the tables as CSV files, Parquet files (requires pyarrow) or one SQLite database.
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Tables keyed by name.
+        output_dir (str): Directory to write into.
+        output_format (str): 'csv', 'parquet' or 'sqlite'.
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    if output_format == 'sqlite':
+        with sqlite3.connect(output / 'synthetic.sqlite3') as connection:
+            for name, table in tables.items():
+                table.to_sql(name, connection, if_exists='replace', index=False, chunksize=50000)
+    elif output_format in ('csv', 'parquet'):
+        for name, table in tables.items():
+            path = output / f"{name}.{output_format}"
+            if output_format == 'csv':
+                table.to_csv(path, index=False)
+            else:
+                table.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    logger.info("Wrote %s to %s", ', '.join(f"{name} ({len(table)} rows)" for name, table in tables.items()), output)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic booking data.")
+    parser.add_argument('--artists', type=int, default=10000)
+    parser.add_argument('--venues', type=int, default=2000)
+    parser.add_argument('--events', type=int, default=50000)
+    parser.add_argument('--saved-events', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=['csv', 'parquet', 'sqlite'], default='csv')
+    parser.add_argument('--output-dir', default='synthetic_data')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    tables = generate_dataset(args.artists, args.venues, args.events, args.saved_events, args.seed)
+    write_dataset(tables, args.output_dir, args.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Offline training for the ticket sales / price model served by shared_services.prediction_service.
+
+Usage (from the RLM_Booking directory):
+    python -m data_processing.train_sales_model --input ../old_flask_app/Data/synthetic_artist_data.csv
+"""
+import argparse
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, cross_validate
+
+from data_processing.features import (
+    BASE_FEATURE_COLUMNS,
+    COLUMN_ALIASES,
+    FEATURE_CACHE_DIR,
+    build_sales_features,
+    cached_features,
+    features_cache_key,
+    genre_vocabulary,
+    read_feature_csv,
+)
+from shared_services.prediction_service import LATEST_POINTER, MODEL_DIR
+
+logger = logging.getLogger(__name__)
+
+FEATURE_INPUT_COLUMNS = ['popularity', 'followers', 'genre', 'venue_capacity', 'date']
+TARGET_COLUMNS = ['ticket_sales', 'ticket_price']
+
+def read_training_data(paths: List[str], chunksize: int = 100_000) -> pd.DataFrame:
+    """
+    Streams the training CSVs in typed chunks, keeping only the columns the model uses and rows with numeric targets.
+
+    Args:
+        paths (List[str]): CSV files to read.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        pd.DataFrame: The combined training rows.
+    """
+    wanted = list(set(FEATURE_INPUT_COLUMNS + TARGET_COLUMNS) | set(COLUMN_ALIASES))
+    frames = []
+    for path in paths:
+        for chunk in read_feature_csv(path, usecols=wanted, chunksize=chunksize):
+            chunk = chunk.rename(columns=COLUMN_ALIASES)
+            # Enrichment writes placeholders like 'No events' / 'Unknown' for missing targets
+            for column in TARGET_COLUMNS:
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce') if column in chunk else np.nan
+            frames.append(chunk.dropna(subset=TARGET_COLUMNS))
+        logger.info("Read training data from %s", path)
+
+    if not frames:
+        return pd.DataFrame(columns=FEATURE_INPUT_COLUMNS + TARGET_COLUMNS)
+    data = pd.concat(frames, ignore_index=True)
+    for column in FEATURE_INPUT_COLUMNS:
+        if column not in data:
+            data[column] = np.nan
+    return data
+
+def build_training_features(paths: List[str], max_genres: int = 50, chunksize: int = 100_000) -> pd.DataFrame:
+    """
+    Reads the training data and builds the named feature columns, with the target columns appended.
+    """
+    data = read_training_data(paths, chunksize)
+    vocabulary = genre_vocabulary(data['genre'], max_genres)
+    columns = BASE_FEATURE_COLUMNS + [f'genre_{genre}' for genre in vocabulary]
+    features = pd.DataFrame(build_sales_features(data, vocabulary), columns=columns)
+    features[TARGET_COLUMNS] = data[TARGET_COLUMNS].to_numpy(dtype=float)
+    return features
+
+def train_sales_model(paths: List[str],
+                      output_dir: str = str(MODEL_DIR),
+                      n_estimators: int = 200,
+                      folds: int = 5,
+                      n_jobs: int = -1,
+                      seed: int = 42,
+                      chunksize: int = 100_000,
+                      max_genres: int = 50,
+                      cache_dir: str = str(FEATURE_CACHE_DIR)) -> Path:
+    """
+    Trains the sales model, cross-validates it in parallel, and writes a versioned artifact.
+    Features are cached by input hash, so retraining on unchanged data skips feature building.
+
+    Args:
+        paths (List[str]): Training CSVs.
+        output_dir (str): Artifact directory; its LATEST file is updated to point at the new artifact.
+        n_estimators (int): Trees in the random forest.
+        folds (int): Cross-validation folds.
+        n_jobs (int): Parallel jobs for cross-validation and fitting (-1 uses all cores).
+        seed (int): Random seed for fold shuffling and the model.
+        chunksize (int): Rows per CSV chunk.
+        max_genres (int): Genre vocabulary size.
+        cache_dir (str): Feature cache directory.
+
+    Returns:
+        Path: The written artifact.
+    """
+    feature_params = {'kind': 'sales', 'max_genres': max_genres}
+    data = cached_features(
+        paths, feature_params,
+        lambda: build_training_features(paths, max_genres, chunksize),
+        cache_dir,
+    )
+    if len(data) < folds:
+        raise ValueError(f"Need at least {folds} rows with ticket_sales and ticket_price; got {len(data)}")
+
+    feature_columns = [column for column in data.columns if column not in TARGET_COLUMNS]
+    vocabulary = [column[len('genre_'):] for column in feature_columns if column.startswith('genre_')]
+    features = data[feature_columns].to_numpy(dtype=float)
+    targets = data[TARGET_COLUMNS].to_numpy(dtype=float)
+    logger.info("Training on %d rows x %d features", *features.shape)
+
+    # Folds run in parallel, so each fold's forest stays single-threaded to avoid oversubscription
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=1)
+    scores = cross_validate(
+        model, features, targets,
+        cv=KFold(n_splits=folds, shuffle=True, random_state=seed),
+        scoring=('r2', 'neg_mean_absolute_error'),
+        n_jobs=n_jobs,
+    )
+    metrics = {
+        'r2': float(np.mean(scores['test_r2'])),
+        'mae': float(-np.mean(scores['test_neg_mean_absolute_error'])),
+    }
+    logger.info("Cross-validation: r2=%.3f mae=%.2f", metrics['r2'], metrics['mae'])
+
+    model.set_params(n_jobs=n_jobs).fit(features, targets)
+    # Predictions run inside requests; a saved n_jobs=-1 would start a worker pool on every predict call
+    model.set_params(n_jobs=1)
+
+    trained_at = datetime.now(timezone.utc)
+    data_digest = features_cache_key(paths, feature_params)
+    version = f"{trained_at:%Y%m%dT%H%M%SZ}-{data_digest[:8]}"
+    artifact: Dict[str, Any] = {
+        'model': model,
+        'genre_vocabulary': vocabulary,
+        'feature_columns': feature_columns,
+        'target_columns': TARGET_COLUMNS,
+        'version': version,
+        'trained_at': trained_at.isoformat(),
+        'training_rows': len(data),
+        'data_sha256': data_digest,
+        'params': {'n_estimators': n_estimators, 'folds': folds, 'seed': seed, 'max_genres': max_genres},
+        'metrics': metrics,
+    }
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    artifact_path = output / f"sales_model-{version}.joblib"
+    joblib.dump(artifact, artifact_path)
+
+    # Swap the LATEST pointer atomically so a loading process never sees a partial write
+    pointer_tmp = output / f".{LATEST_POINTER}.tmp"
+    pointer_tmp.write_text(artifact_path.name)
+    os.replace(pointer_tmp, output / LATEST_POINTER)
+
+    logger.info("Wrote sales model %s to %s", version, artifact_path)
+    return artifact_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the ticket sales / price model.")
+    parser.add_argument('--input', nargs='+', required=True, help="Training CSV files.")
+    parser.add_argument('--output-dir', default=str(MODEL_DIR), help="Artifact directory.")
+    parser.add_argument('--n-estimators', type=int, default=200)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--max-genres', type=int, default=50)
+    parser.add_argument('--cache-dir', default=str(FEATURE_CACHE_DIR), help="Feature cache directory.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    artifact_path = train_sales_model(
+        args.input,
+        output_dir=args.output_dir,
+        n_estimators=args.n_estimators,
+        folds=args.folds,
+        n_jobs=args.n_jobs,
+        seed=args.seed,
+        chunksize=args.chunksize,
+        max_genres=args.max_genres,
+        cache_dir=args.cache_dir,
+    )
+    print(artifact_path)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,69 @@
 import requests
 import base64
 import logging
+import random
+import threading
 import time
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+from shared_services.deadline import DeadlineExceeded, check_deadline, remaining, request_timeout, sleep_within_deadline
+from shared_services.metrics import record_quota, record_upstream
+from shared_services.quota import check_quota, note_reported, record_call
+from .circuit_breaker import get_circuit_breaker
+from .errors import CircuitOpenError, RateLimitedError, UpstreamRequestError, UpstreamUnavailable
 
 logger = logging.getLogger(__name__)
 
+# Total tries per request, including the first
+MAX_ATTEMPTS = 4
+
+# Backoff between retries: a random delay up to min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) seconds
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+# A longer Retry-After fails the request instead of holding the worker
+MAX_RETRY_AFTER = 30.0
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 15)
+
+# Minimum spacing between requests to one host, to stay under per-second rate limits
+REQUEST_INTERVAL = 0.3
+
+# Earliest time the next request to each host may start
+_next_request_at: Dict[str, float] = {}
+_pacing_lock = threading.Lock()
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff for the given retry attempt (0-based).
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
 class APIManager:
+    # Name used for this service in metrics and Server-Timing; defaults to the base URL's host
+    UPSTREAM_NAME: Optional[str] = None
+    # Response headers reporting (remaining, limit) quota, if the service sends them
+    QUOTA_HEADERS: Optional[Tuple[str, str]] = None
+
     def __init__(self, base_url: str, auth_type: Optional[str] = None, credentials: Optional[Dict[str, str]] = None):
         """
         Initializes APIManager with a base URL, optional authentication type, and credentials.
@@ -22,6 +79,8 @@ class APIManager:
         self.access_token = None
         self.headers = {}
         self.params = {}
+        self.host = urlparse(base_url).hostname or base_url
+        self.upstream = self.UPSTREAM_NAME or self.host
 
         if auth_type and credentials:
             self.authenticate()
@@ -58,16 +117,21 @@ class APIManager:
         data = {'grant_type': 'client_credentials'}
         
         try:
-            response = requests.post(url, headers=headers, data=data)
+            response = self._send('POST', url, 'token', headers=headers, data=data, timeout=request_timeout(REQUEST_TIMEOUT))
             response.raise_for_status()
             return response.json().get('access_token', '')
         except requests.RequestException as e:
-            logger.error(f"Failed to retrieve OAuth token: {e}")
+            logger.error("Failed to retrieve OAuth token: %s", e)
             return ''
 
-    def make_request(self, endpoint: str, method: str = 'GET', params: Optional[Dict[str, Any]] = {}) -> Dict[str, Any]:
+    def make_request(self, endpoint: str, method: str = 'GET', params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Makes a request to the API with automatic token refresh and rate limit handling.
+        Makes a request to the API with token refresh, pacing, bounded retries and a per-host circuit breaker.
+
+        Connection errors, timeouts and 5xx responses are retried with capped, jittered exponential
+        backoff; 429s wait for Retry-After when it is short enough. Persistent failures open the host's
+        circuit, after which calls fail fast until a probe succeeds. Under a request deadline
+        (shared_services.deadline), timeouts shrink to the remaining budget and no wait runs past it.
 
         Args:
             endpoint (str): The specific endpoint of the API.
@@ -75,34 +139,136 @@ class APIManager:
             params (Optional[Dict[str, Any]]): Query parameters or payload for the request.
 
         Returns:
-            dict: JSON response data from the API or an empty dict on failure.
+            dict: JSON response data from the API, or an empty dict if the resource was not found (404).
+
+        Raises:
+            CircuitOpenError: The host's circuit is open; no request was made.
+            UpstreamUnavailable: The host kept failing after MAX_ATTEMPTS.
+            RateLimitedError: The host kept rate limiting, or asked to wait longer than MAX_RETRY_AFTER.
+            UpstreamRequestError: The host rejected the request with another 4xx status.
+            QuotaExceededError: The current quota consumer (shared_services.quota) used up its share of the day's calls.
+            DeadlineExceeded: The request deadline ran out.
         """
+        check_quota(self.upstream)
         url = f"{self.base_url}/{endpoint}"
-        
-        try:
-            # Apply a short delay to avoid rate limits
-            time.sleep(0.3)
+        # Copy so the API key is not added to the caller's dict
+        params = {**(params or {}), **self.params}
+        breaker = get_circuit_breaker(self.host)
+        refreshed = False
 
-            params.update(self.params) #add on request paramaters to initial parameters, needed if apikey is a param
+        attempt = 0
+        while True:
+            # Before asking the breaker, so a half-open probe is not granted to a call that cannot be made
+            check_deadline()
+            if not breaker.allow_request():
+                raise CircuitOpenError(self.upstream, breaker.retry_in())
 
-            response = requests.request(method, url, headers=self.headers, params=params if method == 'GET' else None, json=params if method != 'GET' else None)
+            # Whether the breaker recorded this attempt's outcome; if not, its probe is released below
+            settled = False
+            try:
+                response = self._attempt(method, url, endpoint, params)
+            except requests.RequestException as e:
+                if isinstance(e, DeadlineExceeded):
+                    # Our own deadline ran out; not the host's fault
+                    raise
+                settled = True
+                breaker.record_failure()
+                error = UpstreamUnavailable(self.upstream, f"request to {endpoint} failed: {e}")
+                delay = backoff_delay(attempt)
+            else:
+                settled = True
+                status = response.status_code
+                if status < 400:
+                    breaker.record_success()
+                    return response.json()
 
-            # Refresh token if unauthorized
-            if response.status_code == 401 and self.auth_type == 'Bearer':
-                logger.info("Access token expired. Refreshing...")
-                self.authenticate()
-                response = requests.request(method, url, headers=self.headers, params=params)
+                if status >= 500:
+                    breaker.record_failure()
+                    error = UpstreamUnavailable(self.upstream, f"{endpoint} returned {status}", status)
+                    delay = backoff_delay(attempt)
+                else:
+                    # A 4xx answer means the host is up
+                    breaker.record_success()
+                    if status == 401 and self.auth_type == 'Bearer' and not refreshed:
+                        logger.info("Access token expired. Refreshing...")
+                        self.authenticate()
+                        refreshed = True
+                        continue
+                    if status == 404:
+                        logger.info("%s %s not found", self.upstream, endpoint)
+                        return {}
+                    if status != 429:
+                        raise UpstreamRequestError(self.upstream, f"{endpoint} returned {status}", status)
 
-            # Handle rate limits by retrying after the specified delay
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', 1))
-                logger.warning(f"Rate limit reached. Retrying after {retry_after} seconds.")
-                time.sleep(retry_after)
-                return self.make_request(endpoint, method, params)
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                        raise RateLimitedError(self.upstream, retry_after)
+                    error = RateLimitedError(self.upstream, retry_after)
+                    # Honor Retry-After, with jitter so waiting workers don't retry in lockstep
+                    delay = retry_after + random.uniform(0, BACKOFF_BASE) if retry_after is not None else backoff_delay(attempt)
+            finally:
+                if not settled:
+                    breaker.release()
 
-            response.raise_for_status()
-            return response.json()
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS:
+                logger.error("Giving up on %s %s after %d attempts: %s", self.upstream, endpoint, attempt, error)
+                raise error
+            logger.warning("%s; retrying in %.2f seconds (attempt %d/%d)", error, delay, attempt + 1, MAX_ATTEMPTS)
+            try:
+                sleep_within_deadline(delay)
+            except DeadlineExceeded:
+                # Report the upstream failure rather than the deadline, as it is the cause
+                raise error
+
+    def _attempt(self, method: str, url: str, endpoint: str, params: Dict[str, Any]) -> requests.Response:
+        """
+        Paces and sends one try of a request.
 
+        Raises:
+            DeadlineExceeded: The request deadline ran out before or while sending it.
+            requests.RequestException: The request failed.
+        """
+        self._pace()
+        timeout = request_timeout(REQUEST_TIMEOUT)
+        try:
+            return self._send(method, url, endpoint, headers=self.headers,
+                              params=params if method == 'GET' else None,
+                              json=params if method != 'GET' else None,
+                              timeout=timeout)
         except requests.RequestException as e:
-            logger.error(f"Request failed: {e}")
-            return {}
+            left = remaining()
+            if left is not None and left <= 0:
+                # The timeout was cut short by our own deadline
+                raise DeadlineExceeded(f"Request deadline exceeded calling {self.upstream} {endpoint}") from e
+            raise
+
+    def _pace(self):
+        """
+        Keeps requests to this host at least REQUEST_INTERVAL apart, sleeping only for the remainder.
+        """
+        with _pacing_lock:
+            now = time.monotonic()
+            slot = max(now, _next_request_at.get(self.host, 0.0))
+            _next_request_at[self.host] = slot + REQUEST_INTERVAL
+        if slot > now:
+            sleep_within_deadline(slot - now)
+
+    def _send(self, method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        Sends one HTTP request, recording its latency, error status and any reported quota, and
+        counting it in the quota ledger.
+        """
+        record_call(self.upstream, endpoint)
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.RequestException:
+            record_upstream(self.upstream, endpoint, time.perf_counter() - start, error=True)
+            raise
+        record_upstream(self.upstream, endpoint, time.perf_counter() - start, error=response.status_code >= 400)
+        if self.QUOTA_HEADERS:
+            remaining, limit = self.QUOTA_HEADERS
+            record_quota(self.upstream, response.headers.get(remaining), response.headers.get(limit))
+            note_reported(self.upstream, response.headers.get(remaining))
+        return response
@@ -1,8 +1,17 @@
 import requests
 import base64
+import logging
 import os
 from dotenv import load_dotenv
 
+from shared_services.deadline import DeadlineExceeded, remaining, request_timeout
+from shared_services.metrics import timed
+from shared_services.quota import allows, record_call
+from .api_manager import REQUEST_TIMEOUT
+from .circuit_breaker import get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
 # Get variables from .env file
 load_dotenv()
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
@@ -16,20 +25,71 @@ def get_spotify_token():
         'Authorization': 'Basic ' + base64.b64encode((SPOTIFY_CLIENT_ID + ':' + SPOTIFY_CLIENT_SECRET).encode()).decode(),
     }
     auth_data = {'grant_type': 'client_credentials'}
-    res = requests.post(auth_url, headers=auth_headers, data=auth_data)
+    record_call('spotify', 'token')
+    with timed('spotify', 'token'):
+        res = requests.post(auth_url, headers=auth_headers, data=auth_data, timeout=request_timeout(REQUEST_TIMEOUT))
     return res.json()['access_token']
 
 # Search for artist on Spotify
 def search_artist(artist_name, token):
     url = f"https://api.spotify.com/v1/search?q={artist_name}&type=artist"
     headers = {"Authorization": f"Bearer {token}"}
-    res = requests.get(url, headers=headers)
+    record_call('spotify', 'search')
+    with timed('spotify', 'search'):
+        res = requests.get(url, headers=headers, timeout=request_timeout(REQUEST_TIMEOUT))
     return res.json()
 
+# Keep only the artist fields the frontend and ML features use; the full search payload is mostly unused
+def trim_spotify_artist(artist):
+    images = artist.get('images') or []
+    return {
+        'id': artist.get('id'),
+        'name': artist.get('name'),
+        'genres': artist.get('genres', []),
+        'popularity': artist.get('popularity', 0),
+        'followers': {'total': (artist.get('followers') or {}).get('total', 0)},
+        'images': [{'url': image.get('url')} for image in images[:1]],
+        'external_urls': {'spotify': (artist.get('external_urls') or {}).get('spotify', '')},
+    }
+
 # Get artist events from Ticketmaster
 def get_ticketmaster_events(artist_name):
     url = f"https://app.ticketmaster.com/discovery/v2/events.json?keyword={artist_name}&apikey={TICKETMASTER_API_KEY}"
-    response = requests.get(url)
+    # Shares the circuit breaker with TicketmasterAPIManager, so an outage seen by either fails fast in both
+    breaker = get_circuit_breaker('app.ticketmaster.com')
+    # Quota and deadline first, so a half-open probe is not granted to a call that will not be made
+    if not allows('ticketmaster'):
+        return {'error': 'Ticketmaster quota exhausted'}
+    try:
+        timeout = request_timeout(REQUEST_TIMEOUT)
+    except DeadlineExceeded as e:
+        logger.error("Ticketmaster event search failed: %s", e)
+        return {'error': 'Failed to fetch events'}
+    if not breaker.allow_request():
+        return {'error': 'Ticketmaster is unavailable'}
+    # Whether the breaker recorded the call's outcome; if not, its probe is released below
+    settled = False
+    try:
+        record_call('ticketmaster', 'events')
+        with timed('ticketmaster', 'events'):
+            response = requests.get(url, timeout=timeout)
+    except requests.RequestException as e:
+        left = remaining()
+        if left is None or left > 0:
+            # Not cut short by our own deadline, so the host failed
+            settled = True
+            breaker.record_failure()
+        logger.error("Ticketmaster event search failed: %s", e)
+        return {'error': 'Failed to fetch events'}
+    else:
+        settled = True
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+    finally:
+        if not settled:
+            breaker.release()
     if response.status_code == 200:
         return response.json()
     else:
@@ -73,7 +133,7 @@ def analyze_local_global_events(events, target_country=None, target_city=None):
     mapped_target_country = None
 
     if normalized_target_country:
-        print("Normalized target country: " + normalized_target_country)
+        logger.debug("Normalized target country: %s", normalized_target_country)
         for country, aliases in country_mapping.items():
             if normalized_target_country in [name.lower() for name in aliases]:
                 mapped_target_country = country
@@ -94,7 +154,6 @@ def analyze_local_global_events(events, target_country=None, target_city=None):
         mapped_event_country = None
 
         if normalized_event_country:
-            print("Normalized event country: " + normalized_event_country)
             for country, aliases in country_mapping.items():
                 if normalized_event_country in [name.lower() for name in aliases]:
                     mapped_event_country = country
@@ -105,8 +164,9 @@ def analyze_local_global_events(events, target_country=None, target_city=None):
         normalized_target_city = target_city.strip().lower() if target_city else None
 
         # Log values for debugging
-        print(f"Event Country: {mapped_event_country}, Target Country: {mapped_target_country}")
-        print(f"Event City: {normalized_event_city}, Target City: {normalized_target_city}")
+        logger.debug("Event country: %s (%s), target country: %s; event city: %s, target city: %s",
+                     mapped_event_country, normalized_event_country, mapped_target_country,
+                     normalized_event_city, normalized_target_city)
 
         # Check if the event is in the target country and city (if specified)
         if mapped_event_country == mapped_target_country:
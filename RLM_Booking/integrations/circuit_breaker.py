@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from typing import Dict
+
+from shared_services.metrics import CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures that open a circuit
+FAILURE_THRESHOLD = 5
+
+# Seconds an open circuit rejects calls before letting one probe through
+RESET_TIMEOUT = 30.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Values reported by the rlm_circuit_state gauge
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitBreaker:
+    """
+    Stops calls to an upstream after repeated failures so workers fail fast instead of waiting on
+    timeouts. After reset_timeout, one probe call is allowed (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call may proceed now. In half-open state only one probe is in flight at a time.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        """
+        Seconds until an open circuit lets a probe through.
+        """
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                logger.info("Circuit for %s closed", self.name)
+                self._set_state(CLOSED)
+
+    def release(self):
+        """
+        Ends a call that recorded no outcome, e.g. one cut short by the caller's own deadline, so a
+        half-open circuit lets the next probe through instead of waiting for this one forever.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("Circuit for %s opened after %d consecutive failures", self.name, self.failures)
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        self.state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], upstream=self.name)
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """
+    Returns the process-wide circuit breaker for a host, shared by every client talking to it.
+    """
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
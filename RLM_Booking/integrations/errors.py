@@ -0,0 +1,53 @@
+from typing import Optional
+
+import requests
+
+class UpstreamError(requests.RequestException):
+    """
+    Base class for failures talking to an upstream API. Subclasses requests.RequestException so
+    existing handlers for request errors keep catching it.
+    """
+
+    def __init__(self, upstream: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+        self.status = status
+
+class UpstreamUnavailable(UpstreamError):
+    """
+    The upstream kept failing (connection errors, timeouts or 5xx responses) after all retries.
+    """
+
+class CircuitOpenError(UpstreamUnavailable):
+    """
+    The call was not attempted because the upstream's circuit breaker is open.
+    """
+
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(upstream, f"circuit open, retry in {retry_in:.1f}s")
+        self.retry_in = retry_in
+
+class RateLimitedError(UpstreamError):
+    """
+    The upstream is still rate limiting after all retries, or asked us to wait longer than we will.
+    """
+
+    def __init__(self, upstream: str, retry_after: Optional[float] = None):
+        super().__init__(upstream, f"rate limited (retry after {retry_after}s)", status=429)
+        self.retry_after = retry_after
+
+class UpstreamRequestError(UpstreamError):
+    """
+    The upstream rejected the request (4xx other than 404 and 429); retrying will not help.
+    """
+
+class QuotaExceededError(RateLimitedError):
+    """
+    The call was not made because the caller's share of the daily quota is used up; retry_after is
+    the time until the quota resets.
+    """
+
+    def __init__(self, upstream: str, consumer: str, retry_after: float):
+        UpstreamError.__init__(self, upstream, f"daily quota for {consumer} exhausted, resets in {retry_after:.0f}s", status=429)
+        self.retry_after = retry_after
+        self.consumer = consumer
@@ -4,7 +4,7 @@ import logging
 from typing import List, Dict, Any
 
 # Import other modules it inherits
-from api_manager import APIManager   
+from .api_manager import APIManager
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 class SpotifyAPIManager(APIManager):
     SPOTIFY_BASE_URL = 'https://api.spotify.com/v1'
+    UPSTREAM_NAME = 'spotify'
 
     def __init__(self):
         """
@@ -42,12 +43,12 @@ class SpotifyAPIManager(APIManager):
         Returns:
             A list of dictionaries containing the requested data, or an empty list if the request fails.
         """
-        logger.debug(f"Fetching data from endpoint {endpoint}")
+        logger.debug("Fetching data from endpoint %s", endpoint)
         response = self.make_request(endpoint)
         data = response.get(key, {}).get('items', [])
         
         if not data:
-            logger.warning(f"No data found at endpoint {endpoint}")
+            logger.warning("No data found at endpoint %s", endpoint)
         
         return data
 
@@ -77,13 +78,13 @@ class SpotifyAPIManager(APIManager):
         Returns:
             A list of playlist dictionaries, or an empty list if the request fails.
         """
-        logger.debug(f"Fetching playlists for category {category_id}")
+        logger.debug("Fetching playlists for category %s", category_id)
         endpoint = f"browse/categories/{category_id}/playlists"
         response = self.make_request(endpoint)
         playlists = response.get('playlists', {}).get('items', [])
         
         if not playlists:
-            logger.warning(f"No playlists found for category {category_id}")
+            logger.warning("No playlists found for category %s", category_id)
         
         return playlists
 
@@ -98,13 +99,13 @@ class SpotifyAPIManager(APIManager):
         Returns:
             A list of artist dictionaries, or an empty list if the request fails.
         """
-        logger.debug(f"Fetching artists for playlist {playlist_id}")
+        logger.debug("Fetching artists for playlist %s", playlist_id)
         endpoint = f"playlists/{playlist_id}/tracks"
         response = self.make_request(endpoint)
         tracks = response.get('items', [])
         
         if not tracks:
-            logger.warning(f"No tracks found for playlist {playlist_id}.")
+            logger.warning("No tracks found for playlist %s.", playlist_id)
             return []
         
         artists = []
@@ -128,12 +129,12 @@ class SpotifyAPIManager(APIManager):
         Returns:
             A dictionary with artist details, or an empty dictionary if the request fails.
         """
-        logger.debug(f"Fetching details for artist {artist_id}")
+        logger.debug("Fetching details for artist %s", artist_id)
         endpoint = f"artists/{artist_id}"
         artist_data = self.make_request(endpoint)
         
         if not artist_data:
-            logger.warning(f"No artist data found for {artist_id}.")
+            logger.warning("No artist data found for %s.", artist_id)
             return {}
         
         artist_details = {
@@ -0,0 +1,4 @@
+"""
+Tests of the upstream clients. Run from RLM_Booking with:
+    python manage.py test integrations.tests -t .
+"""
@@ -0,0 +1,136 @@
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from integrations import api_manager, artist_event_search, circuit_breaker
+from integrations.api_manager import APIManager
+from integrations.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from integrations.errors import CircuitOpenError, QuotaExceededError
+from shared_services.deadline import DeadlineExceeded, deadline, deadline_at
+
+def half_open(breaker):
+    """
+    Opens the breaker and lets its reset timeout pass, so the next call is the probe.
+    """
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout
+    return breaker
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertGreater(self.breaker.retry_in(), 29)
+
+    def test_admits_exactly_one_probe(self):
+        half_open(self.breaker)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_probe_opens_again(self):
+        half_open(self.breaker)
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_release_lets_the_next_probe_through(self):
+        half_open(self.breaker)
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+class ProbeReleaseTests(SimpleTestCase):
+    """
+    A call that ends without an outcome must not keep a half-open circuit's probe.
+    """
+
+    def setUp(self):
+        self.breaker = half_open(CircuitBreaker('test', failure_threshold=1, reset_timeout=30))
+        patcher = mock.patch.dict(circuit_breaker._breakers, {'probe.test': self.breaker, 'app.ticketmaster.com': self.breaker})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # No pacing between the tests' calls
+        patcher = mock.patch.object(api_manager, 'REQUEST_INTERVAL', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api = APIManager('https://probe.test')
+
+    def assert_probe_available(self):
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_quota_refusal_takes_no_probe(self):
+        with mock.patch.object(api_manager, 'check_quota', side_effect=QuotaExceededError('probe.test', 'batch', 60)), \
+                mock.patch.object(APIManager, '_send') as send:
+            with self.assertRaises(QuotaExceededError):
+                self.api.make_request('events')
+        send.assert_not_called()
+        self.assert_probe_available()
+
+    def test_expired_deadline_takes_no_probe(self):
+        with mock.patch.object(APIManager, '_send') as send, deadline_at(time.monotonic() - 1):
+            with self.assertRaises(DeadlineExceeded):
+                self.api.make_request('events')
+        send.assert_not_called()
+        self.assert_probe_available()
+
+    def test_probe_cut_short_by_the_deadline_is_released(self):
+        def slow_send(*args, **kwargs):
+            time.sleep(0.2)
+            raise requests.ReadTimeout('read timed out')
+
+        with mock.patch.object(APIManager, '_send', side_effect=slow_send), deadline(0.1):
+            with self.assertRaises(DeadlineExceeded):
+                self.api.make_request('events')
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assert_probe_available()
+
+    def test_probe_in_flight_fails_other_calls_fast(self):
+        self.assertTrue(self.breaker.allow_request())
+        with mock.patch.object(APIManager, '_send') as send:
+            with self.assertRaises(CircuitOpenError):
+                self.api.make_request('events')
+        send.assert_not_called()
+
+    def test_event_search_quota_refusal_takes_no_probe(self):
+        with mock.patch.object(artist_event_search, 'allows', return_value=False), \
+                mock.patch.object(artist_event_search.requests, 'get') as get:
+            self.assertEqual(artist_event_search.get_ticketmaster_events('Artist'), {'error': 'Ticketmaster quota exhausted'})
+        get.assert_not_called()
+        self.assert_probe_available()
+
+    def test_event_search_deadline_releases_the_probe(self):
+        def slow_get(*args, **kwargs):
+            time.sleep(0.2)
+            raise requests.ReadTimeout('read timed out')
+
+        with mock.patch.object(artist_event_search, 'allows', return_value=True), \
+                mock.patch.object(artist_event_search, 'record_call'), \
+                mock.patch.object(artist_event_search.requests, 'get', side_effect=slow_get), deadline(0.1):
+            self.assertEqual(artist_event_search.get_ticketmaster_events('Artist'), {'error': 'Failed to fetch events'})
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assert_probe_available()
@@ -1,13 +1,55 @@
 import os
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
 from dotenv import load_dotenv
 from .api_manager import APIManager
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable, Iterator, NamedTuple
 import logging
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 TICKETMASTER_API_KEY = os.getenv('TICKETMASTER_API_KEY')
 
+# Resolved attraction ids by lowercased artist name ('' when Ticketmaster has no match), shared by all clients
+_attraction_ids: Dict[str, str] = {}
+_attraction_ids_lock = threading.Lock()
+
+def prime_attraction_ids(ids: Dict[str, str]):
+    """
+    Seeds the shared attraction id cache with ids resolved earlier, e.g. by another process.
+
+    Args:
+        ids (Dict[str, str]): Attraction ids by artist name; '' marks a name with no attraction.
+    """
+    with _attraction_ids_lock:
+        for artist, attraction_id in ids.items():
+            _attraction_ids[artist.strip().lower()] = attraction_id
+
+def forget_attraction_ids(artists: List[str]):
+    """
+    Drops cached attraction ids so the next search looks them up again.
+    """
+    with _attraction_ids_lock:
+        for artist in artists:
+            _attraction_ids.pop(artist.strip().lower(), None)
+
+def cached_attraction_id(artist: str) -> Optional[str]:
+    """
+    The attraction id cached for an artist name, or None if it has not been resolved.
+    """
+    with _attraction_ids_lock:
+        return _attraction_ids.get(artist.strip().lower())
+
+class BulkEventsResult(NamedTuple):
+    """
+    One artist's result from fetch_events_bulk.
+    """
+    artist: str
+    events: List[Dict[str, Any]]
+    error: Optional[Exception] = None
+
 class TicketmasterAPIManager(APIManager):
     """
     The API provides access to content sourced from various platforms, including Ticketmaster, Universe, FrontGate Tickets and Ticketmaster Resale (TMR).
@@ -28,6 +70,21 @@ class TicketmasterAPIManager(APIManager):
     # Base URL for Discovery API. Other partner only APIs if needed on ticketmaster site.
     TICKETMASTER_BASE_URL = 'https://app.ticketmaster.com/discovery/v2/'
 
+    UPSTREAM_NAME = 'ticketmaster'
+    # Remaining and total daily calls, sent with every response
+    QUOTA_HEADERS = ('Rate-Limit-Available', 'Rate-Limit')
+
+    # Deep paging limit: size * page must stay below this
+    DEEP_PAGING_LIMIT = 1000
+    MAX_PAGE_SIZE = 200
+
+    # Attraction ids sent together in one comma-separated attractionId search
+    ATTRACTION_BATCH_SIZE = 10
+    # Most pages one search can request before reaching the deep paging limit
+    MAX_PAGES_PER_SEARCH = DEEP_PAGING_LIMIT // MAX_PAGE_SIZE
+    # Concurrent requests in a bulk fetch; APIManager's per-host pacing still spaces them out
+    BULK_CONCURRENCY = 4
+
     def __init__(self):
         """
         Initializes the TicketmasterAPIManager with the necessary credentials and base URL.
@@ -52,29 +109,29 @@ class TicketmasterAPIManager(APIManager):
         Returns:
             str: The unique identifier (id) of the item, or an empty string if not found.
         """
-        logger.info(f"Fetching ID for {item_type} '{item_name}'")
+        logger.info("Fetching ID for %s '%s'", item_type, item_name)
         endpoint_map = {
             'artist': 'attractions',
             'event': 'events',
             'venue': 'venues',
         }
         if item_type not in endpoint_map:
-            logger.warning(f"Unsupported item type: {item_type}")
+            logger.warning("Unsupported item type: %s", item_type)
             return ''
 
         category = endpoint_map[item_type]
         params = {
             'keyword': item_name
         }
-        logger.debug(f"Final API parameters: {params}")
+        logger.debug("Final API parameters: %s", params)
         response = self.make_request(endpoint=category, params=params)
 
         # Log the raw response for debugging
-        logger.debug(f"API Response for {item_type} '{item_name}': {response}")
+        logger.debug("API Response for %s '%s': %s", item_type, item_name, response)
 
         # Validate the response structure
         if not response or '_embedded' not in response or category not in response['_embedded']:
-            logger.warning(f"No {item_type} found for name: {item_name}")
+            logger.warning("No %s found for name: %s", item_type, item_name)
             return ''
 
         # Handle list response
@@ -82,15 +139,30 @@ class TicketmasterAPIManager(APIManager):
         if isinstance(items, list):
             for item in items:
                 if 'id' in item:
-                    logging.info(f"Found {item_type} ID: {item['id']} for {item_name}")
+                    logger.info("Found %s ID: %s for %s", item_type, item['id'], item_name)
                     return item['id']
-            logger.warning(f"No ID found in {item_type} list for name: {item_name}")
+            logger.warning("No ID found in %s list for name: %s", item_type, item_name)
         else:
-            logger.warning(f"Unexpected structure for {item_type}: {items}")
+            logger.warning("Unexpected structure for %s: %s", item_type, items)
 
         return ''
 
-    
+    def resolve_attraction_id(self, artist: str) -> str:
+        """
+        Returns the attraction id for an artist name, looking it up once per process.
+
+        Returns:
+            str: The attraction id, or an empty string if Ticketmaster has no such attraction.
+        """
+        key = artist.strip().lower()
+        with _attraction_ids_lock:
+            if key in _attraction_ids:
+                return _attraction_ids[key]
+        attraction_id = self.fetch_ID('artist', artist)
+        with _attraction_ids_lock:
+            _attraction_ids[key] = attraction_id
+        return attraction_id
+
     def fetch_events(self, 
                  artist: Optional[str] = None, 
                  #genre: Optional[str] = None, 
@@ -119,12 +191,235 @@ class TicketmasterAPIManager(APIManager):
         """
         logger.info("Fetching events from Ticketmaster API")
         endpoint = 'events'
-        params = {}
+        params = self._build_event_params(artist, postalcode, latitude, longitude, radius, start_date, end_date)
+
+        try:
+            response = self.make_request(endpoint=endpoint, params=params)
+            logger.debug("Raw API response: %s", response)
+
+            if response and '_embedded' in response and 'events' in response['_embedded']:
+                events = response['_embedded']['events']
+                parsed_events = [self.fetch_event_details(event=event) for event in events]
+                return parsed_events
+            logger.info("No events found in the API response.")
+            return []
+        except Exception as e:
+            logger.error("Error while fetching events: %s", e, exc_info=True)
+            raise
+
+    def iter_events(self,
+                    artist: Optional[str] = None,
+                    postalcode: Optional[str] = None,
+                    latitude: Optional[float] = 0.0,
+                    longitude: Optional[float] = 0.0,
+                    radius: Optional[int] = None,
+                    start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    page_size: int = MAX_PAGE_SIZE,
+                    max_results: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield raw event objects across result pages, requesting the next page only when
+        the caller has consumed the current one. Takes the same search parameters as fetch_events.
+
+        Args:
+            page_size (int): Events per request, capped at MAX_PAGE_SIZE.
+            max_results (Optional[int]): Stop after this many events. Deep paging caps it at DEEP_PAGING_LIMIT regardless.
+
+        Yields:
+            dict: Raw Ticketmaster event objects.
+        """
+        params = self._build_event_params(artist, postalcode, latitude, longitude, radius, start_date, end_date)
+        return self._iter_pages(params, page_size, max_results)
+
+    def _iter_pages(self, params: Dict[str, Any], page_size: int = MAX_PAGE_SIZE, max_results: Optional[int] = None,
+                    until: Optional[Callable[[], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields raw events for prepared search parameters, one page request at a time. If until is
+        given, no further page is requested once it returns True.
+        """
+        page_size = max(1, min(page_size, self.MAX_PAGE_SIZE))
+        limit = min(max_results or self.DEEP_PAGING_LIMIT, self.DEEP_PAGING_LIMIT)
+
+        yielded = 0
+        page = 0
+        while yielded < limit and (page + 1) * page_size <= self.DEEP_PAGING_LIMIT:
+            response = self.make_request(endpoint='events', params={**params, 'size': page_size, 'page': page})
+            events = response.get('_embedded', {}).get('events', []) if response else []
+            logger.debug("Fetched events page %d (%d events)", page, len(events))
+
+            for event in events[:limit - yielded]:
+                yield event
+                yielded += 1
+
+            total_pages = response.get('page', {}).get('totalPages', 0) if response else 0
+            if not events or page + 1 >= total_pages or (until is not None and until()):
+                return
+            page += 1
+
+    def fetch_events_bulk(self,
+                          artists: List[str],
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None,
+                          max_results_per_artist: Optional[int] = None,
+                          sort: Optional[str] = None,
+                          concurrency: int = BULK_CONCURRENCY,
+                          resolve_ids: bool = True) -> Iterator[BulkEventsResult]:
+        """
+        Fetches events for many artists, yielding each artist's result as soon as it is complete.
+
+        Names are deduplicated case-insensitively and resolved to attraction ids through the shared id
+        cache. Resolved artists are searched ATTRACTION_BATCH_SIZE ids per request; names without an
+        attraction fall back to a keyword search each. Requests run concurrently and are paced by
+        APIManager, so the per-second rate limit still holds.
+
+        A lookup only pays off if the id is used again. One-off fetches pass resolve_ids=False, so that
+        uncached names get a single keyword search each instead of a lookup plus their share of a batch.
+
+        Args:
+            artists (List[str]): Artist names; duplicates are fetched once.
+            start_date (Optional[str]): The start date in the format 'YYYY-MM-DD'.
+            end_date (Optional[str]): The end date in the format 'YYYY-MM-DD'.
+            max_results_per_artist (Optional[int]): Keep at most this many events per artist.
+            sort (Optional[str]): Discovery API sort order, e.g. 'date,desc'.
+            concurrency (int): Requests in flight at once.
+            resolve_ids (bool): Look up attraction ids missing from the shared cache.
+
+        Yields:
+            BulkEventsResult: The artist (first spelling given), its raw events, and the error if its
+            search failed or ran out of time.
+        """
+        unique: Dict[str, str] = {}
+        for artist in artists:
+            if artist and artist.strip():
+                unique.setdefault(artist.strip().lower(), artist.strip())
+        if not unique:
+            return
+
+        base_params = self._build_event_params(start_date=start_date, end_date=end_date)
+        if sort:
+            base_params['sort'] = sort
+
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='ticketmaster-bulk')
+
+        def submit(func, *args):
+            # Carry the caller's context (request deadline, timing accounting) into the worker
+            return executor.submit(contextvars.copy_context().run, func, *args)
+
+        try:
+            ids: Dict[str, str] = {}
+            keyword_artists: List[str] = []
+            resolving = {}
+            for name in unique.values():
+                attraction_id = cached_attraction_id(name)
+                if attraction_id is not None:
+                    ids[name] = attraction_id
+                elif resolve_ids:
+                    resolving[submit(self.resolve_attraction_id, name)] = name
+                else:
+                    keyword_artists.append(name)
+
+            # Resolve ids concurrently; failures, deadlines included, are reported per artist
+            for future in as_completed(resolving):
+                name = resolving[future]
+                try:
+                    ids[name] = future.result()
+                except requests.RequestException as e:
+                    yield BulkEventsResult(name, [], e)
+            # Names Ticketmaster has no attraction for
+            keyword_artists += [name for name, attraction_id in ids.items() if not attraction_id]
+            ids = {name: attraction_id for name, attraction_id in ids.items() if attraction_id}
+
+            names_by_id: Dict[str, List[str]] = {}
+            for name, attraction_id in ids.items():
+                names_by_id.setdefault(attraction_id, []).append(name)
+            id_list = list(names_by_id)
+
+            searches = {}
+            for start in range(0, len(id_list), self.ATTRACTION_BATCH_SIZE):
+                batch = id_list[start:start + self.ATTRACTION_BATCH_SIZE]
+                searches[submit(self._fetch_attraction_batch, batch, base_params, max_results_per_artist)] = batch
+            for name in keyword_artists:
+                params = {**base_params, 'keyword': name}
+                searches[submit(self._fetch_all, params, max_results_per_artist)] = name
+
+            for future in as_completed(searches):
+                key = searches[future]
+                try:
+                    result = future.result()
+                except requests.RequestException as e:
+                    names = [name for attraction_id in key for name in names_by_id[attraction_id]] if isinstance(key, list) else [key]
+                    for name in names:
+                        yield BulkEventsResult(name, [], e)
+                    continue
+                if isinstance(key, list):
+                    for attraction_id, events in result.items():
+                        for name in names_by_id[attraction_id]:
+                            yield BulkEventsResult(name, events)
+                else:
+                    yield BulkEventsResult(key, result)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_all(self, params: Dict[str, Any], max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(self._iter_pages(params, page_size=max_results or self.MAX_PAGE_SIZE, max_results=max_results))
+
+    def _fetch_attraction_batch(self, attraction_ids: List[str], params: Dict[str, Any],
+                                max_results_per_artist: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Searches several attractions in one comma-separated attractionId query and splits the events
+        by attraction. Paging stops once every attraction has max_results_per_artist events. If the
+        search reaches the deep paging limit first, the attractions still short of events are searched
+        again (in halves if that is all of them), so no artist's events are cut off by the others'.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Raw events per attraction id.
+        """
+        by_id: Dict[str, List[Dict[str, Any]]] = {attraction_id: [] for attraction_id in attraction_ids}
+
+        def short_of_events() -> List[str]:
+            return [attraction_id for attraction_id, events in by_id.items()
+                    if max_results_per_artist is None or len(events) < max_results_per_artist]
+
+        fetched = 0
+        for event in self._iter_pages({**params, 'attractionId': ','.join(attraction_ids)}, until=lambda: not short_of_events()):
+            fetched += 1
+            # An event with several requested attractions (e.g. a co-headlined show) belongs to each
+            for attraction in event.get('_embedded', {}).get('attractions', []):
+                matched = by_id.get(attraction.get('id'))
+                if matched is not None and (max_results_per_artist is None or len(matched) < max_results_per_artist):
+                    matched.append(event)
+
+        missing = short_of_events()
+        if fetched < self.DEEP_PAGING_LIMIT or not missing or len(attraction_ids) == 1:
+            return by_id
+        if len(missing) < len(attraction_ids):
+            by_id.update(self._fetch_attraction_batch(missing, params, max_results_per_artist))
+        else:
+            middle = len(attraction_ids) // 2
+            by_id.update(self._fetch_attraction_batch(attraction_ids[:middle], params, max_results_per_artist))
+            by_id.update(self._fetch_attraction_batch(attraction_ids[middle:], params, max_results_per_artist))
+        return by_id
+
+    def _build_event_params(self,
+                            artist: Optional[str] = None,
+                            postalcode: Optional[str] = None,
+                            latitude: Optional[float] = 0.0,
+                            longitude: Optional[float] = 0.0,
+                            radius: Optional[int] = None,
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the query parameters for an event search. See fetch_events for the arguments.
+        """
+        params: Dict[str, Any] = {}
 
         if artist:
-            artist_id = self.fetch_ID('artist', artist)
+            artist_id = self.resolve_attraction_id(artist)
             if artist_id:
                 params['attractionId'] = artist_id
+            else:
+                # Fall back to a keyword search rather than dropping the artist filter entirely
+                params['keyword'] = artist
         # if genre:
         #     params['classificationName'] = genre
         if postalcode:
@@ -139,21 +434,48 @@ class TicketmasterAPIManager(APIManager):
         if end_date:
             params['endDateTime'] = f"{end_date}T04:59:59Z"
 
-        logger.debug(f"Final API parameters: {params}")
+        logger.debug("Final API parameters: %s", params)
+        return params
 
-        try:
-            response = self.make_request(endpoint=endpoint, params=params)
-            logger.debug(f"Raw API response: {response}")
+    # Fields produced by summarize_event
+    SUMMARY_FIELDS = ('id', 'name', 'artist', 'url', 'venue', 'venue_id', 'city', 'country', 'location', 'latitude', 'longitude', 'date')
 
-            if response and '_embedded' in response and 'events' in response['_embedded']:
-                events = response['_embedded']['events']
-                parsed_events = [self.fetch_event_details(event=event) for event in events]
-                return parsed_events
-            logger.info("No events found in the API response.")
-            return []
-        except Exception as e:
-            logger.error(f"Error while fetching events: {str(e)}", exc_info=True)
-            raise
+    @staticmethod
+    def summarize_event(event: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Project a raw event object onto the compact, flat fields the frontend displays.
+
+        Args:
+            event (Dict[str, Any]): A raw Ticketmaster event object.
+            fields (Optional[List[str]]): Subset of SUMMARY_FIELDS to keep. All fields when omitted.
+
+        Returns:
+            dict: The projected event.
+        """
+        embedded = event.get('_embedded', {})
+        venue = (embedded.get('venues') or [{}])[0]
+        attraction = (embedded.get('attractions') or [{}])[0]
+        city = venue.get('city', {}).get('name')
+        region = venue.get('state', {}).get('stateCode') or venue.get('country', {}).get('countryCode')
+        location = venue.get('location', {})
+
+        summary = {
+            'id': event.get('id'),
+            'name': event.get('name'),
+            'artist': attraction.get('name'),
+            'url': event.get('url'),
+            'venue': venue.get('name'),
+            'venue_id': venue.get('id'),
+            'city': city,
+            'country': venue.get('country', {}).get('countryCode'),
+            'location': ', '.join(part for part in (city, region) if part),
+            'latitude': float(location['latitude']) if location.get('latitude') else None,
+            'longitude': float(location['longitude']) if location.get('longitude') else None,
+            'date': event.get('dates', {}).get('start', {}).get('localDate'),
+        }
+        if fields is not None:
+            summary = {field: summary[field] for field in fields if field in summary}
+        return summary
 
     def fetch_event_details(self, event_id: Optional[str] = None, event: Optional[Dict[str, Any]] = None) -> dict:
         """
@@ -166,16 +488,16 @@ class TicketmasterAPIManager(APIManager):
         Returns:
             dict: A dictionary containing the relevant event details.
         """
-        logger.info(f"Fetching details for event with ID: {event_id}")
         if event is None:
             if event_id is None:
                 logger.warning("No event_id or event JSON object provided.")
                 return {}
+            logger.info("Fetching details for event with ID: %s", event_id)
             endpoint = f'events/{event_id}'
             response = self.make_request(endpoint=endpoint)
             
             if not response:
-                logger.warning(f"No details found for event with id: {event_id}")
+                logger.warning("No details found for event with id: %s", event_id)
                 return {}
             event = response
 
@@ -208,13 +530,13 @@ class TicketmasterAPIManager(APIManager):
         Returns:
             dict: A dictionary containing the (relevant) attraction details.
         """
-        logger.info(f"Fetching details for artist with ID: {artist_id}")
+        logger.info("Fetching details for artist with ID: %s", artist_id)
 
         endpoint = f'attractions/{artist_id}'
         response = self.make_request(endpoint=endpoint)
         
         if not response:
-            logger.warning(f"No details found for artist with id: {artist_id}")
+            logger.warning("No details found for artist with id: %s", artist_id)
             return {}
 
         artist_details = {
@@ -239,15 +561,16 @@ class TicketmasterAPIManager(APIManager):
         Returns:
             dict: A dictionary containing the venue details.
         """
-        logger.info(f"Fetching details for venue with ID: {venue_id}")
+        logger.info("Fetching details for venue with ID: %s", venue_id)
         
         endpoint = f'venues/{venue_id}'
         response = self.make_request(endpoint=endpoint)
         
         if not response:
-            logger.warning(f"No details found for venue with id: {venue_id}")
+            logger.warning("No details found for venue with id: %s", venue_id)
             return {}
-        
+
+        location = response.get('location', {})
         venue_details = {
             'name': response.get('name', ''),
             'id': response.get('id', ''),
@@ -259,8 +582,9 @@ class TicketmasterAPIManager(APIManager):
             'country': response.get('country', {}).get('name'),
             'country_code': response.get('country', {}).get('countryCode'),
             'postalCode': response.get('postalCode', ''),
-            'longitude': response.get('location', {}).get('longitude', ''),
-            'latitude': response.get('location', {}).get('latitude', ''),
+            # The API returns coordinates as strings
+            'longitude': float(location['longitude']) if location.get('longitude') else None,
+            'latitude': float(location['latitude']) if location.get('latitude') else None,
             'timezone': response.get('timezone', ''),
             'currency': response.get('currency', ''),
             'numUpcomingEvents': response.get('upcomingEvents', {}),
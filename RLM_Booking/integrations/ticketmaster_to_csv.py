@@ -1,79 +1,87 @@
 import csv
-import requests
-import time
+import logging
 import os
-from dotenv import load_dotenv
+from datetime import datetime, timezone
 
-load_dotenv()
-TICKETMASTER_API_KEY = os.getenv('TICKETMASTER_API_KEY')
+from integrations.ticketmaster_api_manager import TicketmasterAPIManager
 
-# Constants
-TICKETMASTER_BASE_URL = 'https://app.ticketmaster.com/discovery/v2/events.json'
-MAX_RETRIES = 5
-BACKOFF_FACTOR = 2
+logger = logging.getLogger(__name__)
 
-def get_ticketmaster_data(artist_name):
-    """Retrieve ticket sales and price for the most recent event of the artist."""
-    url = TICKETMASTER_BASE_URL
-    params = {
-        'apikey': TICKETMASTER_API_KEY,
-        'keyword': artist_name,
-        'sort': 'date,desc'
-    }
-    
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract the most recent event
-            events = data.get('_embedded', {}).get('events', [])
-            if events:
-                most_recent_event = events[0]
-                ticket_sales = most_recent_event.get('sales', {}).get('public', {}).get('quantity', 'Unknown')
-                if ticket_sales == 'Unknown':
-                    # Check if the quantity is available
-                    ticket_sales = most_recent_event.get('sales', {}).get('public', {}).get('amount', 'Unknown')
-                ticket_price = most_recent_event.get('priceRanges', [{}])[0].get('min', 'Unknown')
-                return ticket_sales, ticket_price
-            else:
-                return 'No events', 'No price'
-        
-        except requests.exceptions.RequestException as e:
-            print(f"Error retrieving data for {artist_name} (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
-            time.sleep(BACKOFF_FACTOR ** attempt)  # Exponential backoff
-        
-    return 'Error', 'Error'
+CSV_COLUMNS = ['artist_name', 'genre', 'popularity', 'followers', 'external_url', 'ticket_sales', 'ticket_price', 'ticket_checked_at']
 
-def update_csv_with_ticket_data(input_filename='output.csv', output_filename='updated_output.csv'):
-    """Update the CSV file with ticket sales and ticket price."""
-    rows = []
-    
+def ticket_fields(events):
+    """Ticket sales and price of the first (most recent) event in a list."""
+    if not events:
+        return 'No events', 'No price'
+    most_recent_event = events[0]
+    ticket_sales = most_recent_event.get('sales', {}).get('public', {}).get('quantity', 'Unknown')
+    if ticket_sales == 'Unknown':
+        # Check if the quantity is available
+        ticket_sales = most_recent_event.get('sales', {}).get('public', {}).get('amount', 'Unknown')
+    ticket_price = (most_recent_event.get('priceRanges') or [{}])[0].get('min', 'Unknown')
+    return ticket_sales, ticket_price
+
+def update_csv_with_ticket_data(input_filename='output.csv', output_filename='updated_output.csv', limit=None):
+    """
+    Update the CSV file with ticket sales and ticket price.
+
+    With a limit, only that many artists are looked up: those not enriched yet, then those checked
+    longest ago. The other artists keep the values of the previous output file, so repeated runs
+    cycle through the whole crawl.
+
+    Returns:
+        int: Number of artists looked up.
+    """
     # Read the existing CSV file
     with open(input_filename, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            artist_name = row['artist_name']
-            print(f"Fetching data for artist: {artist_name}")
-            
-            # Get ticket sales and price from Ticketmaster
-            ticket_sales, ticket_price = get_ticketmaster_data(artist_name)
-            row['ticket_sales'] = ticket_sales
-            row['ticket_price'] = ticket_price
-            
-            rows.append(row)
+        rows = list(csv.DictReader(csvfile))
+
+    # Values from the previous run, by artist
+    previous = {}
+    if os.path.exists(output_filename):
+        with open(output_filename, 'r', newline='', encoding='utf-8') as csvfile:
+            previous = {row['artist_name'].strip().lower(): row for row in csv.DictReader(csvfile)}
+    for row in rows:
+        enriched = previous.get(row['artist_name'].strip().lower(), {})
+        for column in ('ticket_sales', 'ticket_price', 'ticket_checked_at'):
+            row[column] = enriched.get(column, '')
+
+    # Never-checked artists sort first (empty timestamp), then the oldest checks
+    due = sorted(rows, key=lambda row: row['ticket_checked_at'])
+    due = due if limit is None else due[:limit]
+
+    # Get ticket sales and price from Ticketmaster for the due artists at once, most recent event first.
+    # Artists with a known attraction id share batched searches; looking up the others would cost more
+    # than searching them by name, so they get one keyword search each.
+    ticket_data = {}
+    results = TicketmasterAPIManager().fetch_events_bulk(
+        [row['artist_name'] for row in due], sort='date,desc', max_results_per_artist=1, resolve_ids=False
+    )
+    for result in results:
+        if result.error is not None:
+            logger.warning("Error retrieving data for %s: %s", result.artist, result.error)
+            ticket_data[result.artist.strip().lower()] = ('Error', 'Error')
+        else:
+            ticket_data[result.artist.strip().lower()] = ticket_fields(result.events)
+        logger.info("Fetched data for artist: %s (%d/%d)", result.artist, len(ticket_data), len(due))
+
+    checked_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    for row in due:
+        row['ticket_sales'], row['ticket_price'] = ticket_data.get(row['artist_name'].strip().lower(), ('Error', 'Error'))
+        row['ticket_checked_at'] = checked_at
     
     # Write the updated data to a new CSV file
-    csv_columns = ['artist_name', 'genre', 'popularity', 'followers', 'external_url', 'ticket_sales', 'ticket_price']
     try:
         with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=csv_columns)
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS, extrasaction='ignore')
             writer.writeheader()
             writer.writerows(rows)
-        print(f"Updated data successfully written to {output_filename}")
+        logger.info("Updated data successfully written to %s", output_filename)
     except IOError as e:
-        print(f"I/O error occurred: {e}")
+        logger.error("I/O error occurred: %s", e)
+    return len(due)
 
+# Run from RLM_Booking: python -m integrations.ticketmaster_to_csv
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     update_csv_with_ticket_data()
@@ -0,0 +1,228 @@
+import logging
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Crawled Spotify artists used to build the index; override with ARTIST_INDEX_CSV (comma-separated paths)
+DEFAULT_ARTIST_CSV = Path(__file__).resolve().parent.parent.parent / 'old_flask_app' / 'Data' / 'spotify_data.csv'
+
+# Minimum share of the query's trigrams an artist name must contain for a fuzzy match
+MIN_SIMILARITY = 0.5
+
+# Ranking: text match score plus this weight times popularity / 100
+POPULARITY_WEIGHT = 0.25
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+TOKEN_PREFIX_SCORE = 0.8
+FUZZY_SCALE = 0.8
+
+def normalize_name(name: str) -> str:
+    """
+    Lowercases, strips accents and punctuation, and collapses whitespace ("Beyoncé!" -> "beyonce").
+    """
+    decomposed = unicodedata.normalize('NFKD', str(name))
+    ascii_name = ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', ascii_name).split())
+
+def trigrams(normalized: str, partial: bool = False) -> set:
+    """
+    Trigrams of a normalized name, padded so short names and word starts still produce trigrams.
+    A partial name (a typeahead query) is not padded at the end since its last word may be unfinished.
+    """
+    padded = f"  {normalized}" + ('' if partial else ' ')
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ArtistSearchIndex:
+    """
+    In-memory artist name index for typeahead: prefix matches on the full name and on each word, and
+    typo-tolerant matches through a trigram inverted index, ranked by match quality and popularity.
+    """
+
+    def __init__(self):
+        self._artists: List[Dict[str, Any]] = []
+        self._by_name: Dict[str, int] = {}
+        self._popularity: List[float] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        # Sorted (key, artist id) pairs for prefix lookup; rebuilt lazily after additions
+        self._names: List[Tuple[str, int]] = []
+        self._tokens: List[Tuple[str, int]] = []
+        self._sorted = True
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._artists)
+
+    def add_artists(self, artists: Iterable[Dict[str, Any]]) -> int:
+        """
+        Adds artists with a 'name' and optional 'popularity', 'followers', 'genres' and 'external_url'.
+        An artist already indexed under the same normalized name is updated in place.
+
+        Returns:
+            int: Number of new artists.
+        """
+        added = 0
+        with self._lock:
+            for artist in artists:
+                normalized = normalize_name(artist.get('name') or '')
+                if not normalized:
+                    continue
+                record = {
+                    'name': artist['name'],
+                    'popularity': int(artist.get('popularity') or 0),
+                    'followers': int(artist.get('followers') or 0),
+                    'genres': list(artist.get('genres') or []),
+                    'external_url': artist.get('external_url') or '',
+                }
+
+                artist_id = self._by_name.get(normalized)
+                if artist_id is not None:
+                    # Keep the most complete record, e.g. a Spotify result over a Ticketmaster-only name
+                    if record['popularity'] >= self._artists[artist_id]['popularity']:
+                        self._artists[artist_id] = record
+                        self._popularity[artist_id] = record['popularity']
+                    continue
+
+                artist_id = len(self._artists)
+                self._artists.append(record)
+                self._by_name[normalized] = artist_id
+                self._popularity.append(record['popularity'])
+                for gram in trigrams(normalized):
+                    self._postings[gram].append(artist_id)
+                self._names.append((normalized, artist_id))
+                self._tokens.extend((token, artist_id) for token in set(normalized.split()[1:]))
+                self._sorted = False
+                added += 1
+        return added
+
+    def most_popular(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        The indexed artists with the highest Spotify popularity.
+        """
+        with self._lock:
+            top = np.argsort(-np.asarray(self._popularity, dtype=float), kind='stable')[:limit]
+            return [dict(self._artists[artist_id]) for artist_id in top]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Finds artists matching a (partial, possibly misspelled) name.
+
+        Args:
+            query (str): What the user has typed so far.
+            limit (int): Maximum number of results.
+
+        Returns:
+            List[Dict[str, Any]]: Artist records with a 'score', best first.
+        """
+        normalized = normalize_name(query)
+        if not normalized or not self._artists:
+            return []
+
+        with self._lock:
+            self._sort()
+            scores: Dict[int, float] = {}
+
+            def match(artist_id: int, score: float):
+                if score > scores.get(artist_id, 0.0):
+                    scores[artist_id] = score
+
+            for name, artist_id in self._prefix_matches(self._names, normalized):
+                match(artist_id, EXACT_SCORE if name == normalized else PREFIX_SCORE)
+            for _, artist_id in self._prefix_matches(self._tokens, normalized):
+                match(artist_id, TOKEN_PREFIX_SCORE)
+
+            # Typo tolerance needs enough characters to be meaningful
+            if len(normalized) >= 3:
+                for artist_id, similarity in self._fuzzy_matches(normalized):
+                    match(artist_id, FUZZY_SCALE * similarity)
+
+            ranked = sorted(
+                scores.items(),
+                key=lambda item: item[1] + POPULARITY_WEIGHT * self._popularity[item[0]] / 100,
+                reverse=True,
+            )[:limit]
+            return [
+                {**self._artists[artist_id], 'score': round(score + POPULARITY_WEIGHT * self._popularity[artist_id] / 100, 4)}
+                for artist_id, score in ranked
+            ]
+
+    def _sort(self):
+        """
+        Sorts the prefix lookup tables after additions.
+        """
+        if not self._sorted:
+            self._names.sort()
+            self._tokens.sort()
+            self._sorted = True
+
+    @staticmethod
+    def _prefix_matches(table: List[Tuple[str, int]], prefix: str, max_matches: int = 200) -> List[Tuple[str, int]]:
+        """
+        Returns up to max_matches entries of a sorted table whose key starts with prefix.
+        """
+        start = bisect_left(table, (prefix, -1))
+        matches = []
+        for key, artist_id in table[start:start + max_matches]:
+            if not key.startswith(prefix):
+                break
+            matches.append((key, artist_id))
+        return matches
+
+    def _fuzzy_matches(self, normalized: str) -> List[Tuple[int, float]]:
+        """
+        Returns (artist id, similarity) for artists whose names contain enough of the query's trigrams.
+        Similarity is the share of query trigrams found, so a misspelled prefix still matches a long name.
+        """
+        grams = trigrams(normalized, partial=True)
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate([np.asarray(posting, dtype=np.int64) for posting in postings]))
+        candidates = np.flatnonzero(shared >= MIN_SIMILARITY * len(grams))
+        return list(zip(candidates.tolist(), (shared[candidates] / len(grams)).tolist()))
+
+    @classmethod
+    def from_csv(cls, paths: Iterable[str]) -> 'ArtistSearchIndex':
+        """
+        Builds an index from crawled artist CSVs (artist_name/name, genre, popularity, followers, external_url).
+        Missing files are skipped.
+        """
+        from data_processing.features import read_feature_csv
+
+        index = cls()
+        for path in paths:
+            if not Path(path).is_file():
+                logger.warning("Artist index source %s not found", path)
+                continue
+            for chunk in read_feature_csv(path, usecols=['artist_name', 'name', 'genre', 'popularity', 'followers', 'external_url']):
+                chunk = chunk.rename(columns={'name': 'artist_name'})
+                index.add_artists(
+                    {
+                        'name': row.get('artist_name'),
+                        'popularity': row.get('popularity'),
+                        'followers': row.get('followers'),
+                        'genres': [genre.strip() for genre in (row.get('genre') or '').split(',') if genre.strip()],
+                        'external_url': row.get('external_url') or '',
+                    }
+                    for row in chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+                    if row.get('artist_name')
+                )
+        logger.info("Built artist search index with %d artists", len(index))
+        return index
+
+@lru_cache(maxsize=1)
+def get_artist_search_index() -> ArtistSearchIndex:
+    """
+    Returns the process-wide artist search index, building it from ARTIST_INDEX_CSV on first use.
+    """
+    paths = os.getenv('ARTIST_INDEX_CSV')
+    return ArtistSearchIndex.from_csv(paths.split(',') if paths else [str(DEFAULT_ARTIST_CSV)])
@@ -1,147 +1,466 @@
 import boto3
-from botocore.exceptions import ClientError
+from boto3.dynamodb.types import Binary
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+import csv
+import hashlib
+import io
 import json
+import logging
+import os
 import time
+import zlib
+from functools import cached_property
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import msgpack  # Optional: smaller and faster than JSON when installed
+except ImportError:
+    msgpack = None
+
+from shared_services.metrics import record_cache, timed
+
+logger = logging.getLogger(__name__)
+
+# Encodings stored in the 'encoding' attribute of a cached item
+ENCODING_JSON_ZLIB = 'json+zlib'
+ENCODING_MSGPACK_ZLIB = 'msgpack+zlib'
+
+# S3 transfer defaults: files above the threshold are sent as concurrent multipart uploads / ranged downloads
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 64 * 1024 * 1024
+MAX_CONCURRENCY = 10
+# S3 allows at most 10,000 parts per multipart upload
+MAX_UPLOAD_PARTS = 10000
+
+# Key layout for SageMaker inputs and outputs in the data bucket
+TRAINING_DATA_PREFIX = 'data'
+MODEL_ARTIFACT_PREFIX = 'models'
+
+# Bytes read from the start of an object when validating a CSV header
+SCHEMA_SAMPLE_BYTES = 64 * 1024
 
 class AWSDataManager:
-    def __init__(self, aws_access_key_id, aws_secret_access_key, region_name, table_name):
+    def __init__(self, aws_access_key_id, aws_secret_access_key, region_name, table_name, compression_level: int = 6, use_msgpack: bool = False,
+                 bucket_name: Optional[str] = None,
+                 endpoint_url: Optional[str] = None,
+                 multipart_threshold: int = MULTIPART_THRESHOLD,
+                 multipart_chunksize: int = MULTIPART_CHUNKSIZE,
+                 max_concurrency: int = MAX_CONCURRENCY):
         """
         Initialize the AWSDatabaseManager with DynamoDB credentials and table name.
+
+        Args:
+            compression_level (int): zlib level (1-9) used for cached payloads.
+            use_msgpack (bool): Serialize payloads with msgpack (if installed) instead of JSON.
+            bucket_name (Optional[str]): Default S3 bucket. Defaults to the S3_BUCKET_NAME environment variable.
+            endpoint_url (Optional[str]): S3 endpoint override for local stand-ins (moto, MinIO). Defaults to AWS_S3_ENDPOINT_URL.
+            multipart_threshold (int): Size in bytes above which transfers are split into parts.
+            multipart_chunksize (int): Part size in bytes.
+            max_concurrency (int): Parts transferred in parallel.
         """
-        self.dynamodb = boto3.resource(
-            'dynamodb',
+        self.session = boto3.session.Session(
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             region_name=region_name
         )
+        self.dynamodb = self.session.resource('dynamodb')
         self.table = self.dynamodb.Table(table_name)
+        self.compression_level = compression_level
+        self.encoding = ENCODING_MSGPACK_ZLIB if use_msgpack and msgpack is not None else ENCODING_JSON_ZLIB
 
-    def __init__(self, aws_access_key_id, aws_secret_access_key, region_name, table_name):
+        self.bucket_name = bucket_name or os.getenv('S3_BUCKET_NAME')
+        self.endpoint_url = endpoint_url or os.getenv('AWS_S3_ENDPOINT_URL')
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+            use_threads=max_concurrency > 1
+        )
+
+    @cached_property
+    def s3(self):
         """
-        Initialize the AWSDatabaseManager with DynamoDB credentials and table name.
+        S3 client, created on first use so DynamoDB-only callers don't pay for it.
         """
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
-        )
-        self.table = self.dynamodb.Table(table_name)
+        return self.session.client('s3', endpoint_url=self.endpoint_url)
 
-    def get_cached_results(self, artist_name):
+    @cached_property
+    def glue(self):
         """
-        Retrieve cached results for an artist from DynamoDB.
+        Glue client, created on first use.
+        """
+        return self.session.client('glue')
+
+    def get_cached_results(self, artist_name, max_age: Optional[float] = None):
+        """
+        Retrieve cached results for an artist from DynamoDB, ignoring results cached more than max_age seconds ago.
+        Compressed payloads are decoded transparently; legacy items holding a JSON string are still understood.
         """
         try:
-            print(f"Fetching results for artist: {artist_name}")
-            response = self.table.get_item(Key={'artist_name': artist_name})
-            print(f"Response from DynamoDB: {response}")
-
-            if 'Item' in response:
-                data = response['Item'].get('data')
-                print(f"Data retrieved: {data}")
-
-                # Only convert JSON data to Python dictionary if it's a string
-                if isinstance(data, str):
-                    try:
-                        response['Item']['data'] = json.loads(data)
-                        print(f"Data after JSON parsing: {response['Item']['data']}")
-                    except json.JSONDecodeError as e:
-                        print(f"Error decoding JSON: {e}")
-                        return None
-                return response['Item']
-            return None
+            logger.debug("Fetching cached results for artist: %s", artist_name)
+            with timed('dynamodb', 'get_item'):
+                response = self.table.get_item(Key={'artist_name': artist_name})
+
+            item = response.get('Item')
+            if item is not None and max_age is not None and time.time() - int(item.get('timestamp', 0)) > max_age:
+                logger.debug("Cached results for %s are stale", artist_name)
+                item = None
+            record_cache('artist_search', item is not None)
+            if item is None:
+                return None
+
+            try:
+                item['data'] = self._decode_item(item)
+            except (ValueError, zlib.error) as e:
+                logger.error("Error decoding cached results for %s: %s", artist_name, e)
+                return None
+
+            # The raw payload is no longer needed once decoded
+            item.pop('payload', None)
+            return item
         except ClientError as e:
-            print(f"Error getting cached results: {e.response['Error']['Message']}")
+            logger.error("Error getting cached results: %s", e.response['Error']['Message'])
             return None
 
-
     def cache_results(self, artist_name, data):
         """
-        Cache new results for an artist in DynamoDB.
+        Cache new results for an artist in DynamoDB as a compressed binary attribute.
         """
         try:
-            json_data = json.dumps(data)
-            print(f"Caching data for {artist_name}: {json_data}")
-
-            self.table.put_item(
-                Item={
-                    'artist_name': artist_name,
-                    'data': json_data,
-                    'timestamp': int(time.time())
-                }
+            payload, raw_size = self._encode_payload(data)
+            logger.info(
+                "Caching results for %s: %d bytes encoded (%d bytes raw, %s)",
+                artist_name, len(payload), raw_size, self.encoding
             )
-            print(f"Cached results for {artist_name}")
+
+            with timed('dynamodb', 'put_item'):
+                self.table.put_item(
+                    Item={
+                        'artist_name': artist_name,
+                        'payload': Binary(payload),
+                        'encoding': self.encoding,
+                        'payload_size': len(payload),
+                        'timestamp': int(time.time())
+                    }
+                )
         except ClientError as e:
-            print(f"Error caching results: {e.response['Error']['Message']}")
+            logger.error("Error caching results: %s", e.response['Error']['Message'])
+
+    def _encode_payload(self, data: Any) -> Tuple[bytes, int]:
+        """
+        Serialize and compress a payload for storage.
+
+        Args:
+            data (Any): JSON-serializable data to store.
+
+        Returns:
+            Tuple[bytes, int]: The compressed payload and its size before compression.
+        """
+        if self.encoding == ENCODING_MSGPACK_ZLIB:
+            raw = msgpack.packb(data, use_bin_type=True)
+        else:
+            raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return zlib.compress(raw, self.compression_level), len(raw)
+
+    @staticmethod
+    def _decode_item(item: Dict[str, Any]) -> Any:
+        """
+        Decode the payload of a cached item based on its 'encoding' attribute.
+
+        Args:
+            item (Dict[str, Any]): The DynamoDB item.
+
+        Returns:
+            Any: The decoded data.
+        """
+        encoding: Optional[str] = item.get('encoding')
+
+        # Legacy items: plain JSON string in the 'data' attribute
+        if encoding is None:
+            data = item.get('data')
+            if isinstance(data, str):
+                try:
+                    return json.loads(data)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON payload: {e}") from e
+            return data
+
+        payload = item.get('payload')
+        if isinstance(payload, Binary):
+            payload = payload.value
+        raw = zlib.decompress(bytes(payload))
+
+        if encoding == ENCODING_MSGPACK_ZLIB:
+            if msgpack is None:
+                raise ValueError("Cached payload is msgpack encoded but msgpack is not installed")
+            return msgpack.unpackb(raw, raw=False)
+        if encoding == ENCODING_JSON_ZLIB:
+            return json.loads(raw)
+        raise ValueError(f"Unknown payload encoding: {encoding}")
 
     # S3 Methods
-    def upload_file(local_path: str, bucket_name: str, s3_key:str):
+    def upload_file(self, local_path: str, bucket_name: Optional[str], s3_key: str) -> bool:
         """
-        Upload a file to an S3 bucket.
+        Upload a file to an S3 bucket. Large files go up as concurrent multipart uploads.
+
+        Args:
+            local_path (str): The file to upload.
+            bucket_name (Optional[str]): The bucket; None uses the default bucket.
+            s3_key (str): The destination key.
+
+        Returns:
+            bool: True if the upload succeeded.
         """
-        s3 = boto3.client('s3')
-        s3.upload_file(local_path, bucket_name, s3_key)
-        return
-    
-    def download_file(bucket_name: str, s3_key: str, local_path: str):
+        bucket_name = self._bucket(bucket_name)
+        try:
+            start = time.monotonic()
+            with timed('s3', 'upload_file'):
+                self.s3.upload_file(local_path, bucket_name, s3_key, Config=self.transfer_config)
+            self.log_action('upload_file', {
+                'uri': self.generate_s3_uri(bucket_name, s3_key),
+                'bytes': os.path.getsize(local_path),
+                'seconds': round(time.monotonic() - start, 3),
+            })
+            return True
+        except (ClientError, S3UploadFailedError, BotoCoreError, OSError) as e:
+            logger.error("Error uploading %s to s3://%s/%s: %s", local_path, bucket_name, s3_key, e)
+            return False
+
+    def download_file(self, bucket_name: Optional[str], s3_key: str, local_path: str) -> bool:
         """
-        Download a file from an S3 bucket.
+        Download a file from an S3 bucket using concurrent ranged GETs for large objects.
+        The object is written to a temporary file and renamed, so local_path is never left half-written.
+
+        Args:
+            bucket_name (Optional[str]): The bucket; None uses the default bucket.
+            s3_key (str): The object key.
+            local_path (str): Where to save the file.
+
+        Returns:
+            bool: True if the download succeeded.
+        """
+        bucket_name = self._bucket(bucket_name)
+        directory = os.path.dirname(local_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{local_path}.part"
+        try:
+            start = time.monotonic()
+            with timed('s3', 'download_file'):
+                self.s3.download_file(bucket_name, s3_key, tmp_path, Config=self.transfer_config)
+            os.replace(tmp_path, local_path)
+            self.log_action('download_file', {
+                'uri': self.generate_s3_uri(bucket_name, s3_key),
+                'bytes': os.path.getsize(local_path),
+                'seconds': round(time.monotonic() - start, 3),
+            })
+            return True
+        except (ClientError, BotoCoreError, OSError) as e:
+            logger.error("Error downloading s3://%s/%s: %s", bucket_name, s3_key, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def stream_file(self, bucket_name: Optional[str], s3_key: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Stream an object's contents in chunks without holding it in memory or on disk.
+
+        Args:
+            bucket_name (Optional[str]): The bucket; None uses the default bucket.
+            s3_key (str): The object key.
+            chunk_size (int): Bytes per chunk.
+
+        Yields:
+            bytes: Consecutive chunks of the object.
+        """
+        response = self.s3.get_object(Bucket=self._bucket(bucket_name), Key=s3_key)
+        body = response['Body']
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def validate_file(self, bucket_name: Optional[str], s3_key: str, expected_size: Optional[int] = None,
+                      expected_etag: Optional[str] = None, local_path: Optional[str] = None) -> bool:
+        """
+        Validate a file exists in an S3 bucket and check its size and ETag with a HEAD request, without downloading it.
+
+        Args:
+            bucket_name (Optional[str]): The bucket; None uses the default bucket.
+            s3_key (str): The object key.
+            expected_size (Optional[int]): Expected size in bytes.
+            expected_etag (Optional[str]): Expected ETag.
+            local_path (Optional[str]): A local copy to compare against; its size and ETag are computed
+                the way this manager's multipart uploads produce them.
+
+        Returns:
+            bool: True if the object exists and matches every given expectation.
         """
-        return
-    
-    def validate_file(bucket_name: str, s3_key: str, expected_size: int):
+        bucket_name = self._bucket(bucket_name)
+        try:
+            head = self.s3.head_object(Bucket=bucket_name, Key=s3_key)
+        except ClientError as e:
+            logger.warning("Object s3://%s/%s not found: %s", bucket_name, s3_key, e.response['Error'].get('Message', e))
+            return False
+
+        if local_path is not None:
+            expected_size = os.path.getsize(local_path)
+            expected_etag = self.compute_etag(local_path)
+
+        size = head['ContentLength']
+        etag = head['ETag'].strip('"')
+        if expected_size is not None and size != expected_size:
+            logger.warning("Size mismatch for s3://%s/%s: %d != %d", bucket_name, s3_key, size, expected_size)
+            return False
+        if expected_etag is not None and etag != expected_etag.strip('"'):
+            logger.warning("ETag mismatch for s3://%s/%s: %s != %s", bucket_name, s3_key, etag, expected_etag)
+            return False
+        return True
+
+    def compute_etag(self, local_path: str) -> str:
         """
-        Validate a file exists in an S3 bucket and check its size
+        Compute the ETag S3 assigns to local_path when uploaded with this manager's transfer config:
+        the MD5 for single-part uploads, or the MD5 of the part MD5s plus the part count for multipart ones.
         """
-        return
+        size = os.path.getsize(local_path)
+        chunksize = self.transfer_config.multipart_chunksize
+        if size < self.transfer_config.multipart_threshold:
+            chunksize = max(size, 1)
+        # Mirror s3transfer, which doubles the part size when a file would need too many parts
+        while size / chunksize > MAX_UPLOAD_PARTS:
+            chunksize *= 2
+
+        digests = []
+        with open(local_path, 'rb') as file:
+            for block in iter(lambda: file.read(chunksize), b''):
+                digests.append(hashlib.md5(block).digest())
+
+        if size < self.transfer_config.multipart_threshold:
+            return digests[0].hex() if digests else hashlib.md5(b'').hexdigest()
+        return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
 
-    def generate_s3_uri(base_path: str, bucket_name: str, s3_key: str):
+    def generate_s3_uri(self, bucket_name: Optional[str], s3_key: str) -> str:
         """
         Generate an S3 URI for a given bucket and key
         """
-        return
-    
-    def get_training_input_path(data_type:str) -> str:
+        return f"s3://{self._bucket(bucket_name)}/{s3_key.lstrip('/')}"
+
+    def get_training_input_path(self, data_type: str) -> str:
         """
-        Get the training input path for a given data type
+        Get the training input path (an S3 prefix URI) for a given data type, e.g. 'train' or 'validation'
         """
-        return
-    
-    def get_model_artifact_path(training_job_name: str) -> str:
+        return self.generate_s3_uri(None, f"{TRAINING_DATA_PREFIX}/{data_type}/")
+
+    def get_model_artifact_path(self, training_job_name: str) -> str:
         """
-        Get the model artifact path for a given training job
+        Get the S3 key of the model artifact SageMaker writes for a given training job
         """
-        return
-    
-    def validate_schema(s3_key: str, schema_definition: str):
+        return f"{MODEL_ARTIFACT_PREFIX}/{training_job_name}/output/model.tar.gz"
+
+    def validate_schema(self, s3_key: str, schema_definition: Dict[str, Any], bucket_name: Optional[str] = None) -> bool:
         """
-        Validate the schema of a file in S3
+        Validate the header of a CSV file in S3 against schema_definition['columns'].
+        Only the first SCHEMA_SAMPLE_BYTES are fetched, with a ranged GET.
         """
-        return
-    
+        bucket_name = self._bucket(bucket_name)
+        try:
+            response = self.s3.get_object(Bucket=bucket_name, Key=s3_key, Range=f"bytes=0-{SCHEMA_SAMPLE_BYTES - 1}")
+            sample = response['Body'].read().decode('utf-8', errors='replace')
+        except ClientError as e:
+            logger.error("Error reading s3://%s/%s: %s", bucket_name, s3_key, e.response['Error'].get('Message', e))
+            return False
+
+        header = next(csv.reader(io.StringIO(sample)), [])
+        expected = list(schema_definition.get('columns', []))
+        if header != expected:
+            logger.warning("Schema mismatch for s3://%s/%s: %s != %s", bucket_name, s3_key, header, expected)
+            return False
+        return True
+
     # Glue Methods
-    def run_crawler(crawler_name:str):
+    def run_crawler(self, crawler_name: str, wait: bool = False, poll_interval: float = 15.0, timeout: float = 1800.0) -> bool:
         """
-        Run an AWS Glue crawler
+        Run an AWS Glue crawler, optionally waiting until it finishes.
+
+        Args:
+            crawler_name (str): The crawler.
+            wait (bool): Poll until the crawler is READY again.
+            poll_interval (float): Seconds between polls.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the crawler was started (or was already running) and, when waiting, finished in time.
         """
-        return
-    
-    def query_catalog(database_name: str, table_name: str) -> dict:
+        try:
+            self.glue.start_crawler(Name=crawler_name)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'CrawlerRunningException':
+                logger.error("Error starting crawler %s: %s", crawler_name, e.response['Error']['Message'])
+                return False
+            logger.info("Crawler %s is already running", crawler_name)
+        self.log_action('run_crawler', {'crawler': crawler_name})
+
+        deadline = time.monotonic() + timeout
+        while wait:
+            state = self.glue.get_crawler(Name=crawler_name)['Crawler']['State']
+            if state == 'READY':
+                return True
+            if time.monotonic() > deadline:
+                logger.warning("Timed out waiting for crawler %s (state %s)", crawler_name, state)
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def query_catalog(self, database_name: str, table_name: str) -> dict:
         """
-        Query the AWS Glue Data Catalog for metadata
+        Query the AWS Glue Data Catalog for a table's location, columns and partition keys
         """
-        return
-    
+        try:
+            table = self.glue.get_table(DatabaseName=database_name, Name=table_name)['Table']
+        except ClientError as e:
+            logger.error("Error querying catalog %s.%s: %s", database_name, table_name, e.response['Error']['Message'])
+            return {}
+
+        descriptor = table.get('StorageDescriptor', {})
+        return {
+            'name': table['Name'],
+            'location': descriptor.get('Location'),
+            'columns': [{'name': column['Name'], 'type': column['Type']} for column in descriptor.get('Columns', [])],
+            'partition_keys': [column['Name'] for column in table.get('PartitionKeys', [])],
+            'updated': table.get('UpdateTime'),
+        }
+
     # Utility Methods
-    def list_files(bucket_name: str, prefix: str):
+    def list_files(self, bucket_name: Optional[str], prefix: str = '') -> Iterator[Dict[str, Any]]:
+        """
+        List files in an S3 bucket with a given prefix, fetching pages lazily as the caller iterates.
+
+        Yields:
+            Dict[str, Any]: 'key', 'size', 'etag' and 'last_modified' for each object.
         """
-        List files in an S3 bucket with a given prefix
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self._bucket(bucket_name), Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield {
+                    'key': obj['Key'],
+                    'size': obj['Size'],
+                    'etag': obj['ETag'].strip('"'),
+                    'last_modified': obj['LastModified'],
+                }
+
+    def log_action(self, action: str, details: dict):
         """
-        return
-    
-    def log_action(action: str, details: dict):
+        Log an action with its details as a single structured line
+        """
+        logger.info("AWS action %s: %s", action, json.dumps(details, default=str, sort_keys=True))
+
+    def _bucket(self, bucket_name: Optional[str]) -> str:
         """
-        Log an action to AWS with a message
+        Returns bucket_name, falling back to the default bucket.
         """
-        return
\ No newline at end of file
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("No S3 bucket given and no default bucket configured (S3_BUCKET_NAME)")
+        return bucket
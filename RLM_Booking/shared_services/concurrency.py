@@ -0,0 +1,33 @@
+import contextvars
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable
+
+from django.db import close_old_connections
+
+# Threads shared by all requests for concurrent upstream calls; override with UPSTREAM_WORKERS
+DEFAULT_UPSTREAM_WORKERS = 16
+
+@lru_cache(maxsize=1)
+def get_upstream_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process-wide thread pool for upstream I/O.
+    """
+    workers = int(os.getenv('UPSTREAM_WORKERS', DEFAULT_UPSTREAM_WORKERS))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upstream')
+
+def submit(func: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    Runs func on the upstream pool in a copy of the caller's context, so the request deadline and
+    Server-Timing accounting apply inside the worker thread too.
+    """
+    context = contextvars.copy_context()
+    return get_upstream_executor().submit(context.run, _run, func, *args, **kwargs)
+
+def _run(func: Callable[..., Any], *args, **kwargs) -> Any:
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Pool threads outlive requests; release database connections as the request thread does
+        close_old_connections()
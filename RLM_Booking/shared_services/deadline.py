@@ -0,0 +1,99 @@
+"""
+Request deadlines. A view sets a time budget once and every upstream call made while handling the
+request derives its connect/read timeouts from what is left of it:
+
+    @deadline(2.0)
+    def my_view(request):
+        ...
+
+Outside a deadline, calls use their default timeouts.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+# Budget for interactive views; override with VIEW_DEADLINE_SECONDS
+VIEW_DEADLINE = float(os.getenv('VIEW_DEADLINE_SECONDS', 2.0))
+
+# Below this many seconds of budget a call is not worth starting
+MIN_CALL_BUDGET = 0.05
+
+# Monotonic time at which the current deadline expires; None when no deadline is set
+_expires_at: ContextVar[Optional[float]] = ContextVar('deadline_expires_at', default=None)
+
+class DeadlineExceeded(requests.Timeout):
+    """
+    The request's time budget ran out. A requests.Timeout, so existing timeout handling applies.
+    """
+
+@contextmanager
+def deadline_at(when: float) -> Iterator[None]:
+    """
+    Runs the enclosed code under a deadline at the given time.monotonic() value. A deadline that is
+    already set and expires earlier stays in force.
+    """
+    current = _expires_at.get()
+    token = _expires_at.set(when if current is None else min(current, when))
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Runs the enclosed code with a budget of the given seconds. Also usable as a decorator, in which
+    case each call gets a fresh budget.
+    """
+    with deadline_at(time.monotonic() + seconds):
+        yield
+
+def expires_at() -> Optional[float]:
+    """
+    The current deadline as a time.monotonic() value, or None.
+    """
+    return _expires_at.get()
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current deadline, or None without one.
+    """
+    current = _expires_at.get()
+    return None if current is None else current - time.monotonic()
+
+def check_deadline():
+    """
+    Raises DeadlineExceeded if the current deadline leaves too little time to start a call.
+    """
+    left = remaining()
+    if left is not None and left < MIN_CALL_BUDGET:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+def request_timeout(default: Tuple[float, float]) -> Tuple[float, float]:
+    """
+    (connect, read) timeouts for the next call: the defaults, cut down to the remaining budget.
+
+    Raises:
+        DeadlineExceeded: Too little budget is left to make the call.
+    """
+    check_deadline()
+    left = remaining()
+    if left is None:
+        return default
+    connect, read = default
+    return min(connect, left), min(read, left)
+
+def sleep_within_deadline(seconds: float):
+    """
+    Sleeps unless that would run past the current deadline, in which case it raises at once
+    rather than holding the worker for a call that could not be made anyway.
+    """
+    left = remaining()
+    if left is not None and seconds >= left - MIN_CALL_BUDGET:
+        raise DeadlineExceeded(f"Waiting {seconds:.2f}s would exceed the request deadline")
+    if seconds > 0:
+        time.sleep(seconds)
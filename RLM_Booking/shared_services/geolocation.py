@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Default location of the persisted venue index; override with VENUE_INDEX_PATH
+VENUE_INDEX_PATH = Path(__file__).resolve().parent.parent / 'ml_artifacts' / 'venue_index.npz'
+
+# Venue attributes kept alongside the coordinates
+VENUE_FIELDS = ('id', 'name', 'city', 'state_code', 'country_code', 'latitude', 'longitude')
+
+def to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Converts degrees to points on the unit sphere, where Euclidean (chord) distance is monotonic in
+    great-circle distance, so a KD-tree answers spherical radius and nearest-neighbour queries exactly.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+def miles_to_chord(miles: float) -> float:
+    """
+    Converts a great-circle distance in miles to the chord length on the unit sphere.
+    """
+    return 2 * np.sin(min(miles / EARTH_RADIUS_MILES, np.pi) / 2)
+
+def chord_to_miles(chord: np.ndarray) -> np.ndarray:
+    """
+    Converts unit-sphere chord lengths back to great-circle miles.
+    """
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+def venue_from_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extracts the venue of an event, either a raw Ticketmaster event or a summarize_event result.
+
+    Returns:
+        Optional[Dict[str, Any]]: The venue with VENUE_FIELDS, or None if it has no ID or coordinates.
+    """
+    if '_embedded' in event:
+        venue = (event['_embedded'].get('venues') or [{}])[0]
+        location = venue.get('location', {})
+        candidate = {
+            'id': venue.get('id'),
+            'name': venue.get('name'),
+            'city': venue.get('city', {}).get('name'),
+            'state_code': venue.get('state', {}).get('stateCode'),
+            'country_code': venue.get('country', {}).get('countryCode'),
+            'latitude': location.get('latitude'),
+            'longitude': location.get('longitude'),
+        }
+    else:
+        candidate = {
+            'id': event.get('venue_id'),
+            'name': event.get('venue'),
+            'city': event.get('city'),
+            'state_code': None,
+            'country_code': event.get('country'),
+            'latitude': event.get('latitude'),
+            'longitude': event.get('longitude'),
+        }
+    return normalize_venue(candidate)
+
+def normalize_venue(venue: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Keeps VENUE_FIELDS and converts coordinates to floats (Ticketmaster returns them as strings).
+
+    Returns:
+        Optional[Dict[str, Any]]: The venue, or None if it has no ID or valid coordinates.
+    """
+    try:
+        latitude = float(venue.get('latitude'))
+        longitude = float(venue.get('longitude'))
+    except (TypeError, ValueError):
+        return None
+    if not venue.get('id') or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    normalized = {field: venue.get(field) for field in VENUE_FIELDS}
+    normalized.update(latitude=latitude, longitude=longitude)
+    return normalized
+
+class VenueIndex:
+    """
+    Local venue store with a KD-tree spatial index for radius and k-nearest queries.
+    Venues are upserted as events are fetched and from the synced event store
+    (apps.event_management.sync.refresh_venue_index); the tree is rebuilt lazily on the next query.
+    """
+
+    def __init__(self):
+        self._venues: Dict[str, Dict[str, Any]] = {}
+        self._ids: List[str] = []
+        self._tree: Optional[cKDTree] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._venues)
+
+    def __contains__(self, venue_id: str) -> bool:
+        return venue_id in self._venues
+
+    def get(self, venue_id: str) -> Optional[Dict[str, Any]]:
+        return self._venues.get(venue_id)
+
+    def add_venues(self, venues: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upserts venues with an 'id', 'latitude' and 'longitude'; others are skipped.
+
+        Returns:
+            int: Number of venues added or moved.
+        """
+        changed = 0
+        with self._lock:
+            for venue in venues:
+                venue = normalize_venue(venue)
+                if venue is None:
+                    continue
+                existing = self._venues.get(venue['id'])
+                if existing is None or (existing['latitude'], existing['longitude']) != (venue['latitude'], venue['longitude']):
+                    changed += 1
+                self._venues[venue['id']] = venue
+            if changed:
+                self._tree = None
+        return changed
+
+    def add_from_events(self, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upserts the venues of raw or summarized events. See add_venues.
+        """
+        return self.add_venues(venue for venue in map(venue_from_event, events) if venue is not None)
+
+    def within_radius(self, latitude: float, longitude: float, radius_miles: float) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Finds venues within radius_miles of a point.
+
+        Returns:
+            List[Tuple[Dict[str, Any], float]]: (venue, distance in miles) pairs, nearest first.
+        """
+        tree, ids = self._index()
+        if tree is None:
+            return []
+        center = to_unit_vectors([latitude], [longitude])[0]
+        positions = tree.query_ball_point(center, miles_to_chord(radius_miles))
+        if not positions:
+            return []
+        distances = chord_to_miles(np.linalg.norm(tree.data[positions] - center, axis=1))
+        order = np.argsort(distances)
+        return [(self._venues[ids[positions[i]]], float(distances[i])) for i in order]
+
+    def nearest(self, latitude: float, longitude: float, k: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Finds the k venues nearest to a point.
+
+        Returns:
+            List[Tuple[Dict[str, Any], float]]: (venue, distance in miles) pairs, nearest first.
+        """
+        tree, ids = self._index()
+        if tree is None or k <= 0:
+            return []
+        chords, positions = tree.query(to_unit_vectors([latitude], [longitude])[0], k=min(k, len(ids)))
+        chords, positions = np.atleast_1d(chords), np.atleast_1d(positions)
+        return [(self._venues[ids[position]], float(distance)) for position, distance in zip(positions, chord_to_miles(chords))]
+
+    def filter_events(self, events: List[Dict[str, Any]], latitude: float, longitude: float, radius_miles: float) -> List[Dict[str, Any]]:
+        """
+        Keeps the events whose venue lies within radius_miles of a point, indexing any new venues first.
+        Events without venue coordinates are dropped.
+
+        Args:
+            events (List[Dict[str, Any]]): Raw or summarized events.
+
+        Returns:
+            List[Dict[str, Any]]: The matching events, in their original order.
+        """
+        venues = [venue_from_event(event) for event in events]
+        self.add_venues(venue for venue in venues if venue is not None)
+        nearby = {venue['id'] for venue, _ in self.within_radius(latitude, longitude, radius_miles)}
+        return [event for event, venue in zip(events, venues) if venue is not None and venue['id'] in nearby]
+
+    def save(self, path: Optional[str] = None) -> Path:
+        """
+        Writes the venues to an .npz file (coordinates as arrays, attributes as JSON).
+        """
+        path = Path(path or os.getenv('VENUE_INDEX_PATH') or VENUE_INDEX_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            venues = list(self._venues.values())
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as file:
+            np.savez_compressed(
+                file,
+                coordinates=np.array([[venue['latitude'], venue['longitude']] for venue in venues], dtype=float).reshape(-1, 2),
+                venues=np.array(json.dumps(venues)),
+            )
+        os.replace(tmp_path, path)
+        logger.info("Saved %d venues to %s", len(venues), path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'VenueIndex':
+        """
+        Loads an index written by save(); returns an empty index if the file does not exist.
+        """
+        index = cls()
+        path = Path(path or os.getenv('VENUE_INDEX_PATH') or VENUE_INDEX_PATH)
+        if not path.is_file():
+            return index
+        with np.load(path) as data:
+            index.add_venues(json.loads(str(data['venues'])))
+        logger.info("Loaded %d venues from %s", len(index), path)
+        return index
+
+    def _index(self) -> Tuple[Optional[cKDTree], List[str]]:
+        """
+        Returns the KD-tree and the venue ID of each tree position, rebuilding after changes.
+        """
+        with self._lock:
+            if self._tree is None and self._venues:
+                self._ids = list(self._venues)
+                coordinates = np.array([[self._venues[i]['latitude'], self._venues[i]['longitude']] for i in self._ids])
+                self._tree = cKDTree(to_unit_vectors(coordinates[:, 0], coordinates[:, 1]))
+            return self._tree, self._ids
+
+@lru_cache(maxsize=1)
+def get_venue_index() -> VenueIndex:
+    """
+    Returns the process-wide VenueIndex, loading the persisted venues on first use.
+    """
+    return VenueIndex.load()
@@ -1,38 +1,231 @@
-import sys
-from pyspark.context import SparkContext
-from awsglue.context import GlueContext
-from awsglue.dynamicframe import DynamicFrame
-from awsglue.transforms import *
-
-sc = SparkContext()
-glueContext = GlueContext(sc)
-spark = glueContext.spark_session
-job = glueContext.create_dynamic_frame.from_catalog(
-    database="housing_db", 
-    table_name="housing_data"
-)
-
-# Extract the data
-housing_dyf = glueContext.create_dynamic_frame.from_catalog(
-    database="housing_db",
-    table_name="housing_data"
-)
-
-# Transform the data
-# Remove null values
-housing_cleaned = housing_dyf.filter(f=lambda row: row["price"] is not None and row["sqft_living"] is not None)
-
-# Add derived columns (e.g., price per square foot)
-housing_transformed = housing_cleaned.map(
-    lambda row: {
-        **row,
-        "price_per_sqft": row["SalePrice"] / row["LotArea"]
-    }
-)
-
-# Convert DynamicFrame back to Spark DataFrame
-housing_df = housing_transformed.toDF()
-
-# Write the transformed data to S3 in Parquet format
-output_path = "s3://rlm-dev-playground/output/housing_cleaned"
-housing_df.write.mode("overwrite").parquet(output_path)
+"""
+ETL for crawled artist / event data: cleans and types the CSVs and writes Parquet partitioned by
+primary genre and event month, sorted by date within each partition so Parquet row-group statistics
+let readers skip data on date filters.
+
+Runs on PySpark when available (local mode on a laptop, the cluster's master under spark-submit or
+as an AWS Glue job), otherwise on pandas. Nothing is imported or started until run_etl is called.
+
+Usage (from the RLM_Booking directory):
+    python -m shared_services.glue --input ../old_flask_app/Data/combined_output.csv --output etl_output/artists
+"""
+import argparse
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_processing.features import COLUMN_ALIASES, read_feature_csv
+
+logger = logging.getLogger(__name__)
+
+# Partition layout of the output dataset
+PARTITION_COLUMNS = ['primary_genre', 'event_month']
+
+
+# Output column types; columns missing from the input are added as nulls so every partition has one schema
+OUTPUT_SCHEMA = {
+    'artist_name': 'string',
+    'genre': 'string',
+    'popularity': 'int',
+    'followers': 'bigint',
+    'external_url': 'string',
+    'event_id': 'string',
+    'venue_name': 'string',
+    'city': 'string',
+    'state': 'string',
+    'venue_capacity': 'int',
+    'date': 'date',
+    'ticket_sales': 'int',
+    'ticket_price': 'double',
+}
+
+UNKNOWN_GENRE = 'unknown'
+NO_DATE = 'none'
+
+def spark_available() -> bool:
+    """
+    Returns True if PySpark can be imported.
+    """
+    try:
+        import pyspark  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def get_spark_session(app_name: str = 'rlm-booking-etl'):
+    """
+    Returns a SparkSession. Under AWS Glue the session comes from a GlueContext; otherwise the
+    master comes from spark-submit, SPARK_MASTER, or local mode with all cores.
+    """
+    from pyspark import SparkContext
+    from pyspark.sql import SparkSession
+
+    try:
+        from awsglue.context import GlueContext
+    except ImportError:
+        builder = SparkSession.builder.appName(app_name)
+        # spark-submit sets the gateway port and supplies --master itself; only default the master when run directly
+        if 'PYSPARK_GATEWAY_PORT' not in os.environ:
+            builder = builder.master(os.getenv('SPARK_MASTER', 'local[*]'))
+        return builder.getOrCreate()
+    return GlueContext(SparkContext.getOrCreate()).spark_session
+
+def dedupe_keys(columns: List[str]) -> List[str]:
+    """
+    Returns the columns identifying a row: the event ID when present, else artist and date.
+    """
+    if 'event_id' in columns:
+        return ['event_id']
+    return [column for column in ('artist_name', 'date') if column in columns]
+
+def run_etl_spark(input_paths: List[str], output_path: str, spark=None) -> None:
+    """
+    Runs the ETL on Spark. Input and output paths may be local or s3:// / s3a:// URIs.
+
+    Args:
+        input_paths (List[str]): CSV files or directories.
+        output_path (str): Destination directory of the partitioned dataset.
+        spark: An existing SparkSession; one is created when omitted.
+    """
+    from pyspark.sql import functions as F
+
+    spark = spark or get_spark_session()
+    # Overwrite only the partitions present in this run so incremental loads don't wipe older months
+    spark.conf.set('spark.sql.sources.partitionOverwriteMode', 'dynamic')
+
+    frame = spark.read.option('header', True).option('escape', '"').csv(input_paths)
+    for source, target in COLUMN_ALIASES.items():
+        if source in frame.columns and target not in frame.columns:
+            frame = frame.withColumnRenamed(source, target)
+    input_columns = frame.columns
+
+    # Cast explicitly; placeholders such as 'No events' become nulls instead of failing the job
+    for column, dtype in OUTPUT_SCHEMA.items():
+        if column not in frame.columns:
+            frame = frame.withColumn(column, F.lit(None).cast(dtype))
+        elif dtype == 'date':
+            frame = frame.withColumn(column, F.to_date(F.substring(F.col(column), 1, 10), 'yyyy-MM-dd'))
+        elif dtype != 'string':
+            frame = frame.withColumn(column, F.round(F.expr(f"try_cast(`{column}` AS double)")).cast(dtype) if dtype != 'double'
+                                     else F.expr(f"try_cast(`{column}` AS double)"))
+
+    genre = F.trim(F.regexp_replace(F.lower(F.col('genre')), r'\s*,\s*', ','))
+    primary_genre = F.split(genre, ',').getItem(0)
+    frame = (
+        frame.select(*OUTPUT_SCHEMA)
+        .filter(F.col('artist_name').isNotNull())
+        .withColumn('genre', genre)
+        .withColumn('primary_genre', F.when(F.coalesce(primary_genre, F.lit('')) == '', UNKNOWN_GENRE).otherwise(primary_genre))
+        .withColumn('event_month', F.coalesce(F.date_format('date', 'yyyy-MM'), F.lit(NO_DATE)))
+        .dropDuplicates(dedupe_keys(input_columns))
+    )
+
+    (
+        frame.repartition(*PARTITION_COLUMNS)
+        .sortWithinPartitions('date', 'artist_name')
+        .write.mode('overwrite')
+        .partitionBy(*PARTITION_COLUMNS)
+        .parquet(output_path)
+    )
+    logger.info("Wrote partitioned dataset to %s", output_path)
+
+def transform_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the ETL transformations to a pandas chunk; mirrors the Spark job.
+    """
+    frame = frame.rename(columns={source: target for source, target in COLUMN_ALIASES.items() if target not in frame})
+    output = pd.DataFrame(index=frame.index)
+    for column, dtype in OUTPUT_SCHEMA.items():
+        values = frame[column] if column in frame else pd.Series(np.nan, index=frame.index)
+        if dtype == 'date':
+            output[column] = pd.to_datetime(values.astype('string').str[:10], format='%Y-%m-%d', errors='coerce')
+        elif dtype in ('int', 'bigint'):
+            output[column] = pd.to_numeric(values, errors='coerce').round().astype('Int64')
+        elif dtype == 'double':
+            output[column] = pd.to_numeric(values, errors='coerce').astype('float64')
+        else:
+            output[column] = values.astype('string')
+
+    output = output[output['artist_name'].notna()]
+    output['genre'] = output['genre'].str.lower().str.replace(r'\s*,\s*', ',', regex=True).str.strip()
+    primary_genre = output['genre'].str.split(',').str[0].fillna('')
+    output['primary_genre'] = primary_genre.mask(primary_genre == '', UNKNOWN_GENRE)
+    output['event_month'] = output['date'].dt.strftime('%Y-%m').fillna(NO_DATE)
+    return output
+
+def run_etl_pandas(input_paths: List[str], output_path: str, chunksize: int = 100_000) -> None:
+    """
+    Runs the ETL on pandas for machines without Spark. Requires a local output directory.
+
+    Args:
+        input_paths (List[str]): CSV files.
+        output_path (str): Destination directory of the partitioned dataset.
+        chunksize (int): Rows per CSV chunk.
+    """
+    frames, columns = [], []
+    for path in input_paths:
+        for chunk in read_feature_csv(path, chunksize=chunksize):
+            columns.append(chunk.columns)
+            frames.append(transform_frame(chunk))
+    if not frames:
+        logger.warning("No input rows found in %s", input_paths)
+        return
+
+    data = pd.concat(frames, ignore_index=True)
+    input_columns = {COLUMN_ALIASES.get(column, column) for chunk_columns in columns for column in chunk_columns}
+    data = data.drop_duplicates(subset=dedupe_keys([column for column in OUTPUT_SCHEMA if column in input_columns]))
+    data = data.sort_values(PARTITION_COLUMNS + ['date', 'artist_name'], na_position='last')
+
+    output = Path(output_path)
+    # Overwrite only the partitions present in this run, like the Spark job's dynamic overwrite
+    for genre, month in data[PARTITION_COLUMNS].drop_duplicates().itertuples(index=False):
+        partition = output / f'primary_genre={genre}' / f'event_month={month}'
+        if partition.exists():
+            shutil.rmtree(partition)
+    data.to_parquet(output, partition_cols=PARTITION_COLUMNS, index=False)
+    logger.info("Wrote %d rows to partitioned dataset %s", len(data), output_path)
+
+def run_etl(input_paths: List[str], output_path: str, engine: str = 'auto', chunksize: int = 100_000, spark=None) -> str:
+    """
+    Runs the artist / event ETL.
+
+    Args:
+        input_paths (List[str]): CSV files (or directories / S3 URIs with the Spark engine).
+        output_path (str): Destination directory of the partitioned dataset.
+        engine (str): 'spark', 'pandas', or 'auto' (Spark when installed).
+        chunksize (int): Rows per CSV chunk for the pandas engine.
+        spark: An existing SparkSession for the Spark engine.
+
+    Returns:
+        str: The engine that ran.
+    """
+    if engine == 'auto':
+        engine = 'spark' if spark is not None or spark_available() else 'pandas'
+    if engine == 'spark':
+        run_etl_spark(input_paths, output_path, spark)
+    elif engine == 'pandas':
+        run_etl_pandas(input_paths, output_path, chunksize)
+    else:
+        raise ValueError(f"Unknown ETL engine: {engine}")
+    return engine
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Partition crawled artist / event CSVs into Parquet.")
+    parser.add_argument('--input', nargs='+', required=True, help="Input CSV files.")
+    parser.add_argument('--output', required=True, help="Output dataset directory.")
+    parser.add_argument('--engine', choices=['auto', 'spark', 'pandas'], default='auto')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    # Glue passes its own job arguments (e.g. --JOB_NAME); ignore them
+    args, _ = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    engine = run_etl(args.input, args.output, args.engine, args.chunksize)
+    logger.info("ETL finished with the %s engine", engine)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,164 @@
+import atexit
+import copy
+import itertools
+import json
 import logging
 import logging.config
 import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Tuple
+
+# Rendered messages longer than this are cut; override with LOG_MAX_MESSAGE_LENGTH (0 disables)
+DEFAULT_MAX_MESSAGE_LENGTH = 4000
+
+# Keep one in this many DEBUG records per call site; override with LOG_DEBUG_SAMPLE_RATE (1 keeps all)
+DEFAULT_DEBUG_SAMPLE_RATE = 1
+
+# Attributes every LogRecord has; anything else was passed through extra= and goes into JSON output
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Listeners started by the last setup_logging call
+_listeners: List[QueueListener] = []
+
+# Renders tracebacks before records are queued
+_exception_formatter = logging.Formatter()
+
+class TruncatingFilter(logging.Filter):
+    """
+    Cuts rendered messages to max_length characters so that a logged API payload cannot flood the
+    log. Runs after the level check, so disabled records are never rendered.
+    """
+
+    def __init__(self, max_length: int = DEFAULT_MAX_MESSAGE_LENGTH):
+        super().__init__()
+        self.max_length = max_length
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.max_length <= 0:
+            return True
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            record.msg = f"{message[:self.max_length]}... [truncated {len(message) - self.max_length} chars]"
+            record.args = None
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps the first and then every rate-th record at or below max_level from each call site, so
+    debug lines inside loops stay cheap without disappearing entirely. Higher levels always pass.
+    """
+
+    def __init__(self, rate: int = DEFAULT_DEBUG_SAMPLE_RATE, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = max(1, rate)
+        self.max_level = max_level
+        self._counters: Dict[Tuple[str, int], itertools.count] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate == 1 or record.levelno > self.max_level:
+            return True
+        key = (record.pathname, record.lineno)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % self.rate == 0
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, including any fields passed through extra=.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        return json.dumps(entry, default=str)
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler that renders the message and traceback before queueing (arguments may change or
+    be unpicklable later) but keeps them as separate fields, so formatters on the listener side
+    still see the exception apart from the message.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def _use_queue_handlers(logger_names: List[str]):
+    """
+    Moves the handlers of the given loggers behind queues, each drained by a background listener,
+    so that file and console I/O happen off the request threads. Each wrapped handler gets its own
+    queue, which keeps the per-logger handler routing intact. Filters move to the queue side so
+    dropped and truncated records are decided before a record is queued.
+    """
+    wrapped: Dict[logging.Handler, StructuredQueueHandler] = {}
+    for name in logger_names:
+        target_logger = logging.getLogger(name)
+        for position, handler in enumerate(target_logger.handlers):
+            if handler not in wrapped:
+                queue_handler = StructuredQueueHandler(queue.SimpleQueue())
+                queue_handler.setLevel(handler.level)
+                for log_filter in handler.filters:
+                    queue_handler.addFilter(log_filter)
+                handler.filters = []
+                listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+                listener.start()
+                _listeners.append(listener)
+                wrapped[handler] = queue_handler
+            target_logger.handlers[position] = wrapped[handler]
+
+def stop_logging():
+    """
+    Flushes queued records and stops the background listeners.
+    """
+    while _listeners:
+        _listeners.pop().stop()
+
+atexit.register(stop_logging)
 
 def setup_logging(default_level=logging.INFO, log_file='project.log'):
     """
     Sets up logging configuration.
+
+    Environment overrides:
+        LOG_LEVEL: Root level name, e.g. DEBUG.
+        LOG_FORMAT: 'json' for structured output; plain text otherwise.
+        LOG_ASYNC: '0' to write from the logging thread instead of through queues.
+        LOG_MAX_MESSAGE_LENGTH, LOG_DEBUG_SAMPLE_RATE: See the defaults above.
     """
+    stop_logging()
     log_dir = os.path.join(os.path.dirname(__file__), '../logs')
     os.makedirs(log_dir, exist_ok=True)  # Ensure the logs directory exists
     log_path = os.path.join(log_dir, log_file)
+    json_output = os.getenv('LOG_FORMAT', '').lower() == 'json'
 
     logging_config = {
         'version': 1,
@@ -20,23 +170,38 @@ def setup_logging(default_level=logging.INFO, log_file='project.log'):
             'detailed': {
                 'format': '%(asctime)s - %(name)s - [%(filename)s:%(lineno)d] - %(levelname)s - %(message)s'
             },
+            'json': {
+                '()': JsonFormatter,
+            },
+        },
+        'filters': {
+            'truncate': {
+                '()': TruncatingFilter,
+                'max_length': _env_int('LOG_MAX_MESSAGE_LENGTH', DEFAULT_MAX_MESSAGE_LENGTH),
+            },
+            'sample_debug': {
+                '()': SamplingFilter,
+                'rate': _env_int('LOG_DEBUG_SAMPLE_RATE', DEFAULT_DEBUG_SAMPLE_RATE),
+            },
         },
         'handlers': {
             'console': {
                 'class': 'logging.StreamHandler',
-                'formatter': 'standard',
+                'formatter': 'json' if json_output else 'standard',
+                'filters': ['sample_debug', 'truncate'],
                 'level': logging.DEBUG
             },
             'file': {
                 'class': 'logging.FileHandler',
-                'formatter': 'detailed',
+                'formatter': 'json' if json_output else 'detailed',
+                'filters': ['sample_debug', 'truncate'],
                 'level': logging.INFO,
                 'filename': log_path
             },
         },
         'root': {
             'handlers': ['console', 'file'],
-            'level': default_level,
+            'level': os.getenv('LOG_LEVEL', default_level),
         },
         'loggers': {
             'django': {
@@ -53,3 +218,5 @@ def setup_logging(default_level=logging.INFO, log_file='project.log'):
     }
 
     logging.config.dictConfig(logging_config)
+    if os.getenv('LOG_ASYNC', '1') != '0':
+        _use_queue_handlers([None, 'django', 'apps'])
@@ -0,0 +1,264 @@
+"""
+In-process metrics: latency histograms per upstream and endpoint, cache hit/miss counters and
+upstream quota gauges, exposed in the Prometheus text format at /metrics. MetricsMiddleware times
+each request and reports the upstream time spent during it in a Server-Timing header.
+
+Metrics are per process; with several workers, scrape each one or aggregate in Prometheus.
+"""
+import abc
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Path segments that look like ids (contain a digit, or are long) are collapsed to keep label values bounded
+_ID_SEGMENT = re.compile(r'\d|^[A-Za-z0-9_-]{16,}$')
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric(abc.ABC):
+    """
+    A named metric; subclasses set kind and render their samples.
+    """
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}'] + self._samples()
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """
+        The metric's sample lines in the Prometheus text format.
+        """
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count per label combination.
+    """
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, default: Optional[float] = 0, **labels) -> Optional[float]:
+        return self._values.get(self._key(labels), default)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {value}' for key, value in values]
+
+class Gauge(Counter):
+    """
+    A value that can go up and down, e.g. the remaining upstream quota.
+    """
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    """
+    Observations counted into cumulative buckets, with their sum and count, per label combination.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: per-bucket counts (last slot is +Inf), sum, count
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0]))
+            counts[position] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            values = sorted((key, (list(counts), list(totals))) for key, (counts, totals) in self._values.items())
+        for key, (counts, (total, count)) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {count}')
+        return lines
+
+class MetricsRegistry:
+    """
+    Holds metrics in registration order and renders them for a scrape.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(line for metric in self._metrics for line in metric.render()) + '\n'
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'rlm_http_request_duration_seconds', 'Time to produce a response, per view.', ('view', 'method', 'status')))
+UPSTREAM_LATENCY = registry.register(Histogram(
+    'rlm_upstream_request_duration_seconds', 'Upstream call latency, per service and endpoint.', ('upstream', 'endpoint')))
+UPSTREAM_ERRORS = registry.register(Counter(
+    'rlm_upstream_errors_total', 'Upstream calls that raised or returned an error status.', ('upstream', 'endpoint')))
+CACHE_REQUESTS = registry.register(Counter(
+    'rlm_cache_requests_total', 'Cache lookups by cache and result (hit or miss).', ('cache', 'result')))
+QUOTA_REMAINING = registry.register(Gauge(
+    'rlm_upstream_quota_remaining', 'Remaining upstream API quota as last reported by the service.', ('upstream',)))
+QUOTA_LIMIT = registry.register(Gauge(
+    'rlm_upstream_quota_limit', 'Upstream API quota limit as last reported by the service.', ('upstream',)))
+CIRCUIT_STATE = registry.register(Gauge(
+    'rlm_circuit_state', 'Upstream circuit breaker state: 0 closed, 1 half-open, 2 open.', ('upstream',)))
+
+# Upstream time spent by the current request: {upstream: [seconds, calls]}; None outside a request
+_request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar('request_timings', default=None)
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Reduces an endpoint path to a bounded label, e.g. 'events/G5vYZ9n1' -> 'events/:id'.
+    """
+    path = endpoint.split('?', 1)[0].strip('/')
+    return '/'.join(':id' if _ID_SEGMENT.search(segment) else segment for segment in path.split('/')) or '/'
+
+def record_upstream(upstream: str, endpoint: str, seconds: float, error: bool = False):
+    """
+    Records one upstream call in the latency histogram and in the current request's timings.
+    """
+    endpoint = endpoint_label(endpoint)
+    UPSTREAM_LATENCY.observe(seconds, upstream=upstream, endpoint=endpoint)
+    if error:
+        UPSTREAM_ERRORS.inc(upstream=upstream, endpoint=endpoint)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(upstream, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+@contextmanager
+def timed(upstream: str, endpoint: str) -> Iterator[None]:
+    """
+    Times the enclosed upstream call; an exception counts as an error and is re-raised.
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_upstream(upstream, endpoint, time.perf_counter() - start, error)
+
+def record_cache(cache_name: str, hit: bool):
+    """
+    Counts a cache lookup; the hit ratio is hits / (hits + misses) per cache.
+    """
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+def record_quota(upstream: str, remaining: Optional[str], limit: Optional[str] = None):
+    """
+    Stores quota figures reported in upstream response headers; missing or malformed values are ignored.
+    """
+    for gauge, value in ((QUOTA_REMAINING, remaining), (QUOTA_LIMIT, limit)):
+        try:
+            if value is not None:
+                gauge.set(float(value), upstream=upstream)
+        except ValueError:
+            logger.debug("Ignoring malformed quota header for %s: %r", upstream, value)
+
+def server_timing(timings: Dict[str, List[float]], total: float) -> str:
+    """
+    Builds a Server-Timing header value: total time, then time per upstream.
+    """
+    parts = [f'total;dur={total * 1000:.1f}']
+    parts.extend(
+        f'{upstream};dur={seconds * 1000:.1f};desc="{int(calls)} call{"s" if calls != 1 else ""}"'
+        for upstream, (seconds, calls) in timings.items()
+    )
+    return ', '.join(parts)
+
+class MetricsMiddleware:
+    """
+    Times each request, records it per view, and adds a Server-Timing header with the upstream time
+    spent while producing the response. For streamed responses this covers time to first byte only.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings: Dict[str, List[float]] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_timings.reset(token)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        REQUEST_LATENCY.observe(
+            elapsed,
+            view=match.view_name if match else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+        )
+        response['Server-Timing'] = server_timing(timings, elapsed)
+        return response
+
+def metrics_view(request):
+    """
+    Serves all metrics in the Prometheus text exposition format.
+    """
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_processing.features import build_sales_features
+
+logger = logging.getLogger(__name__)
+
+# Default location of trained sales model artifacts; override with SALES_MODEL_PATH
+MODEL_DIR = Path(__file__).resolve().parent.parent / 'ml_artifacts' / 'sales_model'
+LATEST_POINTER = 'LATEST'
+
+# Placeholder values returned until a trained model is available
+DEFAULT_PREDICTED_SALES = 10000
+DEFAULT_SUGGESTED_PRICE = 50
+
+def resolve_artifact_path(path: Optional[str] = None) -> Path:
+    """
+    Resolves the model artifact to load. A directory resolves to the artifact named in its LATEST file.
+
+    Args:
+        path (Optional[str]): An artifact file or directory. Defaults to SALES_MODEL_PATH or MODEL_DIR.
+
+    Returns:
+        Path: The artifact file path (which may not exist).
+    """
+    artifact = Path(path or os.getenv('SALES_MODEL_PATH') or MODEL_DIR)
+    if artifact.is_dir():
+        pointer = artifact / LATEST_POINTER
+        if pointer.exists():
+            return artifact / pointer.read_text().strip()
+    return artifact
+
+class SalesPredictor:
+    """
+    Scores ticket sales and suggested price for a batch of events with the trained sales model.
+    The model is loaded once; feature rows are memoized since the same artist/venue/date
+    combinations come up repeatedly across requests.
+    """
+
+    def __init__(self, artifact_path: Optional[str] = None, feature_cache_size: int = 10000):
+        """
+        Loads the model artifact if one exists. Without one, predict() returns the placeholder values.
+
+        Args:
+            artifact_path (Optional[str]): Artifact file or directory, see resolve_artifact_path.
+            feature_cache_size (int): Maximum number of memoized feature rows.
+        """
+        self.model = None
+        self.vocabulary: List[str] = []
+        self.version: Optional[str] = None
+        self.feature_cache_size = feature_cache_size
+        self._feature_cache: 'OrderedDict[Tuple, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        path = resolve_artifact_path(artifact_path)
+        if not path.is_file():
+            logger.warning("No sales model found at %s; using placeholder predictions.", path)
+            return
+
+        artifact = joblib.load(path)
+        self.model = artifact['model']
+        # Artifacts trained before n_jobs was reset for saving still carry the training value
+        if 'n_jobs' in self.model.get_params():
+            self.model.set_params(n_jobs=1)
+        self.vocabulary = artifact['genre_vocabulary']
+        self.version = artifact.get('version')
+        logger.info("Loaded sales model %s from %s", self.version, path)
+
+    def predict(self, rows: List[Dict[str, Any]]) -> List[Tuple[int, float]]:
+        """
+        Predicts (ticket sales, ticket price) for every row in a single model call.
+
+        Args:
+            rows (List[Dict[str, Any]]): One dict per event with 'popularity', 'followers', 'genre'
+                (comma-joined), 'venue_capacity' and 'date' (YYYY-MM-DD); missing values are allowed.
+
+        Returns:
+            List[Tuple[int, float]]: Predicted ticket sales and suggested price per row, in order.
+        """
+        if not rows:
+            return []
+        if self.model is None:
+            return [(DEFAULT_PREDICTED_SALES, DEFAULT_SUGGESTED_PRICE)] * len(rows)
+
+        features = self._feature_matrix(rows)
+        predictions = np.atleast_2d(self.model.predict(features))
+        sales = np.clip(np.rint(predictions[:, 0]), 0, None).astype(int)
+        prices = np.clip(np.round(predictions[:, 1], 2), 0, None)
+        return list(zip(sales.tolist(), prices.tolist()))
+
+    def _feature_matrix(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Builds the feature matrix for rows, computing features only for rows not already memoized.
+        """
+        keys = [
+            (row.get('popularity'), row.get('followers'), row.get('genre'), row.get('venue_capacity'), row.get('date'))
+            for row in rows
+        ]
+
+        cached = {}
+        with self._lock:
+            for key in keys:
+                if key in self._feature_cache:
+                    self._feature_cache.move_to_end(key)
+                    cached[key] = self._feature_cache[key]
+
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            frame = pd.DataFrame(missing, columns=['popularity', 'followers', 'genre', 'venue_capacity', 'date'])
+            for key, vector in zip(missing, build_sales_features(frame, self.vocabulary)):
+                cached[key] = vector
+
+            with self._lock:
+                for key in missing:
+                    self._feature_cache[key] = cached[key]
+                while len(self._feature_cache) > self.feature_cache_size:
+                    self._feature_cache.popitem(last=False)
+
+        return np.vstack([cached[key] for key in keys])
+
+@lru_cache(maxsize=1)
+def get_sales_predictor() -> SalesPredictor:
+    """
+    Returns the process-wide SalesPredictor, loading the model on first use.
+    """
+    return SalesPredictor()
@@ -0,0 +1,170 @@
+"""
+Opt-in cProfile hooks for views and long-running jobs.
+
+Profiling is off unless PROFILING=1 is set (every decorated call is profiled) or a staff user adds
+?profile=1 to a request. Each profiled call writes a .prof file plus a .json file with its metadata
+to PROFILE_DIR (default logs/profiles). Aggregate the hottest functions across runs with:
+    python -m shared_services.profiling --label search_artist_route --top 25
+"""
+import argparse
+import cProfile
+import functools
+import glob
+import itertools
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = Path(__file__).resolve().parent.parent / 'logs' / 'profiles'
+
+# Query parameter that turns on profiling for one request by a staff user
+PROFILE_QUERY_PARAM = 'profile'
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+# Distinguishes profiles written by one process within the same second
+_sequence = itertools.count()
+
+def profile_dir() -> Path:
+    return Path(os.getenv('PROFILE_DIR') or DEFAULT_PROFILE_DIR)
+
+def profiling_enabled(request=None) -> bool:
+    """
+    Whether to profile the current call: always with PROFILING=1, otherwise only for staff requests
+    carrying ?profile=1.
+    """
+    if os.getenv('PROFILING', '0') == '1':
+        return True
+    if request is None or request.GET.get(PROFILE_QUERY_PARAM) != '1':
+        return False
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+def write_profile(profiler: cProfile.Profile, label: str, metadata: Dict[str, Any]) -> Optional[Path]:
+    """
+    Writes a profile and its metadata as <label>-<UTC timestamp>-<pid>-<n>.prof / .json.
+
+    Returns:
+        Optional[Path]: The .prof path, or None if it could not be written.
+    """
+    directory = profile_dir()
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+    path = directory / f"{label}-{stamp}-{os.getpid()}-{next(_sequence)}.prof"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        path.with_suffix('.json').write_text(json.dumps({'label': label, **metadata}, default=str, indent=2))
+    except OSError as e:
+        logger.error("Could not write profile %s: %s", path, e)
+        return None
+    logger.info("Wrote profile %s (%.1f ms)", path, metadata.get('duration_ms', 0))
+    return path
+
+def profile_view(view: Callable) -> Callable:
+    """
+    Decorator for function views: profiles the request when profiling_enabled() says so and
+    records the request's method, path, query, status and duration with the profile.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not profiling_enabled(request):
+            return view(request, *args, **kwargs)
+
+        profiler = cProfile.Profile()
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = profiler.runcall(view, request, *args, **kwargs)
+            return response
+        finally:
+            write_profile(profiler, view.__name__, {
+                'started_at': started_at.isoformat(),
+                'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+                'method': request.method,
+                'path': request.path,
+                'query': {key: value for key, value in request.GET.items() if key != PROFILE_QUERY_PARAM},
+                'status': getattr(response, 'status_code', None),
+                'pid': os.getpid(),
+            })
+    return wrapper
+
+def profile_job(label: str) -> Callable:
+    """
+    Decorator for jobs such as crawls: profiles every call when PROFILING=1.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled():
+                return func(*args, **kwargs)
+
+            profiler = cProfile.Profile()
+            started_at = datetime.now(timezone.utc)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = profiler.runcall(func, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                write_profile(profiler, label, {
+                    'started_at': started_at.isoformat(),
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+                    'function': func.__qualname__,
+                    'failed': failed,
+                    'pid': os.getpid(),
+                })
+        return wrapper
+    return decorator
+
+def find_profiles(directory: Path, label: Optional[str] = None, since: Optional[str] = None) -> List[Path]:
+    """
+    Lists .prof files in a directory, optionally only those for one label or written since a
+    UTC timestamp prefix such as 20250101 or 20250101T12.
+    """
+    paths = sorted(Path(path) for path in glob.glob(str(directory / f"{label or '*'}-*.prof")))
+    if since:
+        # Names end with -<timestamp>-<pid>-<n>
+        paths = [path for path in paths if path.stem.rsplit('-', 3)[1] >= since]
+    return paths
+
+def aggregate_profiles(paths: List[Path], top: int = 25, sort: str = 'cumulative', stream=None) -> Optional[pstats.Stats]:
+    """
+    Merges profiles and prints the top functions by the given sort key.
+    """
+    if not paths:
+        return None
+    stats = pstats.Stats(str(paths[0]), stream=stream or sys.stdout)
+    for path in paths[1:]:
+        stats.add(str(path))
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return stats
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregate the hottest functions across saved profiles.")
+    parser.add_argument('--dir', type=Path, default=None, help="Profile directory (default: PROFILE_DIR or logs/profiles).")
+    parser.add_argument('--label', help="Only profiles for this view or job, e.g. search_artist_route.")
+    parser.add_argument('--since', help="Only profiles written at or after this UTC timestamp prefix, e.g. 20250101T12.")
+    parser.add_argument('--top', type=int, default=25, help="Number of functions to show.")
+    parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+    args = parser.parse_args(argv)
+
+    paths = find_profiles(args.dir or profile_dir(), args.label, args.since)
+    if not paths:
+        print("No profiles found.", file=sys.stderr)
+        return 1
+    print(f"Aggregating {len(paths)} profiles")
+    aggregate_profiles(paths, args.top, args.sort)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,278 @@
+"""
+Daily upstream quota accounting. Every upstream call is counted in a persistent ledger per provider,
+endpoint and consumer, the kind of caller that made it:
+
+- interactive: views serving users (the default)
+- warmer: the artist cache warmer
+- batch: crawls, syncs and other background jobs
+
+Each consumer may use a share of a provider's daily limit, and stops before the remaining quota drops
+below its reserve. Reserves are ordered by priority, so batch jobs stop first, the warmer next, and
+interactive requests can use whatever is left. Background jobs declare their consumer:
+
+    with consumer(BATCH):
+        api.make_request('events', params=params)
+
+The ledger is a SQLite file (QUOTA_LEDGER_PATH, default logs/quota.sqlite3) shared by every process
+on the host. Days are UTC days. Remaining quota is served as JSON at /quota.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from django.http import JsonResponse
+
+from integrations.errors import QuotaExceededError
+from shared_services.metrics import endpoint_label
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEDGER_PATH = Path(__file__).resolve().parent.parent / 'logs' / 'quota.sqlite3'
+
+INTERACTIVE = 'interactive'
+WARMER = 'warmer'
+BATCH = 'batch'
+CONSUMERS = (INTERACTIVE, WARMER, BATCH)
+
+# Calls per UTC day by provider; override with QUOTA_LIMIT_<PROVIDER>. Other providers are counted, not limited.
+DAILY_LIMITS = {'ticketmaster': 5000}
+
+# Highest share of a provider's daily limit each consumer may use
+CONSUMER_BUDGETS = {INTERACTIVE: 1.0, WARMER: 0.25, BATCH: 0.4}
+
+# Share of the daily limit that must remain for a consumer to make a call; sets its priority
+CONSUMER_RESERVES = {INTERACTIVE: 0.0, WARMER: 0.2, BATCH: 0.3}
+
+# Days of ledger history kept
+LEDGER_RETENTION = timedelta(days=90)
+
+# Consumer making the current calls
+_consumer: ContextVar[str] = ContextVar('quota_consumer', default=INTERACTIVE)
+
+# Remaining quota last reported by each provider in this process: {provider: (UTC day, remaining)}
+_reported: Dict[str, Tuple[str, int]] = {}
+_reported_lock = threading.Lock()
+
+def today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+def seconds_until_reset() -> float:
+    now = datetime.now(timezone.utc)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return (tomorrow - now).total_seconds()
+
+class QuotaLedger:
+    """
+    Call counts per (UTC day, provider, endpoint, consumer) in a SQLite file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS calls (
+                    day TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    consumer TEXT NOT NULL,
+                    calls INTEGER NOT NULL,
+                    PRIMARY KEY (day, provider, endpoint, consumer)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation: sqlite3 connections cannot be shared between threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, provider: str, endpoint: str, consumer: str, calls: int = 1, day: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO calls (day, provider, endpoint, consumer, calls) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (day, provider, endpoint, consumer) DO UPDATE SET calls = calls + excluded.calls
+                """,
+                (day or today(), provider, endpoint, consumer, calls),
+            )
+
+    def used(self, provider: str, consumer: Optional[str] = None, day: Optional[str] = None) -> int:
+        """
+        Calls made to a provider on a day, by all consumers or one.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(calls), 0) FROM calls WHERE day = ? AND provider = ? AND (? IS NULL OR consumer = ?)",
+                (day or today(), provider, consumer, consumer),
+            ).fetchone()
+        return row[0]
+
+    def usage(self, day: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        A day's calls per provider, endpoint and consumer.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT provider, endpoint, consumer, calls FROM calls WHERE day = ? ORDER BY provider, endpoint, consumer",
+                (day or today(),),
+            ).fetchall()
+        return [dict(zip(('provider', 'endpoint', 'consumer', 'calls'), row)) for row in rows]
+
+    def prune(self, before: date) -> int:
+        """
+        Deletes days before the given date.
+        """
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM calls WHERE day < ?", (before.isoformat(),)).rowcount
+
+@lru_cache(maxsize=1)
+def get_ledger() -> QuotaLedger:
+    """
+    Returns the process-wide ledger at QUOTA_LEDGER_PATH.
+    """
+    return QuotaLedger(os.getenv('QUOTA_LEDGER_PATH') or DEFAULT_LEDGER_PATH)
+
+@contextmanager
+def consumer(name: str) -> Iterator[None]:
+    """
+    Counts and budgets upstream calls made in the enclosed code against the given consumer.
+    """
+    if name not in CONSUMERS:
+        raise ValueError(f"Unknown quota consumer {name!r}; expected one of {', '.join(CONSUMERS)}")
+    token = _consumer.set(name)
+    try:
+        yield
+    finally:
+        _consumer.reset(token)
+
+def current_consumer() -> str:
+    return _consumer.get()
+
+def daily_limit(provider: str) -> Optional[int]:
+    """
+    A provider's daily call limit, or None if it is not limited.
+    """
+    override = os.getenv(f'QUOTA_LIMIT_{provider.upper()}')
+    return int(override) if override else DAILY_LIMITS.get(provider)
+
+def daily_budget(provider: str, consumer_name: str) -> Optional[int]:
+    """
+    Calls a consumer may make to a provider per day, or None if the provider is not limited.
+    """
+    limit = daily_limit(provider)
+    return None if limit is None else int(limit * CONSUMER_BUDGETS[consumer_name])
+
+def note_reported(provider: str, reported_remaining: Optional[str]):
+    """
+    Keeps the remaining quota a provider reported, e.g. in a response header, for today's accounting.
+    Calls made with the same key outside this ledger show up there.
+    """
+    try:
+        value = int(float(reported_remaining)) if reported_remaining is not None else None
+    except ValueError:
+        return
+    if value is not None:
+        with _reported_lock:
+            _reported[provider] = (today(), value)
+
+def remaining(provider: str, consumer_name: Optional[str] = None) -> Optional[int]:
+    """
+    Calls left today: for the provider as a whole, or for one consumer within its budget and above
+    its reserve. None if the provider is not limited.
+    """
+    limit = daily_limit(provider)
+    if limit is None:
+        return None
+    ledger = get_ledger()
+    left = limit - ledger.used(provider)
+    with _reported_lock:
+        reported = _reported.get(provider)
+    if reported and reported[0] == today():
+        left = min(left, reported[1])
+    if consumer_name is None:
+        return max(0, left)
+    within_budget = daily_budget(provider, consumer_name) - ledger.used(provider, consumer_name)
+    above_reserve = left - int(limit * CONSUMER_RESERVES[consumer_name])
+    return max(0, min(within_budget, above_reserve))
+
+def allows(provider: str, calls: int = 1, consumer_name: Optional[str] = None) -> bool:
+    """
+    Whether a consumer (the current one by default) may make the given number of calls now.
+    Interactive calls are never held back by the ledger.
+    """
+    consumer_name = consumer_name or current_consumer()
+    if consumer_name == INTERACTIVE:
+        return True
+    left = remaining(provider, consumer_name)
+    return left is None or left >= calls
+
+def check_quota(provider: str):
+    """
+    Raises QuotaExceededError if the current consumer may not call the provider now.
+    """
+    if not allows(provider):
+        raise QuotaExceededError(provider, current_consumer(), seconds_until_reset())
+
+def record_call(provider: str, endpoint: str):
+    """
+    Counts one call in the ledger against the current consumer. Failures are logged, never raised,
+    so accounting cannot fail a call that was already made.
+    """
+    try:
+        get_ledger().record(provider, endpoint_label(endpoint), current_consumer())
+    except sqlite3.Error as e:
+        logger.warning("Could not record %s %s in the quota ledger: %s", provider, endpoint, e)
+
+def quota_status(day: Optional[str] = None) -> Dict[str, Any]:
+    """
+    A day's usage per provider, endpoint and consumer, with the remaining quota if the day is today.
+    """
+    day = day or today()
+    usage = get_ledger().usage(day)
+    # Remaining quota only makes sense for the current day
+    current = day == today()
+    providers = sorted(set(DAILY_LIMITS) | {row['provider'] for row in usage})
+    status = {'day': day, 'resets_in': round(seconds_until_reset()), 'providers': {}}
+    for provider in providers:
+        rows = [row for row in usage if row['provider'] == provider]
+        endpoints: Dict[str, int] = {}
+        for row in rows:
+            endpoints[row['endpoint']] = endpoints.get(row['endpoint'], 0) + row['calls']
+        status['providers'][provider] = {
+            'limit': daily_limit(provider),
+            'used': sum(row['calls'] for row in rows),
+            'remaining': remaining(provider) if current else None,
+            'endpoints': endpoints,
+            'consumers': {
+                name: {
+                    'used': sum(row['calls'] for row in rows if row['consumer'] == name),
+                    'budget': daily_budget(provider, name),
+                    'remaining': remaining(provider, name) if current else None,
+                }
+                for name in CONSUMERS
+            },
+        }
+    return status
+
+def quota_view(request):
+    """
+    Serves quota_status() as JSON; ?day=YYYY-MM-DD shows an earlier day's usage.
+    """
+    day = request.GET.get('day') or None
+    if day:
+        try:
+            date.fromisoformat(day)
+        except ValueError:
+            return JsonResponse({'error': 'day must be a YYYY-MM-DD date.'}, status=400)
+    return JsonResponse(quota_status(day))
@@ -1,65 +1,80 @@
-from AWSDataManager import AWSDataManager  # Import your AWSDataManager class
+import os
 
-# Step 1: Initialize the AWSDataManager
-bucket_name = "your-s3-bucket-name"
-aws_manager = AWSDataManager(bucket_name)
+from shared_services.aws_data_manager import AWSDataManager
 
-# Step 2: Upload and Validate Data
-local_file_path = "path/to/your/local_file.csv"
-s3_key = "data/train/local_file.csv"
+def main():
+    # Step 1: Initialize the AWSDataManager
+    bucket_name = os.getenv('S3_BUCKET_NAME', "your-s3-bucket-name")
+    aws_manager = AWSDataManager(
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.getenv('REGION_NAME'),
+        table_name=os.getenv('TABLE_NAME'),
+        bucket_name=bucket_name
+    )
 
-print("Uploading file...")
-aws_manager.upload_file(local_file_path, bucket_name, s3_key)
+    # Step 2: Upload and Validate Data
+    local_file_path = "path/to/your/local_file.csv"
+    s3_key = "data/train/local_file.csv"
 
-print("Validating file...")
-if aws_manager.validate_file(bucket_name, s3_key):
-    print(f"File validated successfully at s3://{bucket_name}/{s3_key}")
-else:
-    print(f"Validation failed for s3://{bucket_name}/{s3_key}")
-    exit(1)
+    print("Uploading file...")
+    if not aws_manager.upload_file(local_file_path, bucket_name, s3_key):
+        print("Upload failed.")
+        return 1
 
-# Step 3: Retrieve Input Path for SageMaker
-print("Retrieving training input path...")
-train_path = aws_manager.get_training_input_path(data_type="train")
-print(f"Training data path: {train_path}")
+    print("Validating file...")
+    if aws_manager.validate_file(bucket_name, s3_key, local_path=local_file_path):
+        print(f"File validated successfully at s3://{bucket_name}/{s3_key}")
+    else:
+        print(f"Validation failed for s3://{bucket_name}/{s3_key}")
+        return 1
 
-# Step 4: SageMaker Training Job (Pseudo-code for SageMaker)
-# Replace this with actual SageMaker training job code
-print("Starting SageMaker training job...")
-# SageMaker training logic goes here
-# Example:
-# estimator.fit({'train': train_path})
+    # Step 3: Retrieve Input Path for SageMaker
+    print("Retrieving training input path...")
+    train_path = aws_manager.get_training_input_path(data_type="train")
+    print(f"Training data path: {train_path}")
 
-# Step 5: Post-Training Artifact Handling
-training_job_name = "your-sagemaker-job-name"
-print("Retrieving model artifact path...")
-model_artifact_path = aws_manager.get_model_artifact_path(training_job_name)
-print(f"Model artifact stored at: {model_artifact_path}")
+    # Step 4: SageMaker Training Job (Pseudo-code for SageMaker)
+    # Replace this with actual SageMaker training job code
+    print("Starting SageMaker training job...")
+    # SageMaker training logic goes here
+    # Example:
+    # estimator.fit({'train': train_path})
 
-# Step 6: Download Model Artifacts Locally
-local_model_path = "path/to/save/local_model.tar.gz"
-print("Downloading model artifact...")
-aws_manager.download_file(bucket_name, model_artifact_path, local_model_path)
-print(f"Model artifact downloaded to: {local_model_path}")
+    # Step 5: Post-Training Artifact Handling
+    training_job_name = "your-sagemaker-job-name"
+    print("Retrieving model artifact path...")
+    model_artifact_path = aws_manager.get_model_artifact_path(training_job_name)
+    print(f"Model artifact stored at: {model_artifact_path}")
 
-# Step 7: Validate Schema (Optional)
-schema_definition = {
-    "columns": ["feature1", "feature2", "label"],
-    "types": ["float", "int", "int"]
-}
-print("Validating schema...")
-if aws_manager.validate_schema(s3_key, schema_definition):
-    print("Schema validated successfully.")
-else:
-    print("Schema validation failed.")
+    # Step 6: Download Model Artifacts Locally
+    local_model_path = "path/to/save/local_model.tar.gz"
+    print("Downloading model artifact...")
+    aws_manager.download_file(bucket_name, model_artifact_path, local_model_path)
+    print(f"Model artifact downloaded to: {local_model_path}")
 
-# Step 8: Run Glue Crawler (Optional)
-crawler_name = "your-glue-crawler"
-print("Running Glue crawler...")
-aws_manager.run_crawler(crawler_name)
-print("Glue crawler run completed.")
+    # Step 7: Validate Schema (Optional)
+    schema_definition = {
+        "columns": ["feature1", "feature2", "label"],
+        "types": ["float", "int", "int"]
+    }
+    print("Validating schema...")
+    if aws_manager.validate_schema(s3_key, schema_definition):
+        print("Schema validated successfully.")
+    else:
+        print("Schema validation failed.")
 
-# Step 9: Query Metadata from Glue Catalog (Optional)
-print("Querying Glue catalog...")
-metadata = aws_manager.query_catalog(database_name="your-database", table_name="your-table")
-print(f"Metadata from Glue catalog: {metadata}")
+    # Step 8: Run Glue Crawler (Optional)
+    crawler_name = "your-glue-crawler"
+    print("Running Glue crawler...")
+    aws_manager.run_crawler(crawler_name, wait=True)
+    print("Glue crawler run completed.")
+
+    # Step 9: Query Metadata from Glue Catalog (Optional)
+    print("Querying Glue catalog...")
+    metadata = aws_manager.query_catalog(database_name="your-database", table_name="your-table")
+    print(f"Metadata from Glue catalog: {metadata}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
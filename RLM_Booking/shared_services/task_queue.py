@@ -0,0 +1,618 @@
+"""
+Background jobs. Functions registered with @task are queued on a broker and run by a worker
+process, which also enqueues the periodic jobs registered with schedule():
+
+    @task('sweep_expired_events')
+    def sweep_expired_events():
+        ...
+
+    schedule('sweep_expired_events', every=timedelta(hours=6))
+    enqueue('sweep_expired_events')
+
+Start a worker with `python manage.py run_worker` and inspect jobs with `python manage.py jobs`.
+The broker is chosen with TASK_BROKER: 'sqlite' (default, a file shared by every process on the
+host, see TASK_BROKER_PATH) or 'memory' (one process only, for tests and development).
+"""
+import abc
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from django.db import close_old_connections
+
+from integrations.circuit_breaker import OPEN, get_circuit_breaker
+from integrations.errors import CircuitOpenError, RateLimitedError, UpstreamRequestError
+from shared_services.deadline import deadline
+from shared_services.quota import BATCH, allows, consumer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROKER_PATH = Path(__file__).resolve().parent.parent / 'logs' / 'tasks.sqlite3'
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED)
+
+# Jobs a worker runs at once across all tasks; override with TASK_WORKER_CONCURRENCY
+DEFAULT_WORKER_CONCURRENCY = 4
+
+# Seconds the worker sleeps when there is nothing it may run
+POLL_INTERVAL = 2.0
+
+# Retries wait RETRY_BASE * 2 ** (attempt - 1) seconds, at most RETRY_CAP
+RETRY_BASE = 60.0
+RETRY_CAP = 3600.0
+
+# A job still running after this long is assumed lost with its worker and is queued again
+STALE_AFTER = timedelta(hours=6)
+
+# How often a running worker looks for jobs lost by another worker
+STALE_CHECK_INTERVAL = timedelta(minutes=10)
+
+class Job(NamedTuple):
+    """
+    A snapshot of one queued or finished job. Times are time.time() values.
+    """
+    id: str
+    name: str
+    kwargs: Dict[str, Any]
+    status: str
+    run_at: float
+    attempts: int
+    max_attempts: int
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: str = ''
+
+    @property
+    def key(self) -> str:
+        return job_key(self.name, self.kwargs)
+
+class TaskSpec(NamedTuple):
+    """
+    A registered task and the limits the worker applies to it.
+    """
+    name: str
+    func: Callable[..., Any]
+    # Jobs of this task running at once
+    concurrency: int
+    max_attempts: int
+    # Provider the task calls; the task waits while its consumer's quota would not cover cost
+    upstream: Optional[str]
+    # Host whose circuit breaker must be closed for the task to start
+    host: Optional[str]
+    # Estimated upstream calls per run
+    cost: int
+    # Seconds a run may take; upstream calls inside it are cut short by the deadline
+    time_limit: Optional[float]
+    # Quota consumer (shared_services.quota) the task's upstream calls are counted against
+    consumer: str
+
+class Schedule(NamedTuple):
+    task: str
+    every: float
+    kwargs: Dict[str, Any]
+
+_tasks: Dict[str, TaskSpec] = {}
+_schedules: List[Schedule] = []
+
+def job_key(name: str, kwargs: Dict[str, Any]) -> str:
+    """
+    Identifies jobs that do the same work, so a job is not queued twice.
+    """
+    return f"{name}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+def task(name: str, concurrency: int = 1, max_attempts: int = 3, upstream: Optional[str] = None,
+         host: Optional[str] = None, cost: int = 0, time_limit: Optional[float] = None,
+         consumer: str = BATCH) -> Callable:
+    """
+    Registers a function as a background task. Job arguments are passed as keyword arguments and
+    must be JSON serializable, as must the return value.
+
+    Args:
+        name (str): Name the task is enqueued by.
+        concurrency (int): Jobs of this task a worker runs at once.
+        max_attempts (int): Runs before a failing job is marked failed.
+        upstream (Optional[str]): Provider whose remaining quota must cover cost before a job starts.
+        host (Optional[str]): Upstream host whose circuit breaker must not be open.
+        cost (int): Estimated upstream calls per run.
+        time_limit (Optional[float]): Deadline in seconds for each run.
+        consumer (str): Quota consumer the task's calls count against.
+    """
+    def decorator(func: Callable) -> Callable:
+        _tasks[name] = TaskSpec(name, func, concurrency, max_attempts, upstream, host, cost, time_limit, consumer)
+        return func
+    return decorator
+
+def schedule(task_name: str, every: Union[float, timedelta], **kwargs):
+    """
+    Has the worker enqueue a task every given number of seconds, counted from the last time it was queued.
+    """
+    seconds = every.total_seconds() if isinstance(every, timedelta) else float(every)
+    _schedules.append(Schedule(task_name, seconds, kwargs))
+
+def get_task(name: str) -> TaskSpec:
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise KeyError(f"Unknown task {name!r}; registered: {', '.join(sorted(_tasks)) or 'none'}") from None
+
+def registered_tasks() -> Dict[str, TaskSpec]:
+    return dict(_tasks)
+
+def registered_schedules() -> List[Schedule]:
+    return list(_schedules)
+
+class Broker(abc.ABC):
+    """
+    Stores jobs and hands them out to workers. Implementations must make claim() atomic, so a
+    job is claimed by one worker only.
+    """
+
+    @abc.abstractmethod
+    def push(self, job: Job) -> Job:
+        """
+        Stores a new job.
+        """
+
+    @abc.abstractmethod
+    def claim(self, names: Collection[str], now: float) -> Optional[Job]:
+        """
+        Marks the longest-waiting due job of one of the given tasks as running and returns it.
+        """
+
+    @abc.abstractmethod
+    def finish(self, job_id: str, status: str, result: Any = None, error: str = '', run_at: Optional[float] = None):
+        """
+        Records a run's outcome. With status QUEUED the job is retried at run_at.
+        """
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        The job with the given id, or None if it does not exist (or was pruned).
+        """
+
+    @abc.abstractmethod
+    def jobs(self, name: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """
+        The most recently created jobs, optionally of one task or status.
+        """
+
+    @abc.abstractmethod
+    def find(self, key: str, statuses: Collection[str] = STATUSES) -> Optional[Job]:
+        """
+        The most recently created job with the given job_key and one of the statuses.
+        """
+
+    @abc.abstractmethod
+    def requeue_stale(self, started_before: float) -> int:
+        """
+        Queues running jobs started before the given time again, e.g. after a worker crashed.
+        """
+
+    @abc.abstractmethod
+    def prune(self, finished_before: float) -> int:
+        """
+        Deletes succeeded and failed jobs that finished before the given time.
+        """
+
+class MemoryBroker(Broker):
+    """
+    Keeps jobs in a dict; only the process that created it sees them.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def push(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def claim(self, names: Collection[str], now: float) -> Optional[Job]:
+        with self._lock:
+            due = [job for job in self._jobs.values() if job.status == QUEUED and job.name in names and job.run_at <= now]
+            if not due:
+                return None
+            job = min(due, key=lambda job: (job.run_at, job.created_at))
+            job = self._jobs[job.id] = job._replace(status=RUNNING, attempts=job.attempts + 1, started_at=now)
+            return job
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: str = '', run_at: Optional[float] = None):
+        with self._lock:
+            job = self._jobs[job_id]
+            if status == QUEUED:
+                self._jobs[job_id] = job._replace(status=QUEUED, error=error, run_at=run_at or time.time())
+            else:
+                self._jobs[job_id] = job._replace(status=status, result=result, error=error, finished_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self, name: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        with self._lock:
+            jobs = [
+                job for job in self._jobs.values()
+                if (name is None or job.name == name) and (status is None or job.status == status)
+            ]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)[:limit]
+
+    def find(self, key: str, statuses: Collection[str] = STATUSES) -> Optional[Job]:
+        with self._lock:
+            matching = [job for job in self._jobs.values() if job.status in statuses and job.key == key]
+        return max(matching, key=lambda job: job.created_at, default=None)
+
+    def requeue_stale(self, started_before: float) -> int:
+        with self._lock:
+            stale = [job for job in self._jobs.values() if job.status == RUNNING and job.started_at < started_before]
+            for job in stale:
+                self._jobs[job.id] = job._replace(status=QUEUED, run_at=time.time())
+        return len(stale)
+
+    def prune(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [
+                job.id for job in self._jobs.values()
+                if job.status in (SUCCEEDED, FAILED) and job.finished_at < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+class SqliteBroker(Broker):
+    """
+    Keeps jobs in a SQLite file, so web processes can enqueue jobs for a worker and several
+    workers on one host can share the queue.
+    """
+
+    _COLUMNS = ('id', 'name', 'kwargs', 'status', 'run_at', 'attempts', 'max_attempts', 'created_at',
+                'started_at', 'finished_at', 'result', 'error')
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    kwargs TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    run_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    max_attempts INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status_run_at_idx ON jobs (status, run_at);
+                CREATE INDEX IF NOT EXISTS jobs_key_idx ON jobs (key, created_at);
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation: sqlite3 connections cannot be shared between threads
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            # Take the write lock up front so two workers cannot claim the same job
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def _select(self, conn: sqlite3.Connection, where: str, params: tuple, suffix: str = '') -> List[Job]:
+        rows = conn.execute(f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE {where} {suffix}", params).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    @staticmethod
+    def _to_job(row: tuple) -> Job:
+        values = dict(zip(SqliteBroker._COLUMNS, row))
+        values['kwargs'] = json.loads(values['kwargs'])
+        values['result'] = json.loads(values['result']) if values['result'] is not None else None
+        return Job(**values)
+
+    def push(self, job: Job) -> Job:
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO jobs (key, {', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * (len(self._COLUMNS) + 1))})",
+                (job.key, job.id, job.name, json.dumps(job.kwargs, default=str), job.status, job.run_at, job.attempts,
+                 job.max_attempts, job.created_at, job.started_at, job.finished_at,
+                 json.dumps(job.result, default=str) if job.result is not None else None, job.error),
+            )
+        return job
+
+    def claim(self, names: Collection[str], now: float) -> Optional[Job]:
+        names = list(names)
+        if not names:
+            return None
+        with self._transaction() as conn:
+            due = self._select(
+                conn,
+                f"status = ? AND run_at <= ? AND name IN ({', '.join('?' * len(names))})",
+                (QUEUED, now, *names),
+                'ORDER BY run_at, created_at LIMIT 1',
+            )
+            if not due:
+                return None
+            job = due[0]._replace(status=RUNNING, attempts=due[0].attempts + 1, started_at=now)
+            conn.execute("UPDATE jobs SET status = ?, attempts = ?, started_at = ? WHERE id = ?",
+                         (job.status, job.attempts, job.started_at, job.id))
+            return job
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: str = '', run_at: Optional[float] = None):
+        with self._connect() as conn:
+            if status == QUEUED:
+                conn.execute("UPDATE jobs SET status = ?, error = ?, run_at = ? WHERE id = ?",
+                             (QUEUED, error, run_at or time.time(), job_id))
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id),
+                )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            jobs = self._select(conn, 'id = ?', (job_id,))
+        return jobs[0] if jobs else None
+
+    def jobs(self, name: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        with self._connect() as conn:
+            return self._select(
+                conn,
+                '(? IS NULL OR name = ?) AND (? IS NULL OR status = ?)',
+                (name, name, status, status),
+                f'ORDER BY created_at DESC LIMIT {int(limit)}',
+            )
+
+    def find(self, key: str, statuses: Collection[str] = STATUSES) -> Optional[Job]:
+        statuses = list(statuses)
+        with self._connect() as conn:
+            jobs = self._select(
+                conn,
+                f"key = ? AND status IN ({', '.join('?' * len(statuses))})",
+                (key, *statuses),
+                'ORDER BY created_at DESC LIMIT 1',
+            )
+        return jobs[0] if jobs else None
+
+    def requeue_stale(self, started_before: float) -> int:
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET status = ?, run_at = ? WHERE status = ? AND started_at < ?",
+                                (QUEUED, time.time(), RUNNING, started_before)).rowcount
+
+    def prune(self, finished_before: float) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                                (SUCCEEDED, FAILED, finished_before)).rowcount
+
+@lru_cache(maxsize=1)
+def get_broker() -> Broker:
+    """
+    Returns the process-wide broker selected by TASK_BROKER.
+    """
+    kind = os.getenv('TASK_BROKER', 'sqlite')
+    if kind == 'memory':
+        return MemoryBroker()
+    if kind == 'sqlite':
+        return SqliteBroker(os.getenv('TASK_BROKER_PATH') or DEFAULT_BROKER_PATH)
+    raise ValueError(f"Unknown TASK_BROKER {kind!r}; expected 'sqlite' or 'memory'")
+
+def enqueue(name: str, delay: float = 0, unique: bool = True, broker: Optional[Broker] = None, **kwargs) -> Job:
+    """
+    Queues a job for a registered task.
+
+    Args:
+        name (str): The task's registered name.
+        delay (float): Seconds to wait before the job may run.
+        unique (bool): Return the existing job instead if the same job is already queued or running.
+        broker (Optional[Broker]): Broker to use; get_broker() by default.
+        **kwargs: Arguments for the task.
+
+    Returns:
+        Job: The queued job.
+    """
+    spec = get_task(name)
+    broker = broker or get_broker()
+    if unique:
+        existing = broker.find(job_key(name, kwargs), (QUEUED, RUNNING))
+        if existing is not None:
+            logger.debug("Job %s %s is already %s", name, existing.id, existing.status)
+            return existing
+
+    now = time.time()
+    job = broker.push(Job(
+        id=uuid.uuid4().hex,
+        name=name,
+        kwargs=kwargs,
+        status=QUEUED,
+        run_at=now + delay,
+        attempts=0,
+        max_attempts=spec.max_attempts,
+        created_at=now,
+    ))
+    logger.info("Queued job %s %s", name, job.id)
+    return job
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Seconds before a failed job runs again: exponential, but at least as long as the upstream asked for.
+    """
+    delay = min(RETRY_CAP, RETRY_BASE * 2 ** (attempt - 1))
+    if isinstance(error, RateLimitedError) and error.retry_after:
+        delay = max(delay, error.retry_after)
+    if isinstance(error, CircuitOpenError):
+        delay = max(delay, error.retry_in)
+    return delay
+
+class Worker:
+    """
+    Claims due jobs and runs them on a thread pool, within each task's concurrency limit. Jobs of
+    tasks whose upstream has an open circuit, or whose consumer is short on quota, stay queued until
+    that changes.
+    Also enqueues scheduled jobs when they are due.
+    """
+
+    def __init__(self, broker: Optional[Broker] = None, concurrency: Optional[int] = None,
+                 schedules: Optional[List[Schedule]] = None, poll_interval: float = POLL_INTERVAL):
+        self.broker = broker or get_broker()
+        self.concurrency = concurrency or int(os.getenv('TASK_WORKER_CONCURRENCY', DEFAULT_WORKER_CONCURRENCY))
+        self.schedules = registered_schedules() if schedules is None else schedules
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task')
+        # Jobs of each task running in this worker
+        self._running: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def runnable_tasks(self) -> List[str]:
+        """
+        Tasks this worker may start a job for now.
+        """
+        names = []
+        with self._lock:
+            running = dict(self._running)
+        for name, spec in registered_tasks().items():
+            if running.get(name, 0) >= spec.concurrency:
+                continue
+            if spec.host and get_circuit_breaker(spec.host).state == OPEN:
+                logger.debug("Holding %s jobs: circuit for %s is open", name, spec.host)
+                continue
+            if spec.upstream and not allows(spec.upstream, spec.cost, spec.consumer):
+                logger.debug("Holding %s jobs: %s quota for %s is low", name, spec.upstream, spec.consumer)
+                continue
+            names.append(name)
+        return names
+
+    def enqueue_due(self, now: Optional[float] = None) -> int:
+        """
+        Enqueues scheduled jobs whose interval has passed since they were last queued.
+
+        Returns:
+            int: Number of jobs queued.
+        """
+        now = now or time.time()
+        queued = 0
+        for entry in self.schedules:
+            last = self.broker.find(job_key(entry.task, entry.kwargs))
+            if last is None or (last.status not in (QUEUED, RUNNING) and last.created_at + entry.every <= now):
+                enqueue(entry.task, broker=self.broker, **entry.kwargs)
+                queued += 1
+        return queued
+
+    def dispatch(self) -> int:
+        """
+        Claims due jobs and starts them until every slot is busy or nothing runnable is due.
+
+        Returns:
+            int: Number of jobs started.
+        """
+        started = 0
+        while True:
+            with self._lock:
+                if sum(self._running.values()) >= self.concurrency:
+                    break
+            job = self.broker.claim(self.runnable_tasks(), time.time())
+            if job is None:
+                break
+            with self._lock:
+                self._running[job.name] = self._running.get(job.name, 0) + 1
+            self._executor.submit(self._execute, job)
+            started += 1
+        return started
+
+    def _execute(self, job: Job):
+        spec = get_task(job.name)
+        logger.info("Running job %s %s (attempt %d/%d)", job.name, job.id, job.attempts, job.max_attempts)
+        start = time.perf_counter()
+        try:
+            with consumer(spec.consumer), deadline(spec.time_limit) if spec.time_limit else nullcontext():
+                result = spec.func(**job.kwargs)
+        except Exception as e:
+            if job.attempts < job.max_attempts and not isinstance(e, UpstreamRequestError):
+                delay = retry_delay(e, job.attempts)
+                logger.warning("Job %s %s failed, retrying in %.0fs: %s", job.name, job.id, delay, e)
+                self.broker.finish(job.id, QUEUED, error=str(e), run_at=time.time() + delay)
+            else:
+                logger.exception("Job %s %s failed", job.name, job.id)
+                self.broker.finish(job.id, FAILED, error=str(e))
+        else:
+            logger.info("Job %s %s succeeded in %.1fs", job.name, job.id, time.perf_counter() - start)
+            self.broker.finish(job.id, SUCCEEDED, result=result)
+        finally:
+            # Job threads are reused; drop their database connections as a request would
+            close_old_connections()
+            with self._lock:
+                self._running[job.name] -= 1
+
+    def requeue_stale(self, now: Optional[float] = None) -> int:
+        """
+        Queues jobs running for longer than STALE_AFTER again, e.g. those of a worker that crashed.
+
+        Returns:
+            int: Number of jobs queued again.
+        """
+        requeued = self.broker.requeue_stale((now or time.time()) - STALE_AFTER.total_seconds())
+        if requeued:
+            logger.warning("Requeued %d jobs left running by a stopped worker", requeued)
+        return requeued
+
+    def run(self, once: bool = False):
+        """
+        Runs until stop() is called. With once, enqueues due schedules, starts the jobs due now,
+        waits for them and returns. Lost jobs are requeued at start and every STALE_CHECK_INTERVAL,
+        so a crashed worker's jobs are picked up by the workers still running.
+        """
+        logger.info("Worker started with %d slots and %d schedules", self.concurrency, len(self.schedules))
+        next_stale_check = 0.0
+        try:
+            while not self._stop.is_set():
+                if time.time() >= next_stale_check:
+                    self.requeue_stale()
+                    next_stale_check = time.time() + STALE_CHECK_INTERVAL.total_seconds()
+                self.enqueue_due()
+                started = self.dispatch()
+                if once:
+                    break
+                if not started:
+                    self._stop.wait(self.poll_interval)
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        """
+        Waits for running jobs to finish.
+        """
+        self._executor.shutdown(wait=True)
+        logger.info("Worker stopped")
@@ -0,0 +1,4 @@
+"""
+Tests of the shared services. Run from RLM_Booking with:
+    python manage.py test shared_services.tests -t .
+"""
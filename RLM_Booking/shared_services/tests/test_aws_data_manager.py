@@ -0,0 +1,98 @@
+import hashlib
+import os
+import tempfile
+
+import boto3
+from django.test import SimpleTestCase
+from moto import mock_aws
+
+from shared_services.aws_data_manager import AWSDataManager
+
+BUCKET = 'rlm-booking-test'
+REGION = 'us-east-1'
+
+# S3 rejects multipart parts under 5 MiB, except the last
+PART_SIZE = 5 * 1024 * 1024
+
+@mock_aws
+class AWSDataManagerS3Tests(SimpleTestCase):
+    def setUp(self):
+        boto3.client('s3', region_name=REGION).create_bucket(Bucket=BUCKET)
+        self.manager = AWSDataManager(
+            'testing', 'testing', REGION, 'artist-cache', bucket_name=BUCKET,
+            multipart_threshold=PART_SIZE, multipart_chunksize=PART_SIZE, max_concurrency=4,
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_file(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as file:
+            file.write(os.urandom(size))
+        return path
+
+    def test_multipart_upload_and_download(self):
+        # Two full parts and a short last one
+        source = self.write_file('large.bin', 2 * PART_SIZE + 1024)
+        self.assertTrue(self.manager.upload_file(source, None, 'data/large.bin'))
+        head = self.manager.s3.head_object(Bucket=BUCKET, Key='data/large.bin')
+        self.assertTrue(head['ETag'].strip('"').endswith('-3'))
+
+        target = os.path.join(self.tmp.name, 'downloads', 'large.bin')
+        self.assertTrue(self.manager.download_file(None, 'data/large.bin', target))
+        with open(source, 'rb') as expected, open(target, 'rb') as downloaded:
+            self.assertEqual(hashlib.md5(downloaded.read()).digest(), hashlib.md5(expected.read()).digest())
+        self.assertFalse(os.path.exists(f"{target}.part"))
+
+    def test_download_missing_object_leaves_no_file(self):
+        target = os.path.join(self.tmp.name, 'missing.bin')
+        self.assertFalse(self.manager.download_file(None, 'data/missing.bin', target))
+        self.assertFalse(os.path.exists(target))
+        self.assertFalse(os.path.exists(f"{target}.part"))
+
+    def test_compute_etag_matches_s3(self):
+        small = self.write_file('small.bin', 1024)
+        large = self.write_file('large.bin', 2 * PART_SIZE + 1024)
+        for path in (small, large):
+            self.manager.upload_file(path, None, os.path.basename(path))
+            head = self.manager.s3.head_object(Bucket=BUCKET, Key=os.path.basename(path))
+            self.assertEqual(self.manager.compute_etag(path), head['ETag'].strip('"'))
+        self.assertTrue(self.manager.compute_etag(large).endswith('-3'))
+        with open(small, 'rb') as file:
+            self.assertEqual(self.manager.compute_etag(small), hashlib.md5(file.read()).hexdigest())
+
+    def test_validate_file(self):
+        source = self.write_file('large.bin', PART_SIZE + 1024)
+        self.manager.upload_file(source, None, 'large.bin')
+
+        self.assertTrue(self.manager.validate_file(None, 'large.bin'))
+        self.assertTrue(self.manager.validate_file(None, 'large.bin', local_path=source))
+        self.assertTrue(self.manager.validate_file(None, 'large.bin', expected_size=PART_SIZE + 1024))
+        self.assertFalse(self.manager.validate_file(None, 'large.bin', expected_size=PART_SIZE))
+        self.assertFalse(self.manager.validate_file(None, 'large.bin', expected_etag='0' * 32))
+        self.assertFalse(self.manager.validate_file(None, 'missing.bin'))
+
+        changed = self.write_file('changed.bin', PART_SIZE + 1024)
+        self.assertFalse(self.manager.validate_file(None, 'large.bin', local_path=changed))
+
+    def test_list_files_pages_lazily(self):
+        # list_objects_v2 returns at most 1,000 keys per page
+        for i in range(1005):
+            self.manager.s3.put_object(Bucket=BUCKET, Key=f"data/{i:04d}.csv", Body=b'x')
+        self.manager.s3.put_object(Bucket=BUCKET, Key='models/model.tar.gz', Body=b'x')
+        pages = []
+        self.manager.s3.meta.events.register('before-call.s3.ListObjectsV2', lambda **kwargs: pages.append(1))
+
+        files = self.manager.list_files(None, prefix='data/')
+        first = next(files)
+        self.assertEqual((first['key'], first['size'], first['etag']), ('data/0000.csv', 1, hashlib.md5(b'x').hexdigest()))
+        self.assertEqual(len(pages), 1)
+
+        keys = [first['key']] + [file['key'] for file in files]
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(keys, [f"data/{i:04d}.csv" for i in range(1005)])
+
+    def test_missing_bucket_name(self):
+        self.manager.bucket_name = None
+        with self.assertRaises(ValueError):
+            self.manager.generate_s3_uri(None, 'data/train/')
@@ -0,0 +1,56 @@
+import time
+
+import requests
+from django.test import SimpleTestCase
+
+from shared_services.deadline import (
+    DeadlineExceeded, check_deadline, deadline, deadline_at, remaining, request_timeout, sleep_within_deadline,
+)
+
+DEFAULT_TIMEOUT = (3.05, 15)
+
+class DeadlineTests(SimpleTestCase):
+    def test_no_deadline_keeps_the_default_timeouts(self):
+        self.assertIsNone(remaining())
+        self.assertEqual(request_timeout(DEFAULT_TIMEOUT), DEFAULT_TIMEOUT)
+
+    def test_timeouts_are_clamped_to_the_remaining_budget(self):
+        with deadline(1.0):
+            connect, read = request_timeout(DEFAULT_TIMEOUT)
+        self.assertLessEqual(connect, 1.0)
+        self.assertLessEqual(read, 1.0)
+        self.assertGreater(read, 0.5)
+
+        with deadline(10.0):
+            self.assertEqual(request_timeout(DEFAULT_TIMEOUT)[0], DEFAULT_TIMEOUT[0])
+
+    def test_passed_deadline_raises(self):
+        with deadline_at(time.monotonic() - 1):
+            with self.assertRaises(DeadlineExceeded):
+                request_timeout(DEFAULT_TIMEOUT)
+            with self.assertRaises(DeadlineExceeded):
+                check_deadline()
+
+        with deadline(0.05):
+            time.sleep(0.06)
+            with self.assertRaises(DeadlineExceeded):
+                request_timeout(DEFAULT_TIMEOUT)
+        # Left the deadline
+        self.assertEqual(request_timeout(DEFAULT_TIMEOUT), DEFAULT_TIMEOUT)
+
+    def test_deadline_exceeded_is_a_timeout(self):
+        self.assertTrue(issubclass(DeadlineExceeded, requests.Timeout))
+
+    def test_inner_deadline_cannot_extend_the_outer_one(self):
+        with deadline(0.5):
+            with deadline(60):
+                self.assertLessEqual(remaining(), 0.5)
+            with deadline(0.1):
+                self.assertLessEqual(remaining(), 0.1)
+
+    def test_sleep_past_the_deadline_raises_at_once(self):
+        with deadline(0.5):
+            start = time.monotonic()
+            with self.assertRaises(DeadlineExceeded):
+                sleep_within_deadline(5)
+            self.assertLess(time.monotonic() - start, 0.1)
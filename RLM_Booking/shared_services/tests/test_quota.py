@@ -0,0 +1,109 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from integrations.errors import QuotaExceededError
+from shared_services import quota
+from shared_services.quota import (
+    BATCH, INTERACTIVE, WARMER, allows, check_quota, consumer, daily_budget, get_ledger, note_reported,
+    record_call, remaining,
+)
+
+PROVIDER = 'testprovider'
+LIMIT = 1000
+
+class QuotaTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.dict(os.environ, {
+            'QUOTA_LEDGER_PATH': os.path.join(tmp.name, 'quota.sqlite3'),
+            f'QUOTA_LIMIT_{PROVIDER.upper()}': str(LIMIT),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(quota._reported, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_ledger.cache_clear()
+        self.addCleanup(get_ledger.cache_clear)
+
+    def use(self, consumer_name, calls):
+        get_ledger().record(PROVIDER, 'events', consumer_name, calls)
+
+    def test_budgets_are_shares_of_the_limit(self):
+        self.assertEqual(daily_budget(PROVIDER, INTERACTIVE), LIMIT)
+        self.assertEqual(daily_budget(PROVIDER, WARMER), 250)
+        self.assertEqual(daily_budget(PROVIDER, BATCH), 400)
+        self.assertIsNone(daily_budget('unlimited', BATCH))
+        self.assertIsNone(remaining('unlimited', BATCH))
+        self.assertTrue(allows('unlimited', 10 ** 6, BATCH))
+
+    def test_batch_stops_at_its_budget(self):
+        self.use(BATCH, 399)
+        self.assertEqual(remaining(PROVIDER, BATCH), 1)
+        self.assertTrue(allows(PROVIDER, 1, BATCH))
+        self.assertFalse(allows(PROVIDER, 2, BATCH))
+        self.use(BATCH, 1)
+        self.assertFalse(allows(PROVIDER, 1, BATCH))
+        # Other consumers have their own budgets
+        self.assertEqual(remaining(PROVIDER, WARMER), 250)
+
+    def test_batch_and_warmer_stop_at_their_reserve(self):
+        # 350 left: above the warmer's reserve of 200, 50 above the batch reserve of 300
+        self.use(INTERACTIVE, 650)
+        self.assertEqual(remaining(PROVIDER, BATCH), 50)
+        self.assertFalse(allows(PROVIDER, 51, BATCH))
+        self.assertEqual(remaining(PROVIDER, WARMER), 150)
+
+        # 250 left: below the batch reserve
+        self.use(INTERACTIVE, 100)
+        self.assertEqual(remaining(PROVIDER, BATCH), 0)
+        self.assertFalse(allows(PROVIDER, 1, BATCH))
+        self.assertEqual(remaining(PROVIDER, WARMER), 50)
+
+        # 190 left: below the warmer's reserve too
+        self.use(INTERACTIVE, 60)
+        self.assertFalse(allows(PROVIDER, 1, WARMER))
+        self.assertTrue(allows(PROVIDER, 1, INTERACTIVE))
+
+    def test_interactive_is_never_blocked(self):
+        self.use(BATCH, 400)
+        self.use(INTERACTIVE, LIMIT)
+        self.assertEqual(remaining(PROVIDER), 0)
+        self.assertTrue(allows(PROVIDER, 1, INTERACTIVE))
+        self.assertTrue(allows(PROVIDER))
+        check_quota(PROVIDER)
+
+    def test_reported_remaining_lowers_what_is_left(self):
+        note_reported(PROVIDER, '320')
+        self.assertEqual(remaining(PROVIDER), 320)
+        self.assertEqual(remaining(PROVIDER, BATCH), 20)
+        self.assertEqual(remaining(PROVIDER, WARMER), 120)
+        # Unparseable headers are ignored
+        note_reported(PROVIDER, 'n/a')
+        self.assertEqual(remaining(PROVIDER), 320)
+
+    def test_calls_count_against_the_current_consumer(self):
+        with consumer(BATCH):
+            record_call(PROVIDER, 'events')
+            record_call(PROVIDER, 'events')
+        record_call(PROVIDER, 'events')
+        self.assertEqual(get_ledger().used(PROVIDER, BATCH), 2)
+        self.assertEqual(get_ledger().used(PROVIDER, INTERACTIVE), 1)
+        self.assertEqual(remaining(PROVIDER, BATCH), 398)
+
+    def test_check_quota_raises_for_an_exhausted_consumer(self):
+        self.use(BATCH, 400)
+        with consumer(BATCH):
+            with self.assertRaises(QuotaExceededError) as raised:
+                check_quota(PROVIDER)
+        self.assertEqual(raised.exception.consumer, BATCH)
+        self.assertGreater(raised.exception.retry_after, 0)
+
+    def test_unknown_consumer(self):
+        with self.assertRaises(ValueError):
+            with consumer('crawler'):
+                pass
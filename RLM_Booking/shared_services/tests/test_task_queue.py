@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from shared_services import task_queue
+from shared_services.task_queue import (
+    FAILED, QUEUED, RUNNING, SUCCEEDED, Job, MemoryBroker, Schedule, SqliteBroker, Worker, enqueue, task,
+)
+
+# Calls of the test tasks, by task name
+calls = {}
+
+@task('test_echo')
+def echo(value=None):
+    calls.setdefault('test_echo', []).append(value)
+    return value
+
+@task('test_flaky', max_attempts=2)
+def flaky():
+    calls.setdefault('test_flaky', []).append(None)
+    raise ValueError('upstream hiccup')
+
+class TaskQueueTests(SimpleTestCase):
+    def setUp(self):
+        calls.clear()
+        self.broker = MemoryBroker()
+
+    def worker(self, schedules=None, **kwargs):
+        return Worker(self.broker, concurrency=1, schedules=schedules or [], **kwargs)
+
+    def running_job(self, job_id, started_at):
+        # A job claimed by a worker at started_at
+        return self.broker.push(Job(
+            id=job_id, name='test_echo', kwargs={'value': job_id}, status=RUNNING, run_at=started_at,
+            attempts=1, max_attempts=3, created_at=started_at, started_at=started_at,
+        ))
+
+    def test_enqueue_returns_the_queued_job_once(self):
+        job = enqueue('test_echo', broker=self.broker, value=1)
+        self.assertEqual(job.status, QUEUED)
+        self.assertEqual(job.kwargs, {'value': 1})
+        self.assertEqual(enqueue('test_echo', broker=self.broker, value=1).id, job.id)
+        self.assertNotEqual(enqueue('test_echo', broker=self.broker, value=2).id, job.id)
+        self.assertNotEqual(enqueue('test_echo', broker=self.broker, unique=False, value=1).id, job.id)
+
+    def test_enqueue_unknown_task(self):
+        with self.assertRaises(KeyError):
+            enqueue('test_missing', broker=self.broker)
+
+    def test_claim_takes_the_longest_waiting_due_job(self):
+        later = enqueue('test_echo', broker=self.broker, delay=60, value='later')
+        first = enqueue('test_echo', broker=self.broker, value='first')
+        enqueue('test_echo', broker=self.broker, value='second')
+
+        self.assertIsNone(self.broker.claim(['test_flaky'], time.time()))
+        claimed = self.broker.claim(['test_echo'], time.time())
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual((claimed.status, claimed.attempts), (RUNNING, 1))
+        self.assertEqual(self.broker.claim(['test_echo'], time.time()).kwargs, {'value': 'second'})
+        self.assertIsNone(self.broker.claim(['test_echo'], time.time()))
+        self.assertEqual(self.broker.claim(['test_echo'], time.time() + 61).id, later.id)
+
+    def test_worker_runs_a_job(self):
+        job = enqueue('test_echo', broker=self.broker, value=3)
+        self.worker().run(once=True)
+        self.assertEqual(calls['test_echo'], [3])
+        finished = self.broker.get(job.id)
+        self.assertEqual((finished.status, finished.result), (SUCCEEDED, 3))
+
+    def test_failed_job_is_retried_then_failed(self):
+        job = enqueue('test_flaky', broker=self.broker)
+        self.worker().run(once=True)
+        retried = self.broker.get(job.id)
+        self.assertEqual((retried.status, retried.attempts, retried.error), (QUEUED, 1, 'upstream hiccup'))
+        self.assertGreaterEqual(retried.run_at, time.time() + task_queue.RETRY_BASE - 5)
+
+        # Not due yet
+        self.worker().run(once=True)
+        self.assertEqual(len(calls['test_flaky']), 1)
+
+        with mock.patch.object(task_queue.time, 'time', return_value=retried.run_at + 1):
+            self.worker().run(once=True)
+        self.assertEqual(len(calls['test_flaky']), 2)
+        self.assertEqual(self.broker.get(job.id).status, FAILED)
+
+    def test_schedule_enqueues_when_the_interval_passed(self):
+        worker = self.worker(schedules=[Schedule('test_echo', 60, {'value': 'tick'})])
+        now = time.time()
+        self.assertEqual(worker.enqueue_due(now), 1)
+        # Already queued
+        self.assertEqual(worker.enqueue_due(now + 120), 0)
+
+        job = self.broker.claim(['test_echo'], now + 1)
+        self.broker.finish(job.id, SUCCEEDED)
+        self.assertEqual(worker.enqueue_due(now + 30), 0)
+        self.assertEqual(worker.enqueue_due(now + 61), 1)
+
+    def test_stale_jobs_are_requeued(self):
+        lost = self.running_job('lost', time.time() - task_queue.STALE_AFTER.total_seconds() - 60)
+        running = self.running_job('running', time.time())
+
+        self.assertEqual(self.worker().requeue_stale(), 1)
+        self.assertEqual(self.broker.get(lost.id).status, QUEUED)
+        self.assertEqual(self.broker.get(running.id).status, RUNNING)
+
+    def test_running_worker_requeues_stale_jobs_periodically(self):
+        worker = self.worker(poll_interval=0.01)
+        with mock.patch.object(task_queue, 'STALE_CHECK_INTERVAL', timedelta(seconds=0.05)), \
+                mock.patch.object(self.broker, 'requeue_stale', wraps=self.broker.requeue_stale) as requeue_stale:
+            thread = threading.Thread(target=worker.run)
+            thread.start()
+            try:
+                for _ in range(200):
+                    if requeue_stale.called:
+                        break
+                    time.sleep(0.01)
+                # Lost by another worker after this one's startup check
+                lost = self.running_job('lost', 0)
+                for _ in range(200):
+                    if self.broker.get(lost.id).status == SUCCEEDED:
+                        break
+                    time.sleep(0.01)
+            finally:
+                worker.stop()
+                thread.join()
+        self.assertGreaterEqual(requeue_stale.call_count, 2)
+        self.assertEqual(self.broker.get(lost.id).status, SUCCEEDED)
+        self.assertEqual(calls['test_echo'], ['lost'])
+
+class SqliteBrokerTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.broker = SqliteBroker(os.path.join(tmp.name, 'tasks.sqlite3'))
+
+    def test_claim_round_trips_the_job(self):
+        job = enqueue('test_echo', broker=self.broker, value={'nested': [1, 2]})
+        claimed = self.broker.claim(['test_echo'], time.time())
+        self.assertEqual((claimed.id, claimed.kwargs, claimed.status, claimed.attempts),
+                         (job.id, {'value': {'nested': [1, 2]}}, RUNNING, 1))
+        self.assertEqual(self.broker.get(job.id).status, RUNNING)
+        self.assertIsNone(self.broker.claim(['test_echo'], time.time()))
+
+    def test_concurrent_claims_never_share_a_job(self):
+        jobs = {enqueue('test_echo', broker=self.broker, unique=False, value=i).id for i in range(40)}
+        claimers = 8
+        start = threading.Barrier(claimers)
+        claimed = [[] for _ in range(claimers)]
+
+        def claim_all(mine):
+            # Each claimer uses its own connections, as separate workers would
+            start.wait()
+            while True:
+                job = self.broker.claim(['test_echo'], time.time())
+                if job is None:
+                    return
+                mine.append(job.id)
+
+        threads = [threading.Thread(target=claim_all, args=(mine,)) for mine in claimed]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [job_id for mine in claimed for job_id in mine]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), jobs)
+        self.assertTrue(all(job.attempts == 1 for job in self.broker.jobs(status=RUNNING, limit=100)))
@@ -35,9 +35,13 @@ function updateMap(events) {
     const bounds = L.latLngBounds();  // Create a bounds object
 
     events.forEach(event => {
-        const venueName = event._embedded.venues[0].name;
+        const venueName = event.venue;
+        // Use the venue coordinates from the event when present; geocode the venue name otherwise
+        const location = (event.latitude && event.longitude)
+            ? Promise.resolve({ lat: event.latitude, lon: event.longitude })
+            : getLatLon(venueName);
         markerPromises.push(
-            getLatLon(venueName)
+            location
                 .then(({ lat, lon }) => {
                     if (lat && lon) {
                         const marker = L.marker([lat, lon])
@@ -126,22 +130,19 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log('City:', city);
 
         document.getElementById('results').innerHTML = '';
+        document.getElementById('similar-artists').innerHTML = '';
         initializeMap();
 
-        // Fetch artist data from the backend
-        fetch(`/artist_recommendation/search-artist?name=${encodeURIComponent(artistName)}`)
+        // Fetch the artists and the first artist's events in one request; the server runs the upstream searches concurrently
+        const overviewParams = new URLSearchParams({ name: artistName, country: country, city: city });
+        fetch(`/artist_recommendation/artist-overview/?${overviewParams.toString()}`)
             .then(response => response.json())
             .then(data => {
-                console.log('Artist data received:', data);
+                console.log('Artist overview received:', data);
 
                 let artists = [];
-                // Handle the case where data is an object with an "artists" property
-                if (data.artists && data.artists.items) {
-                    artists = data.artists.items.slice(0, 5);
-                } 
-                // Handle the case where data is a direct array of artist objects
-                else if (Array.isArray(data)) {
-                    artists = data.slice(0, 5);
+                if (Array.isArray(data.artists)) {
+                    artists = data.artists.slice(0, 5);
                 } 
                 // Handle unexpected formats
                 else {
@@ -185,29 +186,35 @@ document.addEventListener('DOMContentLoaded', function() {
 
                 document.getElementById('results').innerHTML = artistHtml;
 
-                // Fetch event data for the first artist in the list (if needed)
-                const firstArtistName = artists[0].name;
-                return fetch(`/artist_recommendation/get-events?name=${encodeURIComponent(firstArtistName)}&country=${encodeURIComponent(country)}&city=${encodeURIComponent(city)}`);
+                if (artists.length > 0) {
+                    showSimilarArtists(artists[0].name);
+                }
+                // Events and predictions for the first artist arrive in the same response
+                return data;
             })
-            .then(response => response.json())
             .then(eventData => {
                 console.log('Event data received:', eventData);
                 let eventHtml = '<h2 style="color: #ff0000;">Upcoming Events:</h2>';
 
-                if (eventData.local_event_count > 0 && Array.isArray(eventData.local_events)) {
+                // Local/global partitions reference events by id
+                const eventsById = new Map(eventData.events.map(event => [event.id, event]));
+                const localEvents = eventData.local_event_ids.map(id => eventsById.get(id)).filter(Boolean);
+                const globalEvents = eventData.global_event_ids.map(id => eventsById.get(id)).filter(Boolean);
+
+                if (localEvents.length > 0) {
                     eventHtml += `<h3 style="color: #ff0000;">Local Events (${eventData.local_event_count}):</h3>`;
-                    eventData.local_events.forEach(event => {
+                    localEvents.forEach(event => {
                         eventHtml += `
                             <div class="card mb-3" style="background-color: #1a1a1a; color: #ffffff; border: none;">
                                 <div class="card-body">
                                     <h5 class="card-title" style="color: #ff0000;">${event.name}</h5>
-                                    <p class="card-text">Date: ${event.dates.start.localDate}</p>
-                                    <p class="card-text">Location: ${event._embedded.venues[0].name}, ${event._embedded.venues[0].city.name}</p>
+                                    <p class="card-text">Date: ${event.date}</p>
+                                    <p class="card-text">Location: ${event.venue}, ${event.city}</p>
                                     <button class="btn btn-primary add-to-calendar" 
                                             data-event='${JSON.stringify({
                                                 name: event.name,
-                                                date: event.dates.start.localDate,
-                                                location: `${event._embedded.venues[0].name}, ${event._embedded.venues[0].city.name}`,
+                                                date: event.date,
+                                                location: `${event.venue}, ${event.city}`,
                                             })}'>
                                         Add to Calendar
                                     </button>
@@ -219,23 +226,23 @@ document.addEventListener('DOMContentLoaded', function() {
                     eventHtml += '<p style="color: #b3b3b3;">No local events found.</p>';
                 }
 
-                if (eventData.global_event_count > 0 && Array.isArray(eventData.global_events)) {
+                if (globalEvents.length > 0) {
                     eventHtml += `<h3 style="color: #ff0000;">Global Events (${eventData.global_event_count}):</h3>`;
-                    eventData.global_events.forEach(event => {
+                    globalEvents.forEach(event => {
                         eventHtml += `
                             <div class="card mb-3" style="background-color: #1a1a1a; color: #ffffff; border: none;">
                                 <div class="card-body">
                                     <h5 class="card-title" style="color: #ff0000;">${event.name}</h5>
-                                    <p class="card-text">Date: ${event.dates.start.localDate}</p>
-                                    <p class="card-text">Location: ${event._embedded.venues[0].name}, ${event._embedded.venues[0].city.name}</p>
+                                    <p class="card-text">Date: ${event.date}</p>
+                                    <p class="card-text">Location: ${event.venue}, ${event.city}</p>
                                     <p class="card-text"><strong>Predicted Ticket Sales: ${event.predicted_sales}</strong></p>
                                     <p class="card-text"><strong>Suggested Ticket Price: $${event.suggested_price}</strong></p>
                                     <a href="${event.url}" target="_blank" class="btn" style="background-color: #ff0000; color: #ffffff;">Get Tickets</a>
                                     <button class="btn btn-primary add-to-calendar" 
                                             data-event='${JSON.stringify({
                                                 name: event.name,
-                                                date: event.dates.start.localDate,
-                                                location: `${event._embedded.venues[0].name}, ${event._embedded.venues[0].city.name}`,
+                                                date: event.date,
+                                                location: `${event.venue}, ${event.city}`,
                                             })}'>
                                         Add to Calendar
                                     </button>
@@ -247,10 +254,18 @@ document.addEventListener('DOMContentLoaded', function() {
                     eventHtml += '<p style="color: #b3b3b3;">No global events found.</p>';
                 }
 
+                if (eventData.local_event_count + eventData.global_event_count > 0) {
+                    eventHtml += `
+                        <button class="btn mb-3 add-all-to-calendar" style="background-color: #ff0000; color: #ffffff;">
+                            Add All to Calendar
+                        </button>
+                    `;
+                }
+
                 scrollToMapButton.classList.remove('d-none');
 
                 document.getElementById('results').innerHTML += eventHtml;
-                updateMap(eventData.local_events.concat(eventData.global_events)); //UNCOMMENT FOR MAP FUNCTIONALITY
+                updateMap(localEvents.concat(globalEvents)); //UNCOMMENT FOR MAP FUNCTIONALITY
             })
             .catch(error => {
                 console.error('Error:', error);
@@ -295,6 +310,78 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeMap();
 });
 
+// Show precomputed similar artists; clicking one searches for it
+function showSimilarArtists(artistName) {
+    const container = document.getElementById('similar-artists');
+    fetch(`/artist_recommendation/similar-artists/?name=${encodeURIComponent(artistName)}&limit=8`)
+        .then(response => response.json())
+        .then(similar => {
+            if (!Array.isArray(similar) || similar.length === 0) {
+                container.innerHTML = '';
+                return;
+            }
+            container.innerHTML = '<span style="color: #b3b3b3;">Similar artists: </span>';
+            similar.forEach(artist => {
+                const button = document.createElement('button');
+                button.type = 'button';
+                button.className = 'btn btn-sm btn-outline-danger m-1';
+                button.textContent = artist.name;
+                button.addEventListener('click', () => {
+                    document.getElementById('artist-name').value = artist.name;
+                    document.getElementById('artist-search-form').requestSubmit();
+                });
+                container.appendChild(button);
+            });
+        })
+        .catch(error => console.error('Error fetching similar artists:', error));
+}
+
+// Artist name typeahead, served from the local artist index
+document.addEventListener('DOMContentLoaded', function() {
+    const input = document.getElementById('artist-name');
+    const suggestions = document.getElementById('artist-suggestions');
+    const responses = new Map();  // query -> suggestion names, so backspacing doesn't refetch
+    let debounceTimer;
+    let latestQuery = '';
+
+    function showSuggestions(names) {
+        suggestions.innerHTML = '';
+        names.forEach(name => {
+            const option = document.createElement('option');
+            option.value = name;
+            suggestions.appendChild(option);
+        });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(debounceTimer);
+        const query = input.value.trim().toLowerCase();
+        latestQuery = query;
+        if (!query) {
+            showSuggestions([]);
+            return;
+        }
+        if (responses.has(query)) {
+            showSuggestions(responses.get(query));
+            return;
+        }
+
+        debounceTimer = setTimeout(() => {
+            fetch(`/artist_recommendation/artist-typeahead/?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(artists => {
+                    const names = artists.map(artist => artist.name);
+                    responses.set(query, names);
+                    // Ignore responses for queries the user has already typed past
+                    if (query === latestQuery) {
+                        showSuggestions(names);
+                    }
+                })
+                .catch(error => console.error('Typeahead error:', error));
+        }, 150);
+    });
+});
+
 document.addEventListener('DOMContentLoaded', function() {
     // Scroll to map when the button is clicked
     document.getElementById('scroll-to-map').addEventListener('click', function() {
@@ -326,6 +413,37 @@ document.addEventListener('click', function (e) {
     }
 });
 
+// Save every listed event in one request instead of one request per event
+document.addEventListener('click', function (e) {
+    if (!e.target.classList.contains('add-all-to-calendar')) {
+        return;
+    }
+
+    const newEvents = Array.from(document.querySelectorAll('.add-to-calendar'))
+        .map(button => JSON.parse(button.getAttribute('data-event')));
+
+    fetch('/event_management/api/bulk-save-events/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ events: newEvents }),
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error('Failed to save events');
+        }
+        return response.json();
+    })
+    .then(data => {
+        new bootstrap.Toast(document.getElementById('toast-success')).show();
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        new bootstrap.Toast(document.getElementById('toast-error')).show();
+    });
+});
+
 document.getElementById('add-event-form').addEventListener('submit', function (e) {
     e.preventDefault();
 
@@ -44,8 +44,11 @@ def save_to_csv(artists_data, filename='synthetic_artist_data.csv'):
             writer.writerow(artist)
 
 # Generate and save the artist data
-num_artists = 100  # You can change the number of artists you want to generate
-artists_data = generate_artist_data(num_artists)
-save_to_csv(artists_data)
+# For large, reproducible datasets (venues, events, saved events) use RLM_Booking/data_processing/synthetic_data.py
+if __name__ == "__main__":
+    num_artists = 100  # You can change the number of artists you want to generate
+    artists_data = generate_artist_data(num_artists)
+    save_to_csv(artists_data)
+
+    print(f"Synthetic artist data for {num_artists} artists has been saved to 'synthetic_artist_data.csv'.")
 
-print(f"Synthetic artist data for {num_artists} artists has been saved to 'synthetic_artist_data.csv'.")
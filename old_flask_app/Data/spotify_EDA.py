@@ -1,3 +1,4 @@
+# Superseded by RLM_Booking/data_processing/features.py (python -m data_processing.features <csv>).
 import pandas as pd
 
 ### INITIAL DATA INSPECTION ###
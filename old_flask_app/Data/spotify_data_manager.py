@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import os
 
@@ -116,9 +116,12 @@ class SpotifyDataManager:
         
         return artist_details
 
-    def fetch_and_save_spotify_data(self, data_writer: DataWriter, progress_manager: ProgressManager, data_point_limit=10000):
+    def fetch_and_save_spotify_data(self, data_writer: DataWriter, progress_manager: ProgressManager, data_point_limit=10000,
+                                    playlist_writer: Optional[DataWriter] = None):
         """
         Coordination function to tie together fetching, writing, and progress tracking.
+        When playlist_writer is given, every (playlist_id, artist_name) pair is also recorded so that
+        artist similarity can use playlist co-occurrence.
         """
         logging.debug("Starting fetch_and_save_spotify_data")
         data_points_collected = len(data_writer.existing_entries)
@@ -139,6 +142,9 @@ class SpotifyDataManager:
                     if progress_manager.should_skip(artist['artist_name'], 'track'):
                         continue
 
+                    if playlist_writer is not None:
+                        playlist_writer.write_entry_to_csv({'playlist_id': playlist['id'], 'artist_name': artist['artist_name']})
+
                     # Write artist data to CSV if not a duplicate and within the limit
                     if data_writer.write_entry_to_csv(artist):
                         data_points_collected += 1
@@ -172,10 +178,11 @@ def main():
     # Initialize SpotifyDataManager, DataWriter, and ProgressManager with progress keys
     spotify_manager = SpotifyDataManager(api_manager)
     data_writer = DataWriter('spotify_data.csv', headers=['artist_name', 'genre', 'popularity', 'followers', 'external_url'])
+    playlist_writer = DataWriter('playlist_artists.csv', headers=['playlist_id', 'artist_name'])
     progress_manager = ProgressManager('progress.json', progress_keys=['last_category_id', 'last_playlist_id', 'last_track_id'])
 
     # Fetch and save data
-    spotify_manager.fetch_and_save_spotify_data(data_writer, progress_manager, data_point_limit=10000)
+    spotify_manager.fetch_and_save_spotify_data(data_writer, progress_manager, data_point_limit=10000, playlist_writer=playlist_writer)
 
 if __name__ == "__main__":
     main()
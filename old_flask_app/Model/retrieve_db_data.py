@@ -1,6 +1,7 @@
 import boto3
 import csv
 import json
+import zlib
 
 def get_all_items():
     table_name = 'APIResults'
@@ -29,6 +30,9 @@ def parse_dynamodb_json(items):
     
     for item in items:
         artist_data_str = item.get('data', '[]')
+        # Newer cache items store zlib-compressed JSON in a binary 'payload' attribute
+        if item.get('encoding') == 'json+zlib':
+            artist_data_str = zlib.decompress(bytes(item['payload'].value)).decode('utf-8')
         print(f"Raw artist_data_str: {artist_data_str}")  # Debugging output
         
         try: